@@ -1,6 +1,12 @@
-from .data_handler import UnivariateDataHandler, MultivariateDataHandler
-
-
+# Defined before importing submodules, which use it
 __version__ = "0.4.0"
 
-__all__ = ["UnivariateDataHandler", "MultivariateDataHandler"]
+from .data_handler import (  # noqa: E402
+    UnivariateDataHandler, MultivariateDataHandler, FeatureTableDataHandler,
+    OrdinationDataHandler
+)
+from .distances import CondensedDistances  # noqa: E402
+
+__all__ = ["UnivariateDataHandler", "MultivariateDataHandler",
+           "FeatureTableDataHandler", "OrdinationDataHandler",
+           "CondensedDistances"]
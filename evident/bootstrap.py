@@ -0,0 +1,483 @@
+import time
+from typing import Callable, List, Union
+
+from joblib import Parallel, delayed, effective_n_jobs
+import numpy as np
+from scipy import stats
+
+
+class QuantileSketch:
+    def __init__(self, size: int = 2000):
+        """Bounded-memory streaming quantile sketch.
+
+        Values are stored in levels of buffers where each value in level h
+        stands for 2^h original values. When a level holds at least size
+        values it is sorted and every other value is promoted to the next
+        level, alternating which half is kept.
+
+        Each promotion at level h shifts the rank of any query by at most
+        2^h, and at most N / (size * 2^h) promotions happen at level h for
+        N folded values. The rank of a returned quantile is therefore
+        within N * (log2(N / size) + 1) / size of the exact rank, e.g.
+        0.06% of N for size = 10000 and N = 10^6. The sketch stores at most
+        size * (log2(N / size) + 2) values.
+
+        Multi-dimensional statistics are sketched elementwise along the
+        first axis. NaN values are ignored when querying quantiles.
+
+        :param size: Max number of values per level before compacting.
+            Larger values are more accurate. Must be even and >= 2.
+        :type size: int
+        """
+        if size < 2 or size % 2:
+            raise ValueError("size must be an even number >= 2.")
+        self.size = size
+        self.count = 0
+        self._levels = []
+        self._offsets = []
+
+    def update(self, values: np.ndarray) -> None:
+        """Fold values into the sketch.
+
+        :param values: Array of new values along the first axis
+        :type values: np.ndarray
+        """
+        values = np.asarray(values, dtype=float)
+        self.count += values.shape[0]
+        self._add_to_level(0, values)
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """Fold the contents of another sketch into this one.
+
+        :param other: Sketch to merge into this one
+        :type other: evident.bootstrap.QuantileSketch
+        """
+        self.count += other.count
+        for level, values in enumerate(other._levels):
+            if values is not None:
+                self._add_to_level(level, values)
+
+    def _add_to_level(self, level: int, values: np.ndarray) -> None:
+        while len(self._levels) <= level:
+            self._levels.append(None)
+            self._offsets.append(0)
+
+        if self._levels[level] is not None:
+            values = np.concatenate([self._levels[level], values])
+        if values.shape[0] < self.size:
+            self._levels[level] = values
+            return
+
+        values = np.sort(values, axis=0)
+        # Hold back the last value of odd-length buffers at this level
+        num_even = values.shape[0] - values.shape[0] % 2
+        self._levels[level] = values[num_even:] if num_even else None
+        promoted = values[self._offsets[level]:num_even:2]
+        self._offsets[level] = 1 - self._offsets[level]
+        self._add_to_level(level + 1, promoted)
+
+    def _weighted_values(self):
+        """Get stored values and the number of values each stands for."""
+        values, weights = [], []
+        for level, level_values in enumerate(self._levels):
+            if level_values is not None:
+                values.append(level_values)
+                weights.append(np.full(level_values.shape[0], 2 ** level))
+        return np.concatenate(values), np.concatenate(weights)
+
+    def cdf(self, x: np.ndarray) -> np.ndarray:
+        """Estimate the fraction of folded values below x.
+
+        :param x: Value(s) with the shape of a single statistic
+        :type x: float or np.ndarray
+
+        :returns: Estimated fraction of non-NaN values less than x
+        :rtype: np.ndarray
+        """
+        values, weights = self._weighted_values()
+        weights = weights.reshape((-1, ) + (1, ) * (values.ndim - 1))
+        below = np.where(values < x, weights, 0).sum(axis=0)
+        total = np.where(np.isnan(values), 0, weights).sum(axis=0)
+        return below / total
+
+    def quantile(self, q: Union[float, List[float]]) -> np.ndarray:
+        """Estimate quantiles of the folded values.
+
+        :param q: Quantile(s) to compute, between 0 and 1
+        :type q: float or List[float]
+
+        :returns: Estimated quantiles with the same layout as
+            np.nanquantile(values, q, axis=0)
+        :rtype: np.ndarray
+        """
+        values, weights = self._weighted_values()
+
+        q_arr = np.atleast_1d(q).astype(float)
+        stat_shape = values.shape[1:]
+        flat = values.reshape(values.shape[0], -1)
+        result = np.full((len(q_arr), flat.shape[1]), np.nan)
+        for i in range(flat.shape[1]):
+            keep = ~np.isnan(flat[:, i])
+            if not keep.any():
+                continue
+            order = np.argsort(flat[keep, i])
+            elem_values = flat[keep, i][order]
+            elem_weights = weights[keep][order]
+            # Place each value at the midpoint of the ranks it stands for
+            cum_weights = np.cumsum(elem_weights)
+            positions = cum_weights - elem_weights / 2
+            positions = (positions - positions[0]) / max(
+                positions[-1] - positions[0], 1
+            )
+            result[:, i] = np.interp(q_arr, positions, elem_values)
+
+        result = result.reshape((len(q_arr), ) + stat_shape)
+        if np.ndim(q) == 0:
+            return result[0]
+        return result
+
+
+def _draw_indices(
+    rng: np.random.Generator,
+    num_samples: int,
+    num_replicates: int
+) -> np.ndarray:
+    """Draw bootstrap resamples as a matrix of sample positions.
+
+    :param rng: Random number generator
+    :type rng: np.random.Generator
+
+    :param num_samples: Number of samples to draw from (with replacement)
+    :type num_samples: int
+
+    :param num_replicates: Number of resamples to draw
+    :type num_replicates: int
+
+    :returns: Array of shape (num_replicates, num_samples) with positions
+    :rtype: np.ndarray
+    """
+    return rng.integers(0, num_samples, size=(num_replicates, num_samples))
+
+
+def _seed_sequence(random_state=None) -> np.random.SeedSequence:
+    """Get a SeedSequence from a seed, SeedSequence, or None.
+
+    A given SeedSequence is copied so spawning from the result never
+    changes it, and reusing it reproduces the same streams.
+
+    :param random_state: Seed for random number generation. If None, fresh
+        entropy is used.
+    :type random_state: int or np.random.SeedSequence
+
+    :returns: Seed sequence to spawn independent streams from
+    :rtype: np.random.SeedSequence
+    """
+    if isinstance(random_state, np.random.SeedSequence):
+        return np.random.SeedSequence(
+            entropy=random_state.entropy,
+            spawn_key=random_state.spawn_key,
+            pool_size=random_state.pool_size,
+            n_children_spawned=random_state.n_children_spawned
+        )
+    return np.random.SeedSequence(random_state)
+
+
+def _bootstrap_batch(
+    replicate_func: Callable,
+    num_samples: int,
+    num_replicates: int,
+    seed: np.random.SeedSequence
+) -> np.ndarray:
+    """Compute one batch of bootstrap replicates from its own stream."""
+    rng = np.random.default_rng(seed)
+    draws = _draw_indices(rng, num_samples, num_replicates)
+    return replicate_func(draws)
+
+
+def _iter_bootstrap_batches(
+    replicate_func: Callable,
+    num_samples: int,
+    iterations: int,
+    batch_size: int,
+    random_state=None,
+    n_jobs: int = None,
+    parallel_args: dict = None
+):
+    """Yield batches of bootstrap replicates in order.
+
+    Batch i always holds replicates batch_size * i onwards and draws from
+    the i-th stream spawned from random_state, so the sequence of batches
+    does not depend on n_jobs. Batches are dispatched to workers in waves
+    of one batch per worker.
+
+    :param replicate_func: Function taking an array of shape
+        (batch, num_samples) of sample positions and returning an array
+        with the statistic of each row along the first axis
+    :type replicate_func: Callable
+
+    :param num_samples: Number of samples to resample
+    :type num_samples: int
+
+    :param iterations: Total number of bootstrap replicates
+    :type iterations: int
+
+    :param batch_size: Max number of replicates to draw at once
+    :type batch_size: int
+
+    :param random_state: Seed or SeedSequence for resampling, defaults to
+        None (fresh entropy)
+    :type random_state: int or np.random.SeedSequence
+
+    :param n_jobs: Number of jobs to run in parallel, defaults to None
+        (single CPU)
+    :type n_jobs: int
+
+    :param parallel_args: Dictionary of arguments to be passed into
+        joblib.Parallel
+    :type parallel_args: dict
+
+    :returns: Generator of replicate arrays
+    :rtype: Generator[np.ndarray]
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be >= 1.")
+    if parallel_args is None:
+        parallel_args = dict()
+
+    seed_seq = _seed_sequence(random_state)
+    sizes = [
+        min(batch_size, iterations - start)
+        for start in range(0, iterations, batch_size)
+    ]
+    wave_size = effective_n_jobs(n_jobs)
+    with Parallel(n_jobs=n_jobs, **parallel_args) as parallel:
+        for start in range(0, len(sizes), wave_size):
+            wave_sizes = sizes[start:start+wave_size]
+            seeds = seed_seq.spawn(len(wave_sizes))
+            batches = parallel(
+                delayed(_bootstrap_batch)(replicate_func, num_samples,
+                                          size, seed)
+                for size, seed in zip(wave_sizes, seeds)
+            )
+            yield from batches
+
+
+def _batched_bootstrap(
+    replicate_func: Callable,
+    num_samples: int,
+    iterations: int,
+    batch_size: int,
+    random_state=None,
+    sketch_size: int = None,
+    n_jobs: int = None,
+    parallel_args: dict = None,
+    tolerance: float = None,
+    deadline: float = None
+) -> Union[np.ndarray, QuantileSketch]:
+    """Compute bootstrap replicates in batches of resampled positions.
+
+    Results are identical for any n_jobs given the same random_state and
+    batch_size unless a deadline is hit.
+
+    :param replicate_func: Function taking an array of shape
+        (batch, num_samples) of sample positions and returning an array
+        with the statistic of each row along the first axis
+    :type replicate_func: Callable
+
+    :param num_samples: Number of samples to resample
+    :type num_samples: int
+
+    :param iterations: Total number of bootstrap replicates. Max number of
+        replicates if tolerance or deadline are provided.
+    :type iterations: int
+
+    :param batch_size: Max number of replicates to draw at once. Bounds
+        memory usage to roughly batch_size * num_samples positions per job.
+    :type batch_size: int
+
+    :param random_state: Seed or SeedSequence for resampling, defaults to
+        None (fresh entropy)
+    :type random_state: int or np.random.SeedSequence
+
+    :param sketch_size: If provided, fold each batch into a QuantileSketch
+        of this size instead of keeping every replicate, defaults to None
+    :type sketch_size: int
+
+    :param n_jobs: Number of jobs to run in parallel, defaults to None
+        (single CPU)
+    :type n_jobs: int
+
+    :param parallel_args: Dictionary of arguments to be passed into
+        joblib.Parallel
+    :type parallel_args: dict
+
+    :param tolerance: If provided, stop once no endpoint of the 95%
+        percentile interval moves by more than this after a batch,
+        defaults to None
+    :type tolerance: float
+
+    :param deadline: If provided, stop after the first batch that finishes
+        more than this many seconds after starting, defaults to None
+    :type deadline: float
+
+    :returns: Bootstrapped statistic for each replicate or a sketch of them
+    :rtype: np.ndarray or evident.bootstrap.QuantileSketch
+    """
+    start_time = time.monotonic()
+    batches = _iter_bootstrap_batches(
+        replicate_func=replicate_func,
+        num_samples=num_samples,
+        iterations=iterations,
+        batch_size=batch_size,
+        random_state=random_state,
+        n_jobs=n_jobs,
+        parallel_args=parallel_args
+    )
+
+    boot = QuantileSketch(sketch_size) if sketch_size is not None else []
+    prev_interval = None
+    for batch in batches:
+        if sketch_size is not None:
+            boot.update(batch)
+        else:
+            boot.append(batch)
+
+        if deadline is not None:
+            if time.monotonic() - start_time > deadline:
+                break
+        if tolerance is not None:
+            interval = _bootstrap_quantiles(
+                boot if sketch_size is not None else np.concatenate(boot),
+                [0.025, 0.975]
+            )
+            if prev_interval is not None:
+                with np.errstate(invalid="ignore"):
+                    change = np.abs(interval - prev_interval)
+                if np.nanmax(change) < tolerance:
+                    break
+            prev_interval = interval
+    batches.close()
+
+    if sketch_size is not None:
+        return boot
+    return np.concatenate(boot)
+
+
+def _num_replicates(boot: Union[np.ndarray, QuantileSketch]) -> int:
+    """Get number of bootstrap replicates computed."""
+    if isinstance(boot, QuantileSketch):
+        return boot.count
+    return boot.shape[0]
+
+
+def _bootstrap_quantiles(
+    boot: Union[np.ndarray, QuantileSketch],
+    q: List[float]
+) -> np.ndarray:
+    """Get quantiles of bootstrap replicates ignoring NaN replicates.
+
+    :param boot: Replicates along the first axis or a sketch of them
+    :type boot: np.ndarray or evident.bootstrap.QuantileSketch
+
+    :param q: Quantiles to compute, between 0 and 1
+    :type q: List[float]
+
+    :returns: Quantiles of replicates
+    :rtype: np.ndarray
+    """
+    if isinstance(boot, QuantileSketch):
+        return boot.quantile(q)
+    return np.nanquantile(boot, q, axis=0)
+
+
+def _bootstrap_cdf(
+    boot: Union[np.ndarray, QuantileSketch],
+    x: np.ndarray
+) -> np.ndarray:
+    """Get fraction of non-NaN bootstrap replicates below x."""
+    if isinstance(boot, QuantileSketch):
+        return boot.cdf(x)
+    below = (boot < x).sum(axis=0)
+    return below / (~np.isnan(boot)).sum(axis=0)
+
+
+def _elementwise_quantiles(
+    boot: Union[np.ndarray, QuantileSketch],
+    q: np.ndarray
+) -> np.ndarray:
+    """Get quantiles of replicates with different levels per element.
+
+    :param boot: Replicates along the first axis or a sketch of them
+    :type boot: np.ndarray or evident.bootstrap.QuantileSketch
+
+    :param q: Array of shape (num_quantiles, *statistic_shape) with the
+        quantiles to compute for each element of the statistic
+    :type q: np.ndarray
+
+    :returns: Quantiles with the same shape as q
+    :rtype: np.ndarray
+    """
+    flat_q = q.reshape(q.shape[0], -1)
+    result = np.full(flat_q.shape, np.nan)
+    if not isinstance(boot, QuantileSketch):
+        boot = boot.reshape(boot.shape[0], -1)
+
+    for i in range(flat_q.shape[1]):
+        if np.isnan(flat_q[:, i]).any():
+            continue
+        if isinstance(boot, QuantileSketch):
+            quants = boot.quantile(flat_q[:, i])
+            result[:, i] = quants.reshape(quants.shape[0], -1)[:, i]
+        else:
+            result[:, i] = np.nanquantile(boot[:, i], flat_q[:, i])
+    return result.reshape(q.shape)
+
+
+def _bca_interval(
+    boot: Union[np.ndarray, QuantileSketch],
+    estimate: np.ndarray,
+    jackknife: np.ndarray,
+    alpha: float = 0.05
+) -> np.ndarray:
+    """Compute bias-corrected and accelerated bootstrap interval.
+
+    Efron, B. (1987). Better Bootstrap Confidence Intervals. JASA 82(397).
+
+    :param boot: Replicates along the first axis or a sketch of them
+    :type boot: np.ndarray or evident.bootstrap.QuantileSketch
+
+    :param estimate: Statistic computed on the original data
+    :type estimate: float or np.ndarray
+
+    :param jackknife: Leave-one-out statistics along the first axis
+    :type jackknife: np.ndarray
+
+    :param alpha: Significance level of the interval, defaults to 0.05
+    :type alpha: float
+
+    :returns: Lower and upper endpoints along the first axis
+    :rtype: np.ndarray
+    """
+    estimate = np.asarray(estimate, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bias = stats.norm.ppf(_bootstrap_cdf(boot, estimate))
+
+        diffs = np.nanmean(jackknife, axis=0) - jackknife
+        numerator = np.nansum(np.power(diffs, 3), axis=0)
+        denominator = 6 * np.power(np.nansum(np.power(diffs, 2), axis=0),
+                                   1.5)
+        accel = np.where(denominator > 0, numerator / denominator, 0)
+
+        z = stats.norm.ppf([alpha / 2, 1 - alpha / 2])
+        z = z.reshape((2, ) + (1, ) * estimate.ndim)
+        adjusted_q = stats.norm.cdf(
+            bias + (bias + z) / (1 - accel * (bias + z))
+        )
+    return _elementwise_quantiles(boot, adjusted_q)
+
+
+def _check_ci_method(ci_method: str, valid_methods: List[str]) -> None:
+    """Check that a confidence interval method is supported."""
+    if ci_method not in valid_methods:
+        valid_msg = ", ".join(f"'{x}'" for x in valid_methods)
+        raise ValueError(f"ci_method must be one of {valid_msg}.")
@@ -0,0 +1,185 @@
+from functools import partial
+import hashlib
+import mmap
+import os
+import pickle
+import sys
+import tempfile
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from . import __version__
+
+
+class ResultCache:
+    """Content-addressed on-disk cache of analysis results.
+
+    Results are pickled to files named by a hash of everything they depend
+    on, so the same analysis of the same data is computed only once across
+    processes. Least recently used files are removed once the cache grows
+    past max_bytes.
+
+    :param directory: Directory to store results in, created if missing
+    :type directory: str
+
+    :param max_bytes: Max total size of stored results in bytes, defaults
+        to 1 GiB
+    :type max_bytes: int
+    """
+    def __init__(self, directory: str, max_bytes: int = 2 ** 30):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be > 0.")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, *parts) -> str:
+        """Get the hash of a sequence of values.
+
+        Arrays and pandas objects are hashed by content. Dictionaries are
+        hashed independently of insertion order. Callables are hashed by
+        import path. The evident version is part of every key so results
+        are not reused across versions.
+
+        :returns: Hex digest identifying parts
+        :rtype: str
+
+        :raises TypeError: If a callable in parts cannot be imported by name
+        """
+        token = _tokenize((__version__, parts))
+        return hashlib.sha256(repr(token).encode()).hexdigest()
+
+    def get_or_compute(self, key: str, func: Callable) -> Any:
+        """Get stored result of key, computing and storing it if missing.
+
+        :param key: Key from ResultCache.key
+        :type key: str
+
+        :param func: Function of no arguments computing the result
+        :type func: Callable
+
+        :returns: Result of key
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                result = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            pass
+        else:
+            # Track recency of use for eviction
+            os.utime(path)
+            return result
+
+        result = func()
+        self._write(path, result)
+        self._evict()
+        return result
+
+    def clear(self):
+        """Remove all stored results."""
+        for path, _, _ in self._entries():
+            _remove(path)
+
+    def size(self) -> int:
+        """Get total size of stored results in bytes."""
+        return sum(size for _, size, _ in self._entries())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def _write(self, path: str, result: Any):
+        # Write to a temporary file first so concurrent readers never see
+        #     a partially written result.
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except BaseException:
+            _remove(tmp_path)
+            raise
+
+    def _entries(self):
+        """Get path, size, and last use time of each stored result."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".pkl"):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evict(self):
+        """Remove least recently used results until under max_bytes."""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in sorted(entries, key=lambda x: x[2]):
+            if total <= self.max_bytes:
+                break
+            _remove(path)
+            total -= size
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _tokenize(obj: Any):
+    """Convert a value into a nested tuple whose repr identifies it."""
+    if isinstance(obj, np.memmap) and isinstance(obj.base, mmap.mmap):
+        # Identify whole memory-mapped files by their stats rather than
+        #     reading them. Views are hashed by content.
+        stat = os.stat(obj.filename)
+        return ("memmap", obj.filename, obj.offset, obj.dtype.str, obj.shape,
+                stat.st_size, stat.st_mtime_ns)
+    if isinstance(obj, np.ndarray):
+        if obj.dtype == np.dtype("object"):
+            return _tokenize(pd.Series(obj.ravel()))
+        obj = np.ascontiguousarray(obj)
+        digest = hashlib.sha256(obj.view(np.uint8)).hexdigest()
+        return ("ndarray", obj.dtype.str, obj.shape, digest)
+    if isinstance(obj, (pd.Series, pd.Index)):
+        hashes = pd.util.hash_pandas_object(obj, index=False).values
+        return (type(obj).__name__, str(obj.dtype), _tokenize(hashes))
+    if isinstance(obj, np.random.SeedSequence):
+        return ("SeedSequence", obj.entropy, tuple(obj.spawn_key),
+                obj.pool_size, obj.n_children_spawned)
+    if isinstance(obj, dict):
+        return ("dict", tuple(sorted(
+            (repr(k), _tokenize(v)) for k, v in obj.items()
+        )))
+    if isinstance(obj, (list, tuple)):
+        return (type(obj).__name__, tuple(_tokenize(x) for x in obj))
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, partial):
+        return ("partial", _tokenize(obj.func), _tokenize(obj.args),
+                _tokenize(obj.keywords))
+    if callable(obj):
+        # The repr of a callable holds its memory address
+        return ("callable", _import_path(obj))
+    return obj
+
+
+def _import_path(obj: Callable) -> str:
+    """Get the path a callable can be imported from.
+
+    :raises TypeError: If obj cannot be imported by name, e.g. a lambda
+    """
+    module = getattr(obj, "__module__", None)
+    qualname = getattr(obj, "__qualname__", "<unknown>")
+    found = sys.modules.get(module)
+    for name in qualname.split("."):
+        found = getattr(found, name, None)
+    if found is not obj:
+        raise TypeError(f"Cannot identify {obj!r} by its import path.")
+    return f"{module}.{qualname}"
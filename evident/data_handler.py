@@ -1,22 +1,40 @@
 from abc import ABC, abstractmethod
-from functools import lru_cache, partial
+from dataclasses import fields
+from functools import partial
 from itertools import product
-from typing import Callable, Iterable, Union
+from typing import Callable, Iterable, Sequence, Union
 from warnings import warn
 
 from joblib import Parallel, delayed
 import numpy as np
 import pandas as pd
-from skbio import DistanceMatrix
+from scipy import sparse
+from scipy.spatial.distance import cdist, pdist
+from skbio import DistanceMatrix, OrdinationResults
 from statsmodels.stats.power import tt_ind_solve_power, FTestAnovaPower
 
 from . import _exceptions as exc
+from .bootstrap import (QuantileSketch, _batched_bootstrap, _bca_interval,
+                        _bootstrap_quantiles, _check_ci_method,
+                        _num_replicates)
+from .cache import ResultCache
+from .distances import CondensedDistances
 from .results import (PowerAnalysisResult, PowerAnalysisResults,
-                      RepeatedMeasuresPowerAnalysisResult, EffectSizeResult)
-from .stats import (calculate_cohens_d, calculate_cohens_f,
+                      RepeatedMeasuresPowerAnalysisResult, EffectSizeResult,
+                      _axis_values, _effect_size_columns)
+from .stats import (GroupStats, calculate_cohens_d, calculate_cohens_f,
                     calculate_pooled_stdev, calculate_eta_squared,
-                    calculate_rm_anova_power)
-from .utils import _listify, _check_sample_overlap
+                    calculate_rm_anova_power, calculate_group_moments,
+                    calculate_pooled_stdev_from_moments,
+                    calculate_cohens_d_from_moments,
+                    calculate_cohens_f_from_moments,
+                    calculate_t_test_power, calculate_anova_power,
+                    calculate_t_test_nobs, calculate_anova_nobs,
+                    calculate_t_test_mdes, calculate_anova_mdes,
+                    calculate_rm_anova_mdes,
+                    _effect_size_from_moments, _analytic_effect_size_ci)
+from .utils import (CacheInfo, _LRUCache, _cached_method, _listify,
+                    _check_sample_overlap, _condensed_index)
 
 
 class _BaseDataHandler(ABC):
@@ -27,7 +45,10 @@ class _BaseDataHandler(ABC):
         metadata: pd.DataFrame = None,
         max_levels_per_category: int = 5,
         min_count_per_level: int = 3,
-        individual_id_column: str = None
+        individual_id_column: str = None,
+        lazy: bool = False,
+        cache_size: int = 128,
+        result_cache: ResultCache = None
     ):
         if min_count_per_level <= 1:
             raise ValueError("min_count_per_level must be > 1.")
@@ -40,44 +61,59 @@ class _BaseDataHandler(ABC):
             self.individual_id_column = individual_id_column
 
         self.data = data
-        metadata = metadata.copy()
-
-        cols_to_drop = []
-        levels_to_drop = dict()
-
-        warn_msg_num_levels = False
-        warn_msg_level_count = False
-        for col in cat_columns:
-            # Drop non-categorical columns
-            if metadata[col].dtype != np.dtype("object"):
-                cols_to_drop.append(col)
-                continue
-
-            # Drop columns with only one level or more than max
-            num_uniq_cols = len(metadata[col].dropna().unique())
-            if max_levels_per_category != -1:
-                if not (1 < num_uniq_cols <= max_levels_per_category):
-                    cols_to_drop.append(col)
-                    warn_msg_num_levels = True
-                    continue
-            else:
-                if not (1 < num_uniq_cols):
-                    cols_to_drop.append(col)
-                    warn_msg_num_levels = True
-                    continue
-
-            # Drop levels that have fewer than min_count_per_level samples
-            level_count = metadata[col].value_counts()
-            under_thresh = level_count[level_count < min_count_per_level]
-            if not under_thresh.empty:
-                levels_under_thresh = list(under_thresh.index)
-                metadata[col].replace(
-                    {x: np.nan for x in levels_under_thresh},
-                    inplace=True
-                )
-                levels_to_drop[col] = levels_under_thresh
-                warn_msg_level_count = True
+        self.max_levels_per_category = max_levels_per_category
+        self.min_count_per_level = min_count_per_level
+        self._metadata = metadata.copy()
+        self._group_stats_cache = dict()
+        self._cache = _LRUCache(cache_size)
+        self.result_cache = result_cache
+        self._data_key = None
+
+        # Integer codes of each kept category in sorted level order are
+        #     kept so all later grouping is integer work.
+        self._level_codes = dict()
+
+        # Columns not yet filtered. In lazy mode a column is filtered the
+        #     first time it is used.
+        self._unvalidated_columns = list(cat_columns)
+        if not lazy:
+            self._validate_columns(self._unvalidated_columns)
+
+    @property
+    def metadata(self) -> pd.DataFrame:
+        """Get filtered sample metadata.
+
+        In lazy mode, any columns that have not been used yet are filtered
+        first.
+        """
+        if self._unvalidated_columns:
+            self._validate_columns(self._unvalidated_columns)
+        return self._metadata
+
+    def _validate_columns(self, columns: list):
+        """Filter columns of metadata that have not been filtered yet.
 
+        Drops columns with too few or too many levels and levels with too
+        few samples, warning about anything dropped, and stores the level
+        codes of kept columns.
+
+        :param columns: Columns to filter
+        :type columns: List[str]
+        """
+        pending = set(self._unvalidated_columns)
+        columns = [col for col in columns if col in pending]
+        if not columns:
+            return
+
+        metadata = self._metadata
+        cols_to_drop, levels_to_drop, level_codes = _filter_categories(
+            metadata, columns, self.max_levels_per_category,
+            self.min_count_per_level
+        )
+        warn_msg_num_levels = any(
+            metadata[col].dtype == np.dtype("object") for col in cols_to_drop
+        )
+        warn_msg_level_count = bool(levels_to_drop)
         if warn_msg_num_levels:
             warn(
                 "Some categories have been dropped because they had either "
@@ -93,12 +129,44 @@ class _BaseDataHandler(ABC):
                 f"Dropped levels: {levels_to_drop}"
             )
 
-        self.metadata = metadata.drop(columns=cols_to_drop)
+        if levels_to_drop:
+            # Masked columns are attached in one step, as assigning them one
+            #     at a time is quadratic in the number of columns.
+            masked = {
+                col: metadata[col].where(level_codes[col][0] != -1)
+                for col in levels_to_drop
+            }
+            kept_columns = metadata.columns.drop(cols_to_drop)
+            self._metadata = pd.DataFrame(
+                {col: masked.get(col, metadata[col]) for col in kept_columns},
+                index=metadata.index,
+                columns=kept_columns
+            )
+        else:
+            self._metadata = metadata.drop(columns=cols_to_drop)
+        self._level_codes.update(level_codes)
+        validated = set(columns)
+        self._unvalidated_columns = [
+            col for col in self._unvalidated_columns if col not in validated
+        ]
+
+    def cache_info(self) -> CacheInfo:
+        """Get hits, misses, evictions, and size of the effect size cache.
+
+        :returns: Cache statistics
+        :rtype: evident.utils.CacheInfo
+        """
+        return self._cache.info()
+
+    def clear_cache(self):
+        """Remove all cached effect sizes and per-level statistics."""
+        self._cache.clear()
+        self._group_stats_cache.clear()
 
     @property
     def samples(self):
         """Get represented samples."""
-        return self.metadata.index.to_list()
+        return self._metadata.index.to_list()
 
     def calculate_effect_size(
         self,
@@ -106,7 +174,14 @@ class _BaseDataHandler(ABC):
         difference: float = None,
         bootstrap_iterations: int = None,
         n_jobs: int = 1,
-        parallel_args: dict = None
+        parallel_args: dict = None,
+        bootstrap_method: str = "resample",
+        batch_size: int = 100,
+        sketch_size: int = None,
+        random_state=None,
+        tolerance: float = None,
+        deadline: float = None,
+        ci_method: str = "percentile"
     ):
         """Get effect size of data differences given column.
 
@@ -126,7 +201,8 @@ class _BaseDataHandler(ABC):
         :type bootstrap_iterations: int
 
         :param n_jobs: Number of jobs to run in parallel for bootstrapping,
-            defaults to None (single CPU)
+            defaults to None (single CPU). Each job computes whole batches of
+            replicates.
         :type n_jobs: int
 
         :param parallel_args: Dictionary of arguments to be passed into
@@ -134,25 +210,231 @@ class _BaseDataHandler(ABC):
             joblib.readthedocs.io/en/latest/generated/joblib.Parallel.html
         :type parallel_args: dict
 
-        :returns: Effect size
+        :param bootstrap_method: How to generate bootstrap replicates, either
+            'resample' (default) or 'vectorized'. 'resample' draws a new
+            metadata table per iteration and de-duplicates the drawn samples.
+            'vectorized' draws sample positions as an integer matrix and
+            computes per-group moments for a batch of replicates at once,
+            keeping duplicated draws. For multivariate data, pairs of draws
+            of the same sample are ignored and every other pair of draws
+            contributes its distance.
+        :type bootstrap_method: str
+
+        :param batch_size: Number of replicates computed per batch, defaults
+            to 100. Memory usage scales with batch_size times the number of
+            samples.
+        :type batch_size: int
+
+        :param sketch_size: If provided, replicates are folded into a
+            bounded-memory
+            evident.bootstrap.QuantileSketch of this size as each batch
+            finishes instead of being stored. The rank of each confidence
+            interval endpoint is then within a fraction
+            (log2(bootstrap_iterations / sketch_size) + 1) / sketch_size of
+            the exact rank. By default all replicates are stored.
+        :type sketch_size: int
+
+        :param random_state: Seed or numpy SeedSequence for resampling.
+            Each batch of replicates draws from its own stream spawned from
+            it, so results are identical for any n_jobs. By default fresh
+            entropy is used.
+        :type random_state: int or np.random.SeedSequence
+
+        :param tolerance: If provided, bootstrap adaptively. Replicates are
+            computed a batch at a time and bootstrapping stops once neither
+            endpoint of the confidence interval changes by more than
+            tolerance after a batch. bootstrap_iterations is then the max
+            number of replicates. By default all iterations are run.
+        :type tolerance: float
+
+        :param deadline: If provided, stop bootstrapping after the first
+            batch that finishes more than this many seconds after starting,
+            defaults to None. Results are then not reproducible.
+        :type deadline: float
+
+        :param ci_method: Type of confidence interval, either 'percentile'
+            (default), 'bca', or 'analytic'. 'percentile' and 'bca' are
+            bootstrap intervals. 'bca' computes bias-corrected and
+            accelerated intervals where the acceleration comes from a
+            jackknife over leave-one-out updates of per-group moments.
+            'analytic' inverts the noncentral t (Cohen's d) or noncentral F
+            (Cohen's f) distribution, or the chi-squared distribution of the
+            pooled variance if difference is provided, treating each sample
+            as one observation. No bootstrapping is done for 'analytic'.
+        :type ci_method: str
+
+        :returns: Effect size. When bootstrapping, iterations holds the
+            number of replicates actually computed.
         :rtype: evident.results.EffectSizeResult
         """
-        if parallel_args is None:
-            parallel_args = dict()
+        _check_ci_method(ci_method, ["percentile", "bca", "analytic"])
 
-        es, metric = self._calculate_effect_size(column, difference)
+        es, metric = self._disk_cached(
+            "effect_size", column, dict(difference=difference),
+            partial(self._calculate_effect_size, column, difference)
+        )
         result = EffectSizeResult(effect_size=es, metric=metric, column=column,
                                   difference=difference)
+        if ci_method == "analytic":
+            level_counts = self._level_sample_counts(column)
+            lower, upper = _analytic_effect_size_ci(
+                [es], [level_counts], difference=difference
+            )
+            result.lower_es = lower.item()
+            result.upper_es = upper.item()
+            result.ci_method = ci_method
+            return result
+
         if bootstrap_iterations is None:
             return result
 
-        metadata_iter = iter(
-            self.metadata.sample(frac=1, replace=True)
-            for i in range(bootstrap_iterations)
+        bootstrap_args = dict(
+            bootstrap_iterations=bootstrap_iterations,
+            batch_size=batch_size,
+            sketch_size=sketch_size,
+            random_state=random_state,
+            tolerance=tolerance,
+            deadline=deadline
         )
+        compute_interval = partial(
+            self._bootstrap_interval, column=column, effect_size=es,
+            difference=difference, bootstrap_method=bootstrap_method,
+            ci_method=ci_method, n_jobs=n_jobs, parallel_args=parallel_args,
+            **bootstrap_args
+        )
+        # Only reproducible intervals are stored on disk
+        if random_state is None or deadline is not None:
+            lower, upper, iterations = compute_interval()
+        else:
+            lower, upper, iterations = self._disk_cached(
+                "bootstrap_interval", column,
+                dict(difference=difference, bootstrap_method=bootstrap_method,
+                     ci_method=ci_method, **bootstrap_args),
+                compute_interval
+            )
+        result.lower_es = lower
+        result.upper_es = upper
+        result.iterations = iterations
+        result.ci_method = ci_method
+
+        return result
+
+    def _bootstrap_interval(
+        self,
+        column: str,
+        effect_size: float,
+        difference: float = None,
+        bootstrap_method: str = "resample",
+        ci_method: str = "percentile",
+        **bootstrap_args
+    ):
+        """Bootstrap a confidence interval of the effect size of a column.
+
+        See calculate_effect_size for parameters.
+
+        :returns: Lower and upper bounds and number of replicates computed
+        :rtype: Tuple[float, float, int]
+        """
+        if bootstrap_method == "vectorized":
+            boot = self._vectorized_bootstrap(
+                column=column,
+                statistic=partial(_effect_size_from_moments,
+                                  difference=difference),
+                **bootstrap_args
+            )
+        elif bootstrap_method == "resample":
+            boot = self._resample_bootstrap(
+                column=column,
+                difference=difference,
+                **bootstrap_args
+            )
+        else:
+            raise ValueError(
+                "bootstrap_method must be either 'resample' or 'vectorized'."
+            )
+
+        if ci_method == "percentile":
+            lower, upper = _bootstrap_quantiles(boot, [0.025, 0.975])
+        else:
+            codes, levels = self._column_codes(column)
+            jack_moments = self._jackknife_group_moments(codes, len(levels))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                jackknife = _effect_size_from_moments(*jack_moments,
+                                                      difference=difference)
+            lower, upper = _bca_interval(boot, effect_size, jackknife)
+        return lower, upper, _num_replicates(boot)
+
+    def _disk_cached(self, name: str, column: str, params: dict,
+                     func: Callable):
+        """Get a result from the on-disk result cache if one is set.
+
+        :param name: Name of the analysis
+        :type name: str
+
+        :param column: Column the analysis uses
+        :type column: str
+
+        :param params: All other arguments the result depends on
+        :type params: dict
+
+        :param func: Function of no arguments computing the result
+        :type func: Callable
+
+        :returns: Result of func
+        """
+        if self.result_cache is None:
+            return func()
+
+        codes, levels = self._column_codes(column)
+        try:
+            if self._data_key is None:
+                self._data_key = self.result_cache.key(
+                    type(self).__name__, self._metadata.index,
+                    self._data_content()
+                )
+            key = self.result_cache.key(name, self._data_key, column, codes,
+                                        levels, params)
+        except TypeError:
+            # Data that cannot be identified across processes, e.g. with a
+            #     lambda as metric, is not cached.
+            return func()
+        return self.result_cache.get_or_compute(key, func)
+
+    @abstractmethod
+    def _data_content(self):
+        """Get data in the order of samples in metadata for hashing."""
+
+    def _level_sample_counts(self, column: str) -> np.ndarray:
+        """Get number of samples in each level of a column.
+
+        :param column: Column containing categories
+        :type column: str
+
+        :returns: Number of samples per level in sorted level order
+        :rtype: np.ndarray
+        """
+        codes, levels = self._column_codes(column)
+        return np.bincount(codes[codes != -1], minlength=len(levels))
 
-        def _bootstrap(metadata):
-            arrays, _, es_func = self._get_values(metadata, column)
+    def _resample_bootstrap(
+        self,
+        column: str,
+        difference: float = None,
+        bootstrap_iterations: int = 100,
+        batch_size: int = 100,
+        sketch_size: int = None,
+        random_state=None,
+        n_jobs: int = None,
+        parallel_args: dict = None,
+        tolerance: float = None,
+        deadline: float = None
+    ) -> Union[np.ndarray, QuantileSketch]:
+        """Bootstrap effect size from de-duplicated resampled metadata.
+
+        See _vectorized_bootstrap for parameters.
+        """
+        def _bootstrap(positions):
+            arrays, _, es_func = self._get_values(column, positions)
 
             if difference is None:
                 boot_result = es_func(*arrays)
@@ -162,19 +444,25 @@ class _BaseDataHandler(ABC):
 
             return boot_result
 
-        boot = Parallel(n_jobs=n_jobs, **parallel_args)(
-            delayed(_bootstrap)(metadata)
-            for metadata in metadata_iter
+        def _replicate_effect_sizes(draws):
+            return np.array([
+                _bootstrap(row) for row in draws
+            ])
+
+        return _batched_bootstrap(
+            replicate_func=_replicate_effect_sizes,
+            num_samples=self._metadata.shape[0],
+            iterations=bootstrap_iterations,
+            batch_size=batch_size,
+            random_state=random_state,
+            sketch_size=sketch_size,
+            n_jobs=n_jobs,
+            parallel_args=parallel_args,
+            tolerance=tolerance,
+            deadline=deadline
         )
 
-        lower, upper = np.quantile(boot, [0.025, 0.975])
-        result.lower_es = lower
-        result.upper_es = upper
-        result.iterations = bootstrap_iterations
-
-        return result
-
-    @lru_cache()
+    @_cached_method
     def _calculate_effect_size(
         self,
         column: str,
@@ -195,25 +483,262 @@ class _BaseDataHandler(ABC):
         :returns: Effect size
         :rtype: evident.results.EffectSizeResult
         """
-        arrays, metric, es_func = self._get_values(self.metadata, column)
+        group_stats = self._group_stats(column)
+        moments = (group_stats.counts, group_stats.means, group_stats.m2)
 
-        if difference is None:
-            result = es_func(*arrays)
-        else:
-            pooled_stdev = calculate_pooled_stdev(*arrays)
+        if difference is not None:
+            pooled_stdev = calculate_pooled_stdev_from_moments(
+                group_stats.counts, group_stats.m2
+            )
             result = difference / pooled_stdev
+        elif group_stats.metric == "cohens_d":
+            result = calculate_cohens_d_from_moments(*moments)
+        else:
+            result = calculate_cohens_f_from_moments(*moments)
+
+        return result, group_stats.metric
+
+    def _group_stats(self, column: str) -> GroupStats:
+        """Get per-level sufficient statistics of a column.
+
+        Computed once per column and reused by every later effect size
+        calculation on it.
+
+        :param column: Column containing categories
+        :type column: str
+
+        :returns: Count, mean, and sum of squared deviations per level
+        :rtype: evident.stats.GroupStats
+        """
+        if column not in self._group_stats_cache:
+            codes, levels = self._column_codes(column)
+            moments = self._group_moments(codes, len(levels))
+            self._group_stats_cache[column] = GroupStats(list(levels),
+                                                         *moments)
+        return self._group_stats_cache[column]
+
+    def _precompute_group_stats(self, columns: list):
+        """Compute per-level sufficient statistics of several columns.
+
+        :param columns: Columns containing categories
+        :type columns: list
+        """
+        for column in columns:
+            self._group_stats(column)
+
+    def _vectorized_bootstrap(
+        self,
+        column: str,
+        statistic: Callable,
+        bootstrap_iterations: int = 100,
+        batch_size: int = 100,
+        sketch_size: int = None,
+        random_state=None,
+        n_jobs: int = None,
+        parallel_args: dict = None,
+        tolerance: float = None,
+        deadline: float = None,
+        deduplicate: bool = False
+    ) -> Union[np.ndarray, QuantileSketch]:
+        """Bootstrap a statistic of per-group moments of resampled data.
+
+        All levels of the column share the same resample in each replicate.
+
+        :param column: Column containing categories
+        :type column: str
+
+        :param statistic: Function taking per-group counts, means, and sums
+            of squared deviations, each of shape (replicates, levels), and
+            returning the statistic of each replicate
+        :type statistic: Callable
+
+        :param bootstrap_iterations: Number of bootstrap replicates
+        :type bootstrap_iterations: int
+
+        :param batch_size: Number of replicates to compute at once
+        :type batch_size: int
+
+        :param sketch_size: If provided, fold replicates into a quantile
+            sketch of this size instead of storing them, defaults to None
+        :type sketch_size: int
+
+        :param random_state: Seed or SeedSequence for resampling, defaults
+            to None (fresh entropy)
+        :type random_state: int or np.random.SeedSequence
+
+        :param n_jobs: Number of jobs to run in parallel, defaults to None
+            (single CPU)
+        :type n_jobs: int
+
+        :param parallel_args: Dictionary of arguments to be passed into
+            joblib.Parallel
+        :type parallel_args: dict
+
+        :param tolerance: If provided, stop once no endpoint of the
+            confidence interval changes by more than this after a batch
+        :type tolerance: float
 
-        return result, metric
+        :param deadline: If provided, stop after the first batch finishing
+            more than this many seconds after starting
+        :type deadline: float
 
-    def _get_values(self, metadata: pd.DataFrame, column: str):
-        if metadata[column].dtype != np.dtype("object"):
-            raise exc.NonCategoricalColumnError(metadata[column])
+        :param deduplicate: Whether to use samples drawn more than once in a
+            replicate only once, as bootstrap_method 'resample' does,
+            defaults to False. Replicates are then computed one at a time.
+        :type deduplicate: bool
 
-        column_choices = metadata[column].dropna().unique()
-        num_choices = len(column_choices)
+        :returns: Statistic of each replicate or a sketch of them.
+            Replicates where a group has too few samples are NaN.
+        :rtype: np.ndarray or evident.bootstrap.QuantileSketch
+        """
+        codes, levels = self._column_codes(column)
+
+        def _replicate_moments(draws):
+            if not deduplicate:
+                return self._replicate_group_moments(codes, len(levels),
+                                                     draws)
+            # De-duplicated replicates have different numbers of samples
+            moments = [
+                self._replicate_group_moments(
+                    codes, len(levels), pd.unique(row)[np.newaxis]
+                )
+                for row in draws
+            ]
+            return tuple(np.concatenate(x) for x in zip(*moments))
+
+        def _replicate_statistic(draws):
+            counts, means, m2 = _replicate_moments(draws)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return statistic(counts, means, m2)
+
+        return _batched_bootstrap(
+            replicate_func=_replicate_statistic,
+            num_samples=len(codes),
+            iterations=bootstrap_iterations,
+            batch_size=batch_size,
+            random_state=random_state,
+            sketch_size=sketch_size,
+            n_jobs=n_jobs,
+            parallel_args=parallel_args,
+            tolerance=tolerance,
+            deadline=deadline
+        )
+
+    def _column_codes(self, column: str):
+        """Get integer level codes of a column in sorted level order.
+
+        :param column: Column containing categories
+        :type column: str
+
+        :returns: Code of each sample (-1 if missing) and the levels
+        :rtype: Tuple[np.ndarray, pd.Index]
+        """
+        self._validate_columns([column])
+        if column not in self._level_codes:
+            if self._metadata[column].dtype != np.dtype("object"):
+                raise exc.NonCategoricalColumnError(self._metadata[column])
+            self._level_codes[column] = pd.factorize(self._metadata[column],
+                                                     sort=True)
+
+        codes, levels = self._level_codes[column]
+        if len(levels) < 2:
+            if len(levels) == 0:
+                # Every level was dropped, only missing values remain
+                raise exc.NonCategoricalColumnError(
+                    self._metadata[column].astype(float)
+                )
+            raise exc.OnlyOneCategoryError(self._metadata[column])
+        return codes, levels
+
+    @abstractmethod
+    def _replicate_group_moments(
+        self,
+        codes: np.ndarray,
+        num_levels: int,
+        draws: np.ndarray
+    ):
+        """Get per-group moments for each row of resampled positions.
+
+        :param codes: Integer level of each sample in metadata, -1 if missing
+        :type codes: np.ndarray
+
+        :param num_levels: Number of levels in column
+        :type num_levels: int
+
+        :param draws: Array of shape (replicates, samples) with positions
+            into metadata
+        :type draws: np.ndarray
+
+        :returns: Counts, means, and sums of squared deviations, each of
+            shape (replicates, num_levels)
+        :rtype: Tuple[np.ndarray, np.ndarray, np.ndarray]
+        """
+
+    @abstractmethod
+    def _group_moments(self, codes: np.ndarray, num_levels: int):
+        """Get per-group moments of the data.
+
+        :param codes: Integer level of each sample in metadata, -1 if missing
+        :type codes: np.ndarray
+
+        :param num_levels: Number of levels in column
+        :type num_levels: int
+
+        :returns: Counts, means, and sums of squared deviations, each of
+            shape (num_levels, )
+        :rtype: Tuple[np.ndarray, np.ndarray, np.ndarray]
+        """
+
+    @abstractmethod
+    def _jackknife_group_moments(self, codes: np.ndarray, num_levels: int):
+        """Get per-group moments leaving out each sample in turn.
+
+        Only samples with a level are left out as the others do not affect
+        any group.
+
+        :param codes: Integer level of each sample in metadata, -1 if missing
+        :type codes: np.ndarray
+
+        :param num_levels: Number of levels in column
+        :type num_levels: int
+
+        :returns: Counts, means, and sums of squared deviations, each of
+            shape (samples with a level, num_levels) where row i leaves out
+            the i-th sample with a level
+        :rtype: Tuple[np.ndarray, np.ndarray, np.ndarray]
+        """
+
+    def _get_values(self, column: str, positions: np.ndarray = None):
+        """Get data of each level of a column among a subset of samples.
+
+        :param column: Column containing categories
+        :type column: str
+
+        :param positions: Positions into metadata of the samples to use,
+            defaults to all samples. Duplicated positions are only used
+            once.
+        :type positions: np.ndarray
+
+        :returns: Data per level in order of first appearance, metric, and
+            effect size function
+        :rtype: Tuple[List[np.ndarray], str, Callable]
+        """
+        codes, _ = self._column_codes(column)
+        if positions is None:
+            positions = np.arange(len(codes))
+        else:
+            # De-duplicate so bootstrapping doesn't result in duplicate IDs.
+            #     Keeps order of first appearance so results don't depend
+            #     on string hashing.
+            positions = pd.unique(positions)
+        positions = positions[codes[positions] != -1]
+        position_codes = codes[positions]
+
+        level_order = pd.unique(position_codes)
+        num_choices = len(level_order)
 
         if num_choices == 1:
-            raise exc.OnlyOneCategoryError(metadata[column])
+            raise exc.OnlyOneCategoryError(self._metadata[column])
         elif num_choices == 2:
             effect_size_func = calculate_cohens_d
             metric = "cohens_d"
@@ -223,9 +748,8 @@ class _BaseDataHandler(ABC):
 
         # Create list of arrays for effect size calculation
         arrays = []
-        for choice in column_choices:
-            # Set-ify so bootstrapping doesn't result in duplicate IDs
-            ids = list(set(metadata[metadata[column] == choice].index))
+        for level in level_order:
+            ids = self._metadata.index[positions[position_codes == level]]
             values = self.subset_values(ids)
             arrays.append(values)
 
@@ -238,11 +762,13 @@ class _BaseDataHandler(ABC):
         difference: float = None,
         alpha: float = None,
         power: float = None,
-        bootstrap_iterations: int = None
+        bootstrap_iterations: int = None,
+        mdes: bool = False
     ) -> Union[PowerAnalysisResult, PowerAnalysisResults]:
         """Perform power analysis using this dataset.
 
-        Exactly one of total_observations, alpha, or power must be None.
+        Exactly one of total_observations, alpha, or power must be None
+        unless solving for the minimum detectable effect size.
 
         Arguments can be either single values or sequences of values. If a
             sequence of values is passed for any parameter, power calculations
@@ -271,43 +797,88 @@ class _BaseDataHandler(ABC):
             bootstrapping.
         :type bootstrap_iterations: int
 
+        :param mdes: Whether to solve for the minimum detectable effect size,
+            defaults to False. total_observations, alpha, and power must all
+            be provided and difference must be None. The effect size of
+            each result is the smallest Cohen's d or f detected with the
+            given power, and its difference is that effect size times the
+            pooled standard deviation of the data.
+        :type mdes: bool
+
         :returns: Results from power analysis
         :rtype: evident.results.PowerAnalysisResults
         """
         args = [alpha, power, total_observations]
         none_args = [x is None for x in args]
-        if sum(none_args) != 1:  # Check to make sure exactly one arg is None
+        if mdes:
+            if any(none_args):
+                raise ValueError(
+                    "alpha, power, and total_observations must all be "
+                    "provided to solve for the minimum detectable effect "
+                    "size."
+                )
+            if difference is not None:
+                raise ValueError(
+                    "difference cannot be provided when solving for the "
+                    "minimum detectable effect size."
+                )
+        elif sum(none_args) != 1:  # Check to make sure exactly one arg is None
             raise exc.WrongPowerArguments(*args)
 
+        compute = partial(
+            self._power_analysis, column=column,
+            total_observations=total_observations, difference=difference,
+            alpha=alpha, power=power,
+            bootstrap_iterations=bootstrap_iterations, mdes=mdes
+        )
+        # Bootstrapped power analyses are not reproducible so not stored
+        if bootstrap_iterations is not None:
+            return compute()
+        return self._disk_cached(
+            "power_analysis", column,
+            dict(total_observations=total_observations, difference=difference,
+                 alpha=alpha, power=power, mdes=mdes),
+            compute
+        )
+
+    def _power_analysis(
+        self,
+        column: str,
+        total_observations: int = None,
+        difference: float = None,
+        alpha: float = None,
+        power: float = None,
+        bootstrap_iterations: int = None,
+        mdes: bool = False
+    ) -> Union[PowerAnalysisResult, PowerAnalysisResults]:
+        """Perform power analysis on validated arguments.
+
+        See power_analysis for parameters.
+        """
         # If any of the arguments are iterable, perform power analysis on
         #     all possible argument combinations. Otherwise, perform a single
-        #     power analysis to solve for the non-provided argument.
+        #     power analysis to solve for the non-provided argument. Both
+        #     go through the same vectorized path so results agree exactly.
+        args = [alpha, power, total_observations, difference]
         vector_args = map(lambda x: isinstance(x, Iterable), args)
-        if any(vector_args):
-            result = self._bulk_power_analysis(
+        if mdes:
+            result = self._mdes_power_analysis(
                 column=column,
                 total_observations=total_observations,
-                difference=difference,
                 alpha=alpha,
-                power=power,
-                bootstrap_iterations=bootstrap_iterations
+                power=power
             )
         else:
-            effect_size_result = self.calculate_effect_size(
+            result = self._bulk_power_analysis(
                 column=column,
-                difference=difference,
-                bootstrap_iterations=bootstrap_iterations
-            )
-            power_func = self._create_partial_power_func(
-                column=column, total_observations=total_observations
-            )
-            result = self._single_power_analysis(
-                power_func=power_func,
-                effect_size_result=effect_size_result,
                 total_observations=total_observations,
+                difference=difference,
                 alpha=alpha,
-                power=power
+                power=power,
+                bootstrap_iterations=bootstrap_iterations
             )
+        if not any(vector_args):
+            result = result[0]
 
         return result
 
@@ -415,15 +986,55 @@ class _BaseDataHandler(ABC):
         power = _listify(power)
         power_args = [alpha, power]
 
-        # Since we re-use the products, convert to list instead of generator
-        power_arg_products = list(product(*power_args))
-        results_list = []
-        for _diff in difference:
-            effect_size_result = self.calculate_effect_size(
+        effect_size_results = [
+            self.calculate_effect_size(
                 column=column,
                 difference=_diff,
                 bootstrap_iterations=bootstrap_iterations
             )
+            for _diff in difference
+        ]
+
+        # Power has a closed form so the whole grid is computed at once
+        if power == [None]:
+            effect_sizes = np.array(
+                [x.effect_size for x in effect_size_results], dtype=float
+            )
+            powers = self._calculate_power(
+                column=column,
+                effect_size=effect_sizes[:, None, None],
+                total_observations=np.asarray(total_observations,
+                                              dtype=float)[None, :, None],
+                alpha=np.asarray(alpha, dtype=float)[None, None, :]
+            )
+            dims = dict(difference=difference,
+                        total_observations=total_observations, alpha=alpha)
+            return _power_grid_results(
+                dims, dict(power=powers),
+                _effect_size_axis_columns(effect_size_results, len(dims))
+            )
+
+        # Required observations are solved for the whole grid at once
+        if total_observations == [None]:
+            effect_sizes = np.array(
+                [x.effect_size for x in effect_size_results], dtype=float
+            )
+            observations = self._calculate_total_observations(
+                column=column,
+                effect_size=effect_sizes[:, None, None],
+                alpha=np.asarray(alpha, dtype=float)[None, :, None],
+                power=np.asarray(power, dtype=float)[None, None, :]
+            )
+            dims = dict(difference=difference, alpha=alpha, power=power)
+            return _power_grid_results(
+                dims, dict(total_observations=observations),
+                _effect_size_axis_columns(effect_size_results, len(dims))
+            )
+
+        # Since we re-use the products, convert to list instead of generator
+        power_arg_products = list(product(*power_args))
+        results_list = []
+        for effect_size_result in effect_size_results:
             for _obs in total_observations:
                 power_func = self._create_partial_power_func(
                     column=column, total_observations=_obs
@@ -439,6 +1050,127 @@ class _BaseDataHandler(ABC):
 
         return PowerAnalysisResults(results_list)
 
+    def _mdes_power_analysis(
+        self,
+        column: str,
+        total_observations: int,
+        alpha: float,
+        power: float
+    ) -> PowerAnalysisResults:
+        """Solve for the minimum detectable effect size over a grid.
+
+        :param column: Name of column in metadata to consider
+        :type column: str
+
+        :param total_observations: Total numbers of observations
+        :type total_observations: int or sequence of ints
+
+        :param alpha: Significance levels
+        :type alpha: float or sequence of floats
+
+        :param power: Power levels
+        :type power: float or sequence of floats
+
+        :returns: Collection of values from power analyses
+        :rtype: evident.results.PowerAnalysisResults
+        """
+        total_observations = _listify(total_observations)
+        alpha = _listify(alpha)
+        power = _listify(power)
+
+        _, levels = self._column_codes(column)
+        grid = dict(
+            alpha=np.asarray(alpha, dtype=float)[None, :, None],
+            power=np.asarray(power, dtype=float)[None, None, :]
+        )
+        observations = np.asarray(total_observations,
+                                  dtype=float)[:, None, None]
+        if len(levels) == 2:
+            metric = "cohens_d"
+            effect_sizes = calculate_t_test_mdes(nobs1=observations / 2,
+                                                 **grid)
+        else:
+            metric = "cohens_f"
+            effect_sizes = calculate_anova_mdes(nobs=observations,
+                                                k_groups=len(levels), **grid)
+        pooled_stdev = self._group_stats(column).pooled_stdev()
+
+        dims = dict(total_observations=total_observations, alpha=alpha,
+                    power=power)
+        return _power_grid_results(dims, dict(), dict(
+            effect_size=effect_sizes,
+            metric=np.array(metric),
+            column=np.array(column),
+            difference=effect_sizes * pooled_stdev
+        ))
+
+    def _calculate_power(
+        self,
+        column: str,
+        effect_size: np.ndarray,
+        total_observations: np.ndarray,
+        alpha: np.ndarray
+    ) -> np.ndarray:
+        """Calculate power over broadcast arrays of arguments.
+
+        Uses a t-test for columns with two levels and a one-way ANOVA
+        otherwise, assuming groups of equal size.
+
+        :param column: Name of column in metadata to consider
+        :type column: str
+
+        :param effect_size: Cohen's d or f
+        :type effect_size: np.ndarray
+
+        :param total_observations: Total number of observations
+        :type total_observations: np.ndarray
+
+        :param alpha: Significance level
+        :type alpha: np.ndarray
+
+        :returns: Power of each combination of arguments
+        :rtype: np.ndarray
+        """
+        _, levels = self._column_codes(column)
+        if len(levels) == 2:
+            return calculate_t_test_power(effect_size,
+                                          total_observations / 2, alpha)
+        return calculate_anova_power(effect_size, total_observations, alpha,
+                                     len(levels))
+
+    def _calculate_total_observations(
+        self,
+        column: str,
+        effect_size: np.ndarray,
+        alpha: np.ndarray,
+        power: np.ndarray
+    ) -> np.ndarray:
+        """Calculate required total observations over broadcast arguments.
+
+        For t-tests the observations per group are rounded up and doubled
+        to give the total.
+
+        :param column: Name of column in metadata to consider
+        :type column: str
+
+        :param effect_size: Cohen's d or f
+        :type effect_size: np.ndarray
+
+        :param alpha: Significance level
+        :type alpha: np.ndarray
+
+        :param power: Target power
+        :type power: np.ndarray
+
+        :returns: Total observations of each combination of arguments
+        :rtype: np.ndarray
+        """
+        _, levels = self._column_codes(column)
+        if len(levels) == 2:
+            nobs1 = calculate_t_test_nobs(effect_size, alpha, power)
+            return np.ceil(nobs1) * 2
+        return calculate_anova_nobs(effect_size, alpha, power, len(levels))
+
     @abstractmethod
     def subset_values(self, ids: list):
         """Get subset of data given list of indices"""
@@ -467,15 +1199,10 @@ class _BaseDataHandler(ABC):
         :returns: Stem of power function based on chosen column
         :rtype: partial function
         """
-        if self.metadata[column].dtype != np.dtype("object"):
-            raise exc.NonCategoricalColumnError(self.metadata[column])
+        _, levels = self._column_codes(column)
+        num_choices = len(levels)
 
-        column_choices = self.metadata[column].dropna().unique()
-        num_choices = len(column_choices)
-
-        if num_choices == 1:
-            raise exc.OnlyOneCategoryError(self.metadata[column])
-        elif num_choices == 2:
+        if num_choices == 2:
             # tt_ind_solve_power uses observations per group
             if total_observations is not None:
                 total_observations = total_observations / 2
@@ -496,6 +1223,67 @@ class _BaseDataHandler(ABC):
         return power_func
 
 
+def _filter_categories(
+    metadata: pd.DataFrame,
+    columns: Iterable,
+    max_levels_per_category: int,
+    min_count_per_level: int
+):
+    """Find columns and levels of metadata to drop in a single pass.
+
+    Each categorical column is factorized once, its level counts come from
+    a bincount over its codes, and the codes of kept levels are renumbered
+    without refactorizing. Columns are processed one at a time and codes
+    are stored in the narrowest integer type that fits their levels, so
+    memory use does not scale with the number of columns.
+
+    :param metadata: Sample metadata
+    :type metadata: pd.DataFrame
+
+    :param columns: Columns to consider
+    :type columns: Iterable[str]
+
+    :param max_levels_per_category: Max number of levels in a category to
+        keep, -1 to not drop anything
+    :type max_levels_per_category: int
+
+    :param min_count_per_level: Min number of samples in a level to keep
+    :type min_count_per_level: int
+
+    :returns: Columns to drop, levels to drop per column in order of
+        decreasing count, and codes and levels of each kept column after
+        dropping levels
+    :rtype: Tuple[list, dict, dict]
+    """
+    levels_to_drop = dict()
+    level_codes = dict()
+    for col in columns:
+        if metadata[col].dtype != np.dtype("object"):
+            continue
+        codes, levels = pd.factorize(metadata[col], sort=True)
+        num_levels = len(levels)
+        if num_levels < 2 or (max_levels_per_category != -1
+                              and num_levels > max_levels_per_category):
+            continue
+
+        level_counts = np.bincount(codes[codes != -1], minlength=num_levels)
+        keep_level = level_counts >= min_count_per_level
+        if not keep_level.all():
+            order = np.argsort(-level_counts, kind="stable")
+            levels_to_drop[col] = [
+                levels[i] for i in order if not keep_level[i]
+            ]
+
+        # Renumber kept levels. The last entry maps missing values (-1).
+        dtype = np.min_scalar_type(-num_levels)
+        new_codes = np.full(num_levels + 1, -1, dtype=dtype)
+        new_codes[:-1][keep_level] = np.arange(keep_level.sum())
+        level_codes[col] = (new_codes[codes], levels[keep_level])
+
+    cols_to_drop = [col for col in columns if col not in level_codes]
+    return cols_to_drop, levels_to_drop, level_codes
+
+
 class UnivariateDataHandler(_BaseDataHandler):
     def __init__(
         self,
@@ -503,6 +1291,9 @@ class UnivariateDataHandler(_BaseDataHandler):
         metadata: pd.DataFrame,
         max_levels_per_category: int = 5,
         min_count_per_level: int = 3,
+        lazy: bool = False,
+        cache_size: int = 128,
+        result_cache: ResultCache = None,
         **kwargs
     ):
         """Handler for univariate data.
@@ -523,6 +1314,22 @@ class UnivariateDataHandler(_BaseDataHandler):
             level to keep. Any levels that have fewer than this many samples
             will not be saved, defaults to 3. Must be > 1.
         :type min_count_per_level: int
+
+        :param lazy: Whether to filter each column the first time it is
+            used rather than all columns up front, defaults to False.
+            Accessing metadata filters all remaining columns.
+        :type lazy: bool
+
+        :param cache_size: Max number of effect sizes to cache, defaults to
+            128. None means unbounded and 0 disables caching. See
+            cache_info and clear_cache.
+        :type cache_size: int
+
+        :param result_cache: If provided, bootstrap intervals with a fixed
+            random_state and power analyses without bootstrapping are stored
+            on disk keyed by the content of the data, the column, and all
+            arguments, defaults to None
+        :type result_cache: evident.cache.ResultCache
         """
         if not isinstance(data, pd.Series):
             raise ValueError("data must be of type pandas.Series")
@@ -539,13 +1346,72 @@ class UnivariateDataHandler(_BaseDataHandler):
             metadata=metadata.loc[samps_in_common],
             max_levels_per_category=max_levels_per_category,
             min_count_per_level=min_count_per_level,
+            lazy=lazy,
+            cache_size=cache_size,
+            result_cache=result_cache,
             **kwargs
         )
 
+        # Position in data of each sample in metadata
+        self._positions = self.data.index.get_indexer(self._metadata.index)
+
     def subset_values(self, ids: list) -> np.array:
         """Get univariate data differences among provided samples."""
         return self.data.loc[ids].values
 
+    def _replicate_group_moments(
+        self,
+        codes: np.ndarray,
+        num_levels: int,
+        draws: np.ndarray
+    ):
+        """Get per-group moments for each row of resampled positions."""
+        values = self._values_array()
+        return calculate_group_moments(values[draws], codes[draws],
+                                       num_levels)
+
+    def _group_moments(self, codes: np.ndarray, num_levels: int):
+        """Get per-group moments of the data."""
+        return calculate_group_moments(self._values_array(), codes,
+                                       num_levels)
+
+    def _jackknife_group_moments(self, codes: np.ndarray, num_levels: int):
+        """Get per-group moments leaving out each sample in turn.
+
+        Removing a sample only updates the moments of its own group, which
+        is done for all samples at once.
+        """
+        counts, means, m2 = self._group_moments(codes, num_levels)
+        values = self._values_array()
+        valid = codes != -1
+        samp_codes = codes[valid]
+        samp_values = values[valid]
+
+        num_samps = len(samp_codes)
+        rows = np.arange(num_samps)
+        jack_counts = np.tile(counts, (num_samps, 1))
+        jack_means = np.tile(means, (num_samps, 1))
+        jack_m2 = np.tile(m2, (num_samps, 1))
+
+        n = counts[samp_codes]
+        mu = means[samp_codes]
+        deviation = samp_values - mu
+        with np.errstate(divide="ignore", invalid="ignore"):
+            jack_counts[rows, samp_codes] = n - 1
+            jack_means[rows, samp_codes] = mu - deviation / (n - 1)
+            jack_m2[rows, samp_codes] = (
+                m2[samp_codes] - np.power(deviation, 2) * n / (n - 1)
+            )
+        return jack_counts, jack_means, jack_m2
+
+    def _data_content(self):
+        """Get data in the order of samples in metadata for hashing."""
+        return self._values_array()
+
+    def _values_array(self) -> np.ndarray:
+        """Get data values in the order of samples in metadata."""
+        return self.data.values[self._positions].astype(float)
+
 
 class RepeatedMeasuresUnivariateDataHandler(UnivariateDataHandler):
     def __init__(
@@ -555,6 +1421,9 @@ class RepeatedMeasuresUnivariateDataHandler(UnivariateDataHandler):
         individual_id_column: str,
         max_levels_per_category: int = 5,
         min_count_per_level: int = 3,
+        lazy: bool = False,
+        cache_size: int = 128,
+        result_cache: ResultCache = None
     ):
         """Handler for univariate repeated measures data.
 
@@ -578,16 +1447,35 @@ class RepeatedMeasuresUnivariateDataHandler(UnivariateDataHandler):
             level to keep. Any levels that have fewer than this many samples
             will not be saved, defaults to 3. Must be > 1.
         :type min_count_per_level: int
+
+        :param lazy: Whether to filter each column the first time it is
+            used rather than all columns up front, defaults to False.
+            Accessing metadata filters all remaining columns.
+        :type lazy: bool
+
+        :param cache_size: Max number of effect sizes to cache, defaults to
+            128. None means unbounded and 0 disables caching. See
+            cache_info and clear_cache.
+        :type cache_size: int
+
+        :param result_cache: If provided, bootstrap intervals with a fixed
+            random_state and power analyses without bootstrapping are stored
+            on disk keyed by the content of the data, the column, and all
+            arguments, defaults to None
+        :type result_cache: evident.cache.ResultCache
         """
         super().__init__(
             data=data,
             metadata=metadata,
             max_levels_per_category=max_levels_per_category,
             min_count_per_level=min_count_per_level,
-            individual_id_column=individual_id_column
+            individual_id_column=individual_id_column,
+            lazy=lazy,
+            cache_size=cache_size,
+            result_cache=result_cache
         )
 
-    @lru_cache()
+    @_cached_method
     def calculate_effect_size(self, state_column: str) -> EffectSizeResult:
         if self.data.name not in self.metadata.columns:
             long_data = pd.concat([self.data, self.metadata], axis=1)
@@ -613,9 +1501,73 @@ class RepeatedMeasuresUnivariateDataHandler(UnivariateDataHandler):
         alpha: float,
         correlation: float,
         epsilon: float,
+        power: float = None,
+        mdes: bool = False
     ):
+        """Perform repeated measures power analysis using this dataset.
+
+        If mdes is True, solves for the minimum detectable eta-squared of
+        each combination of arguments at the given power instead of using
+        the observed effect size.
+
+        :param state_column: Column of states measured for each individual
+        :type state_column: str
+
+        :param subjects: Number of subjects
+        :type subjects: int or sequence of ints
+
+        :param measurements: Number of measurements per subject
+        :type measurements: int or sequence of ints
+
+        :param alpha: Significance level
+        :type alpha: float or sequence of floats
+
+        :param correlation: Correlation between repeated measurements
+        :type correlation: float or sequence of floats
+
+        :param epsilon: Adjustment for sphericity
+        :type epsilon: float or sequence of floats
+
+        :param power: Target power, required if and only if mdes is True,
+            defaults to None
+        :type power: float or sequence of floats
+
+        :param mdes: Whether to solve for the minimum detectable effect size
+            given power, defaults to False
+        :type mdes: bool
+
+        :returns: Results from power analysis
+        :rtype: evident.results.RepeatedMeasuresPowerAnalysisResult or
+            evident.results.PowerAnalysisResults
+        """
+        if mdes:
+            if power is None:
+                raise ValueError(
+                    "power must be provided to solve for the minimum "
+                    "detectable effect size."
+                )
+        elif power is not None:
+            raise ValueError(
+                "power can only be provided when solving for the minimum "
+                "detectable effect size."
+            )
+
+        args = [subjects, measurements, alpha, correlation, epsilon, power]
+        if mdes:
+            results = self._mdes_power_analysis(
+                state_column=state_column,
+                subjects=subjects,
+                measurements=measurements,
+                alpha=alpha,
+                correlation=correlation,
+                epsilon=epsilon,
+                power=power
+            )
+            if not any(isinstance(x, Iterable) for x in args):
+                results = results[0]
+            return results
+
         effect_size_res = self.calculate_effect_size(state_column)
-        args = [subjects, measurements, alpha, correlation, epsilon]
         vector_args = map(lambda x: isinstance(x, Iterable), args)
         if any(vector_args):
             power_analysis_func = self._bulk_power_analysis
@@ -677,32 +1629,279 @@ class RepeatedMeasuresUnivariateDataHandler(UnivariateDataHandler):
         epsilon = _listify(epsilon)
         power_args = [alpha, subjects, measurements, correlation, epsilon]
 
-        power_arg_products = product(*power_args)
-        results_list = []
-        for _alpha, _subj, _meas, _corr, _eps in power_arg_products:
-            results_list.append(self._single_power_analysis(
-                effect_size_result,
-                _subj,
-                _meas,
-                _alpha,
-                _corr,
-                _eps
-            ))
-        return PowerAnalysisResults(results_list)
+        dims = dict(zip(
+            ["alpha", "subjects", "measurements", "correlation", "epsilon"],
+            power_args
+        ))
+        grid = {
+            name: _axis_values(np.asarray(values, dtype=float), axis,
+                               len(dims))
+            for axis, (name, values) in enumerate(dims.items())
+        }
+        power = calculate_rm_anova_power(
+            subjects=grid["subjects"],
+            measurements=grid["measurements"],
+            threshold=grid["alpha"],
+            correlation=grid["correlation"],
+            epsilon=grid["epsilon"],
+            effect_size=effect_size_result.effect_size
+        )
+        return _power_grid_results(
+            dims,
+            dict(power=power, total_observations=(
+                _axis_values(subjects, 1, len(dims))
+                * _axis_values(measurements, 2, len(dims))
+            )),
+            _effect_size_columns([effect_size_result]),
+            result_type=RepeatedMeasuresPowerAnalysisResult
+        )
+
+    def _mdes_power_analysis(
+        self,
+        state_column: str,
+        subjects=None,
+        measurements=None,
+        alpha=None,
+        correlation=None,
+        epsilon=None,
+        power=None
+    ) -> PowerAnalysisResults:
+        """Solve for minimum detectable eta-squared over a grid at once."""
+        power_args = [
+            _listify(x)
+            for x in [alpha, subjects, measurements, correlation, epsilon,
+                      power]
+        ]
+        dims = dict(zip(
+            ["alpha", "subjects", "measurements", "correlation", "epsilon",
+             "power"],
+            power_args
+        ))
+        grid = {
+            name: _axis_values(np.asarray(values, dtype=float), axis,
+                               len(dims))
+            for axis, (name, values) in enumerate(dims.items())
+        }
+        effect_sizes = calculate_rm_anova_mdes(
+            subjects=grid["subjects"],
+            measurements=grid["measurements"],
+            threshold=grid["alpha"],
+            correlation=grid["correlation"],
+            epsilon=grid["epsilon"],
+            power=grid["power"]
+        )
+        return _power_grid_results(
+            dims,
+            dict(total_observations=(
+                _axis_values(power_args[1], 1, len(dims))
+                * _axis_values(power_args[2], 2, len(dims))
+            )),
+            dict(effect_size=effect_sizes,
+                 metric=np.array("eta_squared"),
+                 column=np.array(state_column)),
+            result_type=RepeatedMeasuresPowerAnalysisResult
+        )
+
+
+class _BaseMultivariateDataHandler(_BaseDataHandler):
+    """Shared computations on within-group distances.
+
+    Subclasses set _ids (sample IDs of the data), _positions (position in
+    the data of each metadata sample), _num_samples, and _pair_block_size,
+    and provide the distances among the samples of each group through
+    _within_group_distances.
+    """
+    def _id_positions(self, ids: list) -> np.ndarray:
+        """Get the position in the data of each sample ID.
+
+        :param ids: Sample IDs
+        :type ids: list
+
+        :returns: Position of each ID
+        :rtype: np.ndarray
+
+        :raises KeyError: If any ID is not in the data
+        """
+        positions = self._ids.get_indexer(ids)
+        if (positions == -1).any():
+            missing = list(pd.Index(ids)[positions == -1])
+            raise KeyError(f"IDs not found in data: {missing}")
+        return positions
+
+    def _replicate_group_moments(
+        self,
+        codes: np.ndarray,
+        num_levels: int,
+        draws: np.ndarray
+    ):
+        """Get per-group moments for each row of resampled positions.
+
+        Pairs of draws of the same sample are ignored while each pair of
+        distinct samples is weighted by the product of the number of times
+        each was drawn, i.e. by the number of pairs of draws it represents.
+        The draw counts of all replicates come from a single bincount over
+        replicate * samples + position offsets. Within a level, all
+        replicates are then reduced at once as rows of a matrix of pair
+        weights, in blocks of pairs of at most about _pair_block_size
+        weights.
+        """
+        num_reps = draws.shape[0]
+        num_samps = len(codes)
+        offsets = np.arange(num_reps)[:, np.newaxis] * num_samps
+        # Number of times each sample is drawn in each replicate
+        mult = np.bincount((offsets + draws).ravel(),
+                           minlength=num_reps * num_samps)
+        mult = mult.reshape(num_reps, num_samps)
+
+        shape = (num_reps, num_levels)
+        counts = np.zeros(shape)
+        means = np.zeros(shape)
+        m2 = np.zeros(shape)
+        block_size = max(1, self._pair_block_size // num_reps)
+        for level in range(num_levels):
+            level_samps = np.flatnonzero(codes == level)
+            level_mult = mult[:, level_samps]
+            level_distances = self._within_group_distances(
+                self._positions[level_samps]
+            )
+
+            def level_blocks():
+                for i, j in _row_block_pairs(len(level_samps), block_size):
+                    weights = level_mult[:, i] * level_mult[:, j]
+                    yield weights, level_distances(i, j)
+
+            sums = np.zeros(num_reps)
+            for weights, dists in level_blocks():
+                counts[:, level] += weights.sum(axis=1)
+                sums += weights @ dists
+            with np.errstate(divide="ignore", invalid="ignore"):
+                means[:, level] = sums / counts[:, level]
+
+            # Second pass over the pairs as deviations need the means
+            for weights, dists in level_blocks():
+                deviations = dists - means[:, level, np.newaxis]
+                m2[:, level] += (weights * deviations ** 2).sum(axis=1)
+
+        # Groups without pairs have undefined moments
+        means[counts == 0] = np.nan
+        m2[counts == 0] = np.nan
+        return counts, means, m2
+
+    def _group_moments(self, codes: np.ndarray, num_levels: int):
+        """Get per-group moments of within-group distances.
+
+        Distances of each level are gathered in blocks of rows of its
+        within-group distance matrix and merged, so memory use is bounded
+        by the block size rather than the number of pairs in the level.
+        """
+        levels = list(range(num_levels))
+        group_stats = GroupStats.empty(levels)
+        for level in levels:
+            samps = np.flatnonzero(codes == level)
+            level_distances = self._within_group_distances(
+                self._positions[samps]
+            )
+            for i, j in _row_block_pairs(len(samps), self._pair_block_size):
+                block_stats = GroupStats.from_values(
+                    level_distances(i, j), np.full(len(i), level), levels
+                )
+                group_stats = group_stats.merge(block_stats)
+        counts = group_stats.counts.astype(float)
+        return counts, group_stats.means, group_stats.m2
+
+    def _jackknife_group_moments(self, codes: np.ndarray, num_levels: int):
+        """Get per-group moments leaving out each sample in turn.
+
+        Removing a sample drops its distances to the other members of its
+        group. Per-sample sums of those distances are accumulated from a
+        single pass over each group's within-group distances.
+        """
+        counts, means, m2 = self._group_moments(codes, num_levels)
+        valid = codes != -1
+        # Row of each sample with a level in the jackknife arrays
+        rows = np.cumsum(valid) - 1
+
+        num_samps = valid.sum()
+        jack_counts = np.tile(counts, (num_samps, 1))
+        jack_means = np.tile(means, (num_samps, 1))
+        jack_m2 = np.tile(m2, (num_samps, 1))
+
+        for level in range(num_levels):
+            samps, i, j, dists = self._level_pairs(codes, level)
+            num_level_samps = len(samps)
+            centered = dists - means[level]
+            # Sums over the distances from each sample to its group members
+            row_sums = (
+                np.bincount(i, weights=centered, minlength=num_level_samps)
+                + np.bincount(j, weights=centered, minlength=num_level_samps)
+            )
+            row_sum_sqs = (
+                np.bincount(i, weights=centered ** 2,
+                            minlength=num_level_samps)
+                + np.bincount(j, weights=centered ** 2,
+                              minlength=num_level_samps)
+            )
+
+            new_count = counts[level] - (num_level_samps - 1)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                new_mean_shift = -row_sums / new_count
+                new_m2 = m2[level] - row_sum_sqs + row_sums * new_mean_shift
+            jack_counts[rows[samps], level] = new_count
+            jack_means[rows[samps], level] = means[level] + new_mean_shift
+            jack_m2[rows[samps], level] = new_m2
+
+        return jack_counts, jack_means, jack_m2
+
+    def _level_pairs(self, codes: np.ndarray, level: int):
+        """Get within-group distances of a level.
+
+        :returns: Positions in metadata of the samples in the level, the
+            local indices (i, j) of each pair, and the distance of each pair
+        :rtype: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+        """
+        samps = np.flatnonzero(codes == level)
+        i, j = np.triu_indices(len(samps), k=1)
+        level_distances = self._within_group_distances(self._positions[samps])
+        return samps, i, j, level_distances(i, j)
+
+    @abstractmethod
+    def _within_group_distances(self, positions: np.ndarray) -> Callable:
+        """Get a function giving distances among samples of a group.
+
+        :param positions: Positions in the data of the samples of the group
+        :type positions: np.ndarray
+
+        :returns: Function of local indices (i, j) into positions giving the
+            distance of each pair as float64
+        :rtype: Callable
+        """
 
 
-class MultivariateDataHandler(_BaseDataHandler):
+class MultivariateDataHandler(_BaseMultivariateDataHandler):
     def __init__(
         self,
-        data: DistanceMatrix,
+        data: Union[DistanceMatrix, CondensedDistances],
         metadata: pd.DataFrame,
         max_levels_per_category: int = 5,
         min_count_per_level: int = 3,
+        lazy: bool = False,
+        cache_size: int = 128,
+        result_cache: ResultCache = None,
+        dtype: np.dtype = None,
+        condensed_only: bool = False
     ):
         """Handler for multivariate data.
 
-        :param data: Multivariate distance matrix
-        :type data: skbio.DistanceMatrix
+        Distances are read from the condensed form of data by position, so
+        data is never copied for the samples in common with metadata. With
+        memory-mapped evident.distances.CondensedDistances only the
+        distances that are used are read from disk. Unlike metadata, data
+        is therefore kept as given, including samples not in metadata. Use
+        samples for the samples in common.
+
+        :param data: Multivariate distance matrix or condensed distances
+        :type data: skbio.DistanceMatrix or
+            evident.distances.CondensedDistances
 
         :param metadata: Sample metadata
         :type metadata: pd.DataFrame
@@ -717,21 +1916,703 @@ class MultivariateDataHandler(_BaseDataHandler):
             level to keep. Any levels that have fewer than this many samples
             will not be saved, defaults to 3. Must be > 1.
         :type min_count_per_level: int
+
+        :param lazy: Whether to filter each column the first time it is
+            used rather than all columns up front, defaults to False.
+            Accessing metadata filters all remaining columns.
+        :type lazy: bool
+
+        :param cache_size: Max number of effect sizes to cache, defaults to
+            128. None means unbounded and 0 disables caching. See
+            cache_info and clear_cache.
+        :type cache_size: int
+
+        :param result_cache: If provided, bootstrap intervals with a fixed
+            random_state and power analyses without bootstrapping are stored
+            on disk keyed by the content of the data, the column, and all
+            arguments, defaults to None
+        :type result_cache: evident.cache.ResultCache
+
+        :param dtype: Type to store distances as, e.g. np.float32 to halve
+            memory use, defaults to None (type of data). Implies
+            condensed_only, as keeping data as well would add the converted
+            copy to it. Statistics are always accumulated in float64.
+            Converting memory-mapped distances reads them into memory.
+        :type dtype: np.dtype
+
+        :param condensed_only: Whether to keep only the condensed distances
+            as data rather than data itself, defaults to False. Drops the
+            reference to the square matrix of a skbio.DistanceMatrix.
+            Always True if dtype is provided.
+        :type condensed_only: bool
         """
-        if not isinstance(data, DistanceMatrix):
-            raise ValueError("data must be of type skbio.DistanceMatrix")
+        if isinstance(data, DistanceMatrix):
+            distances = CondensedDistances.from_distance_matrix(data)
+        elif isinstance(data, CondensedDistances):
+            distances = data
+        else:
+            raise ValueError(
+                "data must be of type skbio.DistanceMatrix or "
+                "evident.distances.CondensedDistances"
+            )
+
+        if dtype is not None:
+            distances = distances.astype(dtype)
+            condensed_only = True
+        if condensed_only or isinstance(data, CondensedDistances):
+            data = distances
 
         md_samps = set(metadata.index)
-        data_samps = set(data.ids)
+        data_samps = set(distances.ids)
         samps_in_common = _check_sample_overlap(md_samps, data_samps)
 
         super().__init__(
-            data=data.filter(samps_in_common),
+            data=data,
             metadata=metadata.loc[samps_in_common],
             max_levels_per_category=max_levels_per_category,
             min_count_per_level=min_count_per_level,
+            lazy=lazy,
+            cache_size=cache_size,
+            result_cache=result_cache
         )
 
+        # Condensed distances and position of each metadata sample in them
+        #     are computed once so bootstrap replicates can gather their
+        #     within-group distances directly.
+        self._condensed = distances.condensed
+        self._num_samples = len(distances.ids)
+        self._pair_block_size = 2 ** 22
+        self._positions = distances.ids.get_indexer(self._metadata.index)
+        self._ids = distances.ids
+
     def subset_values(self, ids: list) -> np.array:
         """Get multivariate data differences among provided samples."""
-        return np.array(self.data.filter(ids).to_series().values)
+        positions = self._id_positions(ids)
+        i, j = np.triu_indices(len(positions), k=1)
+        idx = _condensed_index(positions[i], positions[j], self._num_samples)
+        return self._distances(idx)
+
+    def _distances(self, idx) -> np.ndarray:
+        """Gather condensed distances by position or slice as float64."""
+        return np.asarray(self._condensed[idx], dtype=np.float64)
+
+    def _data_content(self):
+        """Get distances and the position of each metadata sample in them."""
+        return self._condensed, self._positions
+
+    def _within_group_distances(self, positions: np.ndarray) -> Callable:
+        """Gather distances among samples of a group from the condensed
+        distances.
+        """
+        def level_distances(i, j):
+            idx = _condensed_index(positions[i], positions[j],
+                                   self._num_samples)
+            return self._distances(idx)
+
+        return level_distances
+
+    def _precompute_group_stats(self, columns: list):
+        """Compute per-level stats of several columns in one pass.
+
+        Condensed distances are read once, in order, in blocks of
+        consecutive rows of the distance matrix. Each block contributes its
+        within-group distances to the stats of every column, instead of
+        gathering the distances of each level of each column separately.
+
+        :param columns: Columns containing categories
+        :type columns: list
+        """
+        columns = [
+            column for column in dict.fromkeys(columns)
+            if column not in self._group_stats_cache
+        ]
+        if len(columns) < 2:
+            super()._precompute_group_stats(columns)
+            return
+
+        # Level of each sample of the distance matrix in each column
+        data_codes, column_levels = [], []
+        for column in columns:
+            codes, levels = self._column_codes(column)
+            col_data_codes = np.full(self._num_samples, -1)
+            col_data_codes[self._positions] = codes
+            data_codes.append(col_data_codes)
+            column_levels.append(list(levels))
+        group_stats = [
+            GroupStats.empty(list(range(len(levels))))
+            for levels in column_levels
+        ]
+
+        start = 0
+        for i, j in _row_block_pairs(self._num_samples,
+                                     self._pair_block_size):
+            dists = self._distances(slice(start, start + len(i)))
+            start += len(i)
+            for k, col_data_codes in enumerate(data_codes):
+                codes_i = col_data_codes[i]
+                pair_codes = np.where(codes_i == col_data_codes[j], codes_i,
+                                      -1)
+                group_stats[k] = group_stats[k].merge(GroupStats.from_values(
+                    dists, pair_codes, group_stats[k].levels
+                ))
+
+        for column, levels, stats in zip(columns, column_levels,
+                                         group_stats):
+            self._group_stats_cache[column] = GroupStats(
+                levels, stats.counts.astype(float), stats.means, stats.m2
+            )
+
+
+class FeatureTableDataHandler(_BaseMultivariateDataHandler):
+    def __init__(
+        self,
+        data: Union[pd.DataFrame, sparse.spmatrix],
+        metadata: pd.DataFrame,
+        metric: Union[str, Callable] = "braycurtis",
+        ids: Sequence[str] = None,
+        max_levels_per_category: int = 5,
+        min_count_per_level: int = 3,
+        lazy: bool = False,
+        cache_size: int = 128,
+        result_cache: ResultCache = None,
+        n_jobs: int = None
+    ):
+        """Handler for multivariate data computed from a feature table.
+
+        Only distances between samples of the same level are ever needed,
+        so they are computed from the feature table on demand instead of
+        from a full distance matrix. Per-level stats are computed in blocks
+        of rows of each level's distance matrix, in parallel. Bootstraps
+        compute the distances among the samples of one level at a time, so
+        memory use scales with the largest level rather than all samples.
+
+        :param data: Feature table with samples as rows
+        :type data: pd.DataFrame or scipy.sparse.spmatrix
+
+        :param metadata: Sample metadata
+        :type metadata: pd.DataFrame
+
+        :param metric: Distance metric, defaults to 'braycurtis'. Any metric
+            accepted by scipy.spatial.distance.pdist.
+        :type metric: str or Callable
+
+        :param ids: Sample IDs of the rows of data, required if data is a
+            sparse matrix
+        :type ids: Sequence[str]
+
+        :param max_levels_per_category: Max number of levels in a category to
+            keep. Any categorical columns that have more than this number of
+            unique levels will not be saved, defaults to 5. Set this value to
+            -1 to not drop anything.
+        :type max_levels_per_category: int
+
+        :param min_count_per_level: Min number of samples in a given category
+            level to keep. Any levels that have fewer than this many samples
+            will not be saved, defaults to 3. Must be > 1.
+        :type min_count_per_level: int
+
+        :param lazy: Whether to filter each column the first time it is
+            used rather than all columns up front, defaults to False.
+            Accessing metadata filters all remaining columns.
+        :type lazy: bool
+
+        :param cache_size: Max number of effect sizes to cache, defaults to
+            128. None means unbounded and 0 disables caching. See
+            cache_info and clear_cache.
+        :type cache_size: int
+
+        :param result_cache: If provided, bootstrap intervals with a fixed
+            random_state and power analyses without bootstrapping are stored
+            on disk keyed by the content of the data, the column, and all
+            arguments, defaults to None
+        :type result_cache: evident.cache.ResultCache
+
+        :param n_jobs: Number of jobs to compute distances in parallel,
+            defaults to None (single CPU)
+        :type n_jobs: int
+        """
+        if isinstance(data, pd.DataFrame):
+            table = data.values.astype(float)
+            ids = data.index
+        elif sparse.issparse(data):
+            if ids is None:
+                raise ValueError("ids must be provided for sparse data.")
+            table = sparse.csr_matrix(data, dtype=float)
+        else:
+            raise ValueError(
+                "data must be of type pd.DataFrame or scipy.sparse.spmatrix"
+            )
+        ids = pd.Index(ids)
+        if len(ids) != table.shape[0]:
+            raise ValueError(
+                f"Number of ids ({len(ids)}) does not match the number of "
+                f"rows of data ({table.shape[0]})."
+            )
+
+        md_samps = set(metadata.index)
+        data_samps = set(ids)
+        samps_in_common = _check_sample_overlap(md_samps, data_samps)
+
+        super().__init__(
+            data=data,
+            metadata=metadata.loc[samps_in_common],
+            max_levels_per_category=max_levels_per_category,
+            min_count_per_level=min_count_per_level,
+            lazy=lazy,
+            cache_size=cache_size,
+            result_cache=result_cache
+        )
+
+        self.metric = metric
+        self.n_jobs = n_jobs
+        self._table = table
+        self._num_samples = len(ids)
+        self._pair_block_size = 2 ** 22
+        self._positions = ids.get_indexer(self._metadata.index)
+        self._ids = ids
+
+    def subset_values(self, ids: list) -> np.array:
+        """Get multivariate data differences among provided samples."""
+        positions = self._id_positions(ids)
+        return pdist(self._rows(positions), metric=self.metric)
+
+    def _rows(self, positions: np.ndarray) -> np.ndarray:
+        """Get rows of the feature table as a dense array."""
+        rows = self._table[positions]
+        if sparse.issparse(rows):
+            rows = rows.toarray()
+        return rows
+
+    def _data_content(self):
+        """Get feature table, metric, and position of each metadata
+        sample in the table.
+        """
+        table = self._table
+        if sparse.issparse(table):
+            table = (table.data, table.indices, table.indptr, table.shape)
+        return table, self.metric, self._positions
+
+    def _within_group_distances(self, positions: np.ndarray) -> Callable:
+        """Compute all distances among samples of a group at once."""
+        dists = pdist(self._rows(positions), metric=self.metric)
+
+        def level_distances(i, j):
+            return dists[_condensed_index(i, j, len(positions))]
+
+        return level_distances
+
+    def _group_moments(self, codes: np.ndarray, num_levels: int):
+        """Get per-group moments of within-group distances.
+
+        Distances of each level are computed in blocks of rows of its
+        within-group distance matrix, in parallel, and merged. Sparse
+        tables are only densified a block at a time within each task.
+        """
+        levels = list(range(num_levels))
+        tasks = []
+        for level in levels:
+            samps = np.flatnonzero(codes == level)
+            level_table = self._table[self._positions[samps]]
+            rows_per_block = max(
+                1, self._pair_block_size // max(len(samps), 1)
+            )
+            for start in range(0, max(len(samps) - 1, 0), rows_per_block):
+                tasks.append(delayed(_feature_block_stats)(
+                    level_table, start, start + rows_per_block, self.metric,
+                    level, levels
+                ))
+
+        group_stats = GroupStats.empty(levels)
+        for block_stats in Parallel(n_jobs=self.n_jobs)(tasks):
+            group_stats = group_stats.merge(block_stats)
+        counts = group_stats.counts.astype(float)
+        return counts, group_stats.means, group_stats.m2
+
+
+def _feature_block_stats(
+    level_table: np.ndarray,
+    start: int,
+    stop: int,
+    metric: Union[str, Callable],
+    level: int,
+    levels: list
+) -> GroupStats:
+    """Get stats of distances in a block of rows of a level.
+
+    The rows of the block and the later rows they pair with are densified
+    in chunks, so memory use does not scale with the size of the level.
+
+    :param level_table: Feature table of the samples in the level
+    :type level_table: np.ndarray or scipy.sparse.csr_matrix
+
+    :param start: First row of the block
+    :type start: int
+
+    :param stop: End of the rows of the block
+    :type stop: int
+
+    :param metric: Distance metric
+    :type metric: str or Callable
+
+    :param level: Position of the level in levels
+    :type level: int
+
+    :param levels: Levels of the column
+    :type levels: list
+
+    :returns: Stats of the distances of each row to the later rows
+    :rtype: evident.stats.GroupStats
+    """
+    num_rows = level_table.shape[0]
+    stop = min(stop, num_rows - 1)
+    block = _dense_rows(level_table, start, stop)
+    rows = np.arange(start, stop)[:, None]
+    # Pair with later rows in chunks of at least 256 rows to keep the
+    #     number of cdist calls low for large levels
+    chunk_size = max(stop - start, 256)
+
+    group_stats = GroupStats.empty(levels)
+    for chunk_start in range(start + 1, num_rows, chunk_size):
+        chunk_stop = min(chunk_start + chunk_size, num_rows)
+        dists = cdist(block, _dense_rows(level_table, chunk_start, chunk_stop),
+                      metric=metric)
+        # Keep each pair (i, j), i < j, once
+        cols = np.arange(chunk_start, chunk_stop)[None, :]
+        values = dists[cols > rows]
+        group_stats = group_stats.merge(GroupStats.from_values(
+            values, np.full(len(values), level), levels
+        ))
+    return group_stats
+
+
+def _dense_rows(table, start: int, stop: int) -> np.ndarray:
+    """Get a range of rows of a dense or sparse table as a dense array."""
+    rows = table[start:stop]
+    if sparse.issparse(rows):
+        rows = rows.toarray()
+    return rows
+
+
+class OrdinationDataHandler(_BaseMultivariateDataHandler):
+    def __init__(
+        self,
+        data: Union[pd.DataFrame, OrdinationResults],
+        metadata: pd.DataFrame,
+        number_of_dimensions: int = None,
+        max_levels_per_category: int = 5,
+        min_count_per_level: int = 3,
+        lazy: bool = False,
+        cache_size: int = 128,
+        result_cache: ResultCache = None
+    ):
+        """Handler for multivariate data given as ordination coordinates.
+
+        Distances are the squared Euclidean distances between sample
+        coordinates, e.g. of a PCoA or RPCA. Per-level moments of
+        within-group distances follow from the per-level mean, scatter
+        matrix, and squared norms of the centered coordinates, so no pairs
+        of samples are enumerated. Effect sizes, bootstraps, and jackknives
+        take O(n d^2) time for n samples and d dimensions. Use
+        bootstrap_method='vectorized' for large datasets, as resampling
+        computes the distances of all pairs of each replicate.
+
+        :param data: Sample coordinates with samples as rows
+        :type data: pd.DataFrame or skbio.OrdinationResults
+
+        :param metadata: Sample metadata
+        :type metadata: pd.DataFrame
+
+        :param number_of_dimensions: Number of leading dimensions to use,
+            defaults to None (all)
+        :type number_of_dimensions: int
+
+        :param max_levels_per_category: Max number of levels in a category to
+            keep. Any categorical columns that have more than this number of
+            unique levels will not be saved, defaults to 5. Set this value to
+            -1 to not drop anything.
+        :type max_levels_per_category: int
+
+        :param min_count_per_level: Min number of samples in a given category
+            level to keep. Any levels that have fewer than this many samples
+            will not be saved, defaults to 3. Must be > 1.
+        :type min_count_per_level: int
+
+        :param lazy: Whether to filter each column the first time it is
+            used rather than all columns up front, defaults to False.
+            Accessing metadata filters all remaining columns.
+        :type lazy: bool
+
+        :param cache_size: Max number of effect sizes to cache, defaults to
+            128. None means unbounded and 0 disables caching. See
+            cache_info and clear_cache.
+        :type cache_size: int
+
+        :param result_cache: If provided, bootstrap intervals with a fixed
+            random_state and power analyses without bootstrapping are stored
+            on disk keyed by the content of the data, the column, and all
+            arguments, defaults to None
+        :type result_cache: evident.cache.ResultCache
+        """
+        if isinstance(data, OrdinationResults):
+            coords = data.samples
+        elif isinstance(data, pd.DataFrame):
+            coords = data
+        else:
+            raise ValueError(
+                "data must be of type pd.DataFrame or skbio.OrdinationResults"
+            )
+        if number_of_dimensions is not None:
+            coords = coords.iloc[:, :number_of_dimensions]
+
+        md_samps = set(metadata.index)
+        data_samps = set(coords.index)
+        samps_in_common = _check_sample_overlap(md_samps, data_samps)
+
+        super().__init__(
+            data=data,
+            metadata=metadata.loc[samps_in_common],
+            max_levels_per_category=max_levels_per_category,
+            min_count_per_level=min_count_per_level,
+            lazy=lazy,
+            cache_size=cache_size,
+            result_cache=result_cache
+        )
+
+        self._coords = coords.values.astype(float)
+        self._num_samples = coords.shape[0]
+        self._positions = coords.index.get_indexer(self._metadata.index)
+        self._ids = coords.index
+
+    def subset_values(self, ids: list) -> np.array:
+        """Get multivariate data differences among provided samples."""
+        positions = self._id_positions(ids)
+        return pdist(self._coords[positions], metric="sqeuclidean")
+
+    def _data_content(self):
+        """Get coordinates and the position of each metadata sample in
+        them.
+        """
+        return self._coords, self._positions
+
+    def _within_group_distances(self, positions: np.ndarray) -> Callable:
+        """Compute all distances among samples of a group at once."""
+        dists = pdist(self._coords[positions], metric="sqeuclidean")
+
+        def level_distances(i, j):
+            return dists[_condensed_index(i, j, len(positions))]
+
+        return level_distances
+
+    def _group_moments(self, codes: np.ndarray, num_levels: int):
+        """Get per-group moments of within-group distances."""
+        moments = np.full((3, num_levels), np.nan)
+        for level in range(num_levels):
+            coords = self._level_coords(codes, level)
+            moments[:, level] = _pair_moments(coords, np.ones(len(coords)))
+        counts, means, m2 = moments
+        return counts, means, m2
+
+    def _replicate_group_moments(
+        self,
+        codes: np.ndarray,
+        num_levels: int,
+        draws: np.ndarray
+    ):
+        """Get per-group moments for each row of resampled positions.
+
+        Each sample is weighted by the number of times it was drawn, which
+        weights each pair of distinct samples by the number of pairs of
+        draws it represents, as for distance matrices.
+        """
+        num_reps = draws.shape[0]
+        moments = np.full((3, num_reps, num_levels), np.nan)
+        # Position of each sample among the samples of its level
+        local = np.full(len(codes), -1)
+        draw_codes = codes[draws]
+        for level in range(num_levels):
+            level_samps = np.flatnonzero(codes == level)
+            local[level_samps] = np.arange(len(level_samps))
+            coords = self._level_coords(codes, level)
+            for rep in range(num_reps):
+                level_draws = draws[rep][draw_codes[rep] == level]
+                weights = np.bincount(local[level_draws],
+                                      minlength=len(level_samps))
+                moments[:, rep, level] = _pair_moments(coords, weights)
+        counts, means, m2 = moments
+        return counts, means, m2
+
+    def _jackknife_group_moments(self, codes: np.ndarray, num_levels: int):
+        """Get per-group moments leaving out each sample in turn.
+
+        Removing a sample drops the sum and sum of squares of its distances
+        to the other members of its group. Both sums of every sample
+        follow from the centered coordinates of the group, its scatter
+        matrix, and the squared norms of the centered coordinates.
+        """
+        counts, means, m2 = self._group_moments(codes, num_levels)
+        valid = codes != -1
+        # Row of each sample with a level in the jackknife arrays
+        rows = np.cumsum(valid) - 1
+
+        num_samps = valid.sum()
+        jack_counts = np.tile(counts, (num_samps, 1))
+        jack_means = np.tile(means, (num_samps, 1))
+        jack_m2 = np.tile(m2, (num_samps, 1))
+
+        for level in range(num_levels):
+            samps = np.flatnonzero(codes == level)
+            coords = self._level_coords(codes, level)
+            num_level_samps = len(samps)
+            centered = coords - coords.mean(axis=0)
+            sq_norms = np.einsum("ij,ij->i", centered, centered)
+            scatter = centered.T @ centered
+            total_sq_norm = sq_norms.sum()
+
+            # Sums over the distances from each sample to its group members
+            row_sums = num_level_samps * sq_norms + total_sq_norm
+            row_sum_sqs = (
+                num_level_samps * sq_norms ** 2
+                + np.dot(sq_norms, sq_norms)
+                + 4 * np.einsum("ij,jk,ik->i", centered, scatter, centered)
+                + 2 * sq_norms * total_sq_norm
+                - 4 * centered @ (sq_norms @ centered)
+            )
+
+            total = counts[level] * means[level]
+            total_sq = m2[level] + counts[level] * means[level] ** 2
+            new_count = counts[level] - (num_level_samps - 1)
+            new_total = total - row_sums
+            with np.errstate(divide="ignore", invalid="ignore"):
+                new_mean = new_total / new_count
+                new_m2 = np.maximum(
+                    total_sq - row_sum_sqs - new_total * new_mean, 0
+                )
+            jack_counts[rows[samps], level] = new_count
+            jack_means[rows[samps], level] = new_mean
+            jack_m2[rows[samps], level] = new_m2
+
+        return jack_counts, jack_means, jack_m2
+
+    def _level_coords(self, codes: np.ndarray, level: int) -> np.ndarray:
+        """Get coordinates of the samples in a level."""
+        return self._coords[self._positions[codes == level]]
+
+
+def _pair_moments(coords: np.ndarray, weights: np.ndarray):
+    """Get moments of squared Euclidean distances between samples.
+
+    Each pair of distinct samples (i, j) is weighted by w_i * w_j. With
+    coordinates y centered on their weighted mean, a = ||y||^2, and
+    W = sum(w):
+
+        sum_{i<j} w_i w_j d_ij = W sum(w a)
+        sum_{i<j} w_i w_j d_ij^2 = W sum(w a^2) + 2 ||sum(w y y')||_F^2
+                                   + sum(w a)^2
+
+    :param coords: Coordinates of each sample
+    :type coords: np.ndarray
+
+    :param weights: Weight of each sample
+    :type weights: np.ndarray
+
+    :returns: Total weight, mean, and sum of squared deviations of the
+        distances of all pairs
+    :rtype: Tuple[float, float, float]
+    """
+    total_weight = weights.sum()
+    count = (total_weight ** 2 - np.dot(weights, weights)) / 2
+    if count == 0:
+        return 0.0, np.nan, np.nan
+
+    centered = coords - weights @ coords / total_weight
+    sq_norms = np.einsum("ij,ij->i", centered, centered)
+    scatter = (centered * weights[:, None]).T @ centered
+    weighted_sq_norm = np.dot(weights, sq_norms)
+
+    total = total_weight * weighted_sq_norm
+    total_sq = (
+        total_weight * np.dot(weights, sq_norms ** 2)
+        + 2 * np.sum(scatter ** 2)
+        + weighted_sq_norm ** 2
+    )
+    mean = total / count
+    # Clip rounding error of the difference of sums
+    m2 = max(total_sq - total * mean, 0.0)
+    return count, mean, m2
+
+
+def _row_block_pairs(num_samples: int, block_size: int):
+    """Iterate over pairs (i, j), i < j, in blocks of consecutive rows.
+
+    :param num_samples: Number of samples
+    :type num_samples: int
+
+    :param block_size: Approximate maximum number of pairs per block
+    :type block_size: int
+
+    :returns: Generator of row indices and column indices of each block
+    :rtype: Iterator[Tuple[np.ndarray, np.ndarray]]
+    """
+    rows_per_block = max(1, block_size // max(num_samples, 1))
+    for start in range(0, max(num_samples - 1, 0), rows_per_block):
+        rows = np.arange(start, min(start + rows_per_block, num_samples - 1))
+        lengths = num_samples - 1 - rows
+        i = np.repeat(rows, lengths)
+        offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        j = np.arange(lengths.sum()) - offsets + np.repeat(rows + 1, lengths)
+        yield i, j
+
+
+def _effect_size_axis_columns(
+    effect_size_results: list,
+    ndim: int
+) -> dict:
+    """Get effect size columns spanning the first axis of a grid."""
+    return {
+        name: _axis_values(values, 0, ndim)
+        for name, values in _effect_size_columns(effect_size_results).items()
+    }
+
+
+def _power_grid_results(
+    dims: dict,
+    solved: dict,
+    effect_sizes: dict,
+    result_type: type = PowerAnalysisResult
+) -> PowerAnalysisResults:
+    """Create columnar power analysis results over a grid of arguments.
+
+    Each field of the results is taken from solved if present and from the
+    values of the dim of the same name otherwise.
+
+    :param dims: Name and values of each argument, in grid axis order
+    :type dims: dict
+
+    :param solved: Solved values of fields, broadcastable to the grid
+    :type solved: dict
+
+    :param effect_sizes: Values of fields of the effect size result of each
+        row, broadcastable to the grid
+    :type effect_sizes: dict
+
+    :param result_type: Type of each result, defaults to
+        PowerAnalysisResult
+    :type result_type: type
+
+    :returns: Columnar results shaped as a grid over dims
+    :rtype: evident.results.PowerAnalysisResults
+    """
+    values = {
+        name: _axis_values(coords, axis, len(dims))
+        for axis, (name, coords) in enumerate(dims.items())
+    }
+    values.update(solved)
+    names = [f.name for f in fields(result_type)]
+    split = names.index("effect_size_result")
+
+    # Match the column order of converting result objects to a DataFrame
+    columns = {name: values[name] for name in names[:split]}
+    columns["effect_size"] = effect_sizes["effect_size"]
+    columns.update({name: values[name] for name in names[split + 1:]})
+    columns.update(effect_sizes)
+    return PowerAnalysisResults.from_columns(columns, dims, result_type)
@@ -0,0 +1,116 @@
+from typing import Sequence, Union
+
+import numpy as np
+import pandas as pd
+from scipy.spatial.distance import squareform
+from skbio import DistanceMatrix
+
+
+class CondensedDistances:
+    """Distances among samples stored as a condensed vector.
+
+    The vector holds the upper triangle of the distance matrix row by row,
+    as returned by scipy.spatial.distance.squareform or
+    skbio.DistanceMatrix.condensed_form. It may be a memory-mapped array,
+    in which case only the entries that are used are read from disk.
+
+    :param condensed: Condensed distances
+    :type condensed: np.ndarray
+
+    :param ids: Sample IDs in order of the rows of the distance matrix
+    :type ids: Sequence[str]
+    """
+    def __init__(self, condensed: np.ndarray, ids: Sequence[str]):
+        ids = pd.Index(ids)
+        num_samples = len(ids)
+        if condensed.ndim != 1:
+            raise ValueError("condensed must be one-dimensional.")
+        if len(condensed) != num_samples * (num_samples - 1) // 2:
+            raise ValueError(
+                f"Length of condensed ({len(condensed)}) does not match the "
+                f"number of IDs ({num_samples})."
+            )
+        if not ids.is_unique:
+            raise ValueError("ids must be unique.")
+
+        self.condensed = condensed
+        self.ids = ids
+
+    @classmethod
+    def load(
+        cls,
+        condensed_path: str,
+        ids: Union[str, Sequence[str]]
+    ) -> "CondensedDistances":
+        """Memory-map condensed distances from an .npy file.
+
+        :param condensed_path: Path to .npy file of condensed distances
+        :type condensed_path: str
+
+        :param ids: Sample IDs or path to a text file with one sample ID per
+            line
+        :type ids: str or Sequence[str]
+
+        :returns: Memory-mapped condensed distances
+        :rtype: evident.distances.CondensedDistances
+        """
+        if isinstance(ids, str):
+            with open(ids) as f:
+                ids = [line.rstrip("\n") for line in f]
+        condensed = np.load(condensed_path, mmap_mode="r")
+        return cls(condensed, ids)
+
+    @classmethod
+    def from_distance_matrix(
+        cls,
+        data: DistanceMatrix
+    ) -> "CondensedDistances":
+        """Create condensed distances from a distance matrix.
+
+        :param data: Distance matrix
+        :type data: skbio.DistanceMatrix
+
+        :returns: Condensed distances
+        :rtype: evident.distances.CondensedDistances
+        """
+        return cls(data.condensed_form(), data.ids)
+
+    def save(self, condensed_path: str, ids_path: str):
+        """Save condensed distances to an .npy file and IDs to a text file.
+
+        :param condensed_path: Path to .npy file of condensed distances
+        :type condensed_path: str
+
+        :param ids_path: Path to text file with one sample ID per line
+        :type ids_path: str
+        """
+        np.save(condensed_path, self.condensed)
+        with open(ids_path, "w") as f:
+            f.writelines(f"{x}\n" for x in self.ids)
+
+    def astype(self, dtype: np.dtype) -> "CondensedDistances":
+        """Get condensed distances stored as another type.
+
+        :param dtype: Type of the distances
+        :type dtype: np.dtype
+
+        :returns: Condensed distances of type dtype, self if already so
+        :rtype: evident.distances.CondensedDistances
+        """
+        if self.condensed.dtype == np.dtype(dtype):
+            return self
+        return CondensedDistances(np.asarray(self.condensed, dtype=dtype),
+                                  self.ids)
+
+    @property
+    def shape(self) -> tuple:
+        return (len(self.ids), len(self.ids))
+
+    def to_distance_matrix(self) -> DistanceMatrix:
+        """Expand condensed distances into a full distance matrix.
+
+        :returns: Distance matrix of all samples
+        :rtype: skbio.DistanceMatrix
+        """
+        square = squareform(np.asarray(self.condensed), checks=False)
+        return DistanceMatrix(square, ids=list(self.ids))
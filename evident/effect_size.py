@@ -1,11 +1,16 @@
+from functools import partial
 from itertools import combinations, chain
 
 from joblib import Parallel, delayed
 import numpy as np
 import pandas as pd
 
+from evident.bootstrap import (_bca_interval, _bootstrap_quantiles,
+                               _check_ci_method, _num_replicates,
+                               _seed_sequence)
 from evident.data_handler import _BaseDataHandler
-from evident.stats import calculate_cohens_d
+from evident.stats import (_analytic_effect_size_ci,
+                           _pairwise_cohens_d_from_moments)
 from evident.results import EffectSizeResults, PairwiseEffectSizeResult
 
 
@@ -14,7 +19,9 @@ def effect_size_by_category(
     columns: list = None,
     bootstrap_iterations: int = None,
     n_jobs: int = None,
-    parallel_args: dict = None
+    parallel_args: dict = None,
+    random_state=None,
+    ci_method: str = "percentile"
 ) -> pd.DataFrame:
     """Compute effect size for a set of columns.
 
@@ -44,20 +51,44 @@ def effect_size_by_category(
         https://joblib.readthedocs.io/en/latest/generated/joblib.Parallel.html
     :type parallel_args: dict
 
+    :param random_state: Seed or numpy SeedSequence for bootstrapping.
+        Each column bootstraps from its own stream spawned from it, so
+        results are identical for any n_jobs. By default fresh entropy is
+        used.
+    :type random_state: int or np.random.SeedSequence
+
+    :param ci_method: Type of confidence interval, either 'percentile'
+        (default), 'bca', or 'analytic'. 'analytic' computes intervals for
+        all columns at once by inverting the noncentral t or F distribution
+        and does not bootstrap. See
+        evident.data_handler._BaseDataHandler.calculate_effect_size.
+    :type ci_method: str
+
     :returns: DataFrame of effect size per category
     :rtype: pd.DataFrame
     """
     _check_columns(columns)
     dh = data_handler
+    # Per-level stats of all columns are computed together up front
+    dh._precompute_group_stats(columns)
 
     if parallel_args is None:
         parallel_args = dict()
 
+    if ci_method == "analytic":
+        results = Parallel(n_jobs=n_jobs, **parallel_args)(
+            delayed(dh.calculate_effect_size)(col) for col in columns
+        )
+        _add_analytic_intervals(dh, results)
+        return EffectSizeResults(results)
+
+    seeds = _column_seeds(random_state, len(columns))
     results = Parallel(n_jobs=n_jobs, **parallel_args)(
         delayed(dh.calculate_effect_size)(
-            col, bootstrap_iterations=bootstrap_iterations
+            col, bootstrap_iterations=bootstrap_iterations, random_state=seed,
+            ci_method=ci_method
         )
-        for col in columns
+        for col, seed in zip(columns, seeds)
     )
 
     return EffectSizeResults(results)
@@ -68,7 +99,14 @@ def pairwise_effect_size_by_category(
     columns: list = None,
     bootstrap_iterations: int = None,
     n_jobs: int = None,
-    parallel_args: dict = None
+    parallel_args: dict = None,
+    batch_size: int = 100,
+    sketch_size: int = None,
+    random_state=None,
+    tolerance: float = None,
+    deadline: float = None,
+    ci_method: str = "percentile",
+    bootstrap_method: str = "resample"
 ) -> pd.DataFrame:
     """Compute effect size for a set of columns using pairwise comparisons.
 
@@ -99,18 +137,65 @@ def pairwise_effect_size_by_category(
         https://joblib.readthedocs.io/en/latest/generated/joblib.Parallel.html
     :type parallel_args: dict
 
+    :param batch_size: Number of bootstrap replicates to compute at once,
+        defaults to 100. Each replicate resamples all samples once and is
+        shared by every pairwise comparison in a column.
+    :type batch_size: int
+
+    :param sketch_size: If provided, bootstrap replicates are folded into a
+        bounded-memory evident.bootstrap.QuantileSketch of this size instead
+        of being stored, defaults to None. See
+        evident.bootstrap.QuantileSketch for the error bound.
+    :type sketch_size: int
+
+    :param random_state: Seed or numpy SeedSequence for bootstrapping.
+        Each column bootstraps from its own stream spawned from it, so
+        results are identical for any n_jobs. By default fresh entropy is
+        used.
+    :type random_state: int or np.random.SeedSequence
+
+    :param tolerance: If provided, bootstrap each column adaptively.
+        Replicates are computed a batch at a time and bootstrapping stops
+        once no confidence interval endpoint of any comparison in the column
+        changes by more than tolerance after a batch. bootstrap_iterations is
+        then the max number of replicates. By default all iterations are
+        run.
+    :type tolerance: float
+
+    :param deadline: If provided, stop bootstrapping each column after the
+        first batch that finishes more than this many seconds after
+        starting, defaults to None.
+    :type deadline: float
+
+    :param ci_method: Type of bootstrap confidence interval, either
+        'percentile' (default) or 'bca' for bias-corrected and accelerated
+        intervals.
+    :type ci_method: str
+
+    :param bootstrap_method: How to generate bootstrap replicates, either
+        'resample' (default) or 'vectorized'. 'resample' uses each drawn
+        sample once per replicate while 'vectorized' keeps duplicated draws
+        and computes whole batches of replicates at once. See
+        evident.data_handler._BaseDataHandler.calculate_effect_size.
+    :type bootstrap_method: str
+
     :returns: DataFrame of effect size per pairwise comparison
     :rtype: pd.DataFrame
     """
     _check_columns(columns)
     dh = data_handler
+    # Per-level stats of all columns are computed together up front
+    dh._precompute_group_stats(columns)
 
     if parallel_args is None:
         parallel_args = dict()
 
+    seeds = _column_seeds(random_state, len(columns))
     results = Parallel(n_jobs=n_jobs, **parallel_args)(
-        delayed(_pw_column)(dh, col, bootstrap_iterations)
-        for col in columns
+        delayed(_pw_column)(dh, col, bootstrap_iterations, batch_size,
+                            sketch_size, seed, tolerance, deadline,
+                            ci_method, bootstrap_method)
+        for col, seed in zip(columns, seeds)
     )
     # Above results in list of lists - want to combine into one list
     results = list(chain.from_iterable(results))
@@ -118,51 +203,117 @@ def pairwise_effect_size_by_category(
     return EffectSizeResults(results)
 
 
+def _add_analytic_intervals(dh, results) -> None:
+    """Fill analytical confidence intervals of results in one pass."""
+    lower, upper = _analytic_effect_size_ci(
+        [res.effect_size for res in results],
+        [dh._level_sample_counts(res.column) for res in results]
+    )
+    for res, _lower, _upper in zip(results, lower, upper):
+        res.lower_es = _lower
+        res.upper_es = _upper
+        res.ci_method = "analytic"
+
+
 def _check_columns(columns) -> None:
     """Check to make sure a list of columns has been passed."""
     if columns is None:
         raise ValueError("Must provide list of columns!")
 
 
-def _pw_column(dh, col, bootstrap_iterations=None):
-    """Compute pairwise effect sizes on a single column."""
+def _column_seeds(random_state, num_columns: int) -> list:
+    """Spawn one seed per column, or None for all if not seeded.
+
+    Keeping unseeded columns unseeded lets data handlers tell which
+    results are reproducible.
+    """
+    if random_state is None:
+        return [None] * num_columns
+    return _seed_sequence(random_state).spawn(num_columns)
+
+
+def _pw_column(dh, col, bootstrap_iterations=None, batch_size=100,
+               sketch_size=None, random_state=None, tolerance=None,
+               deadline=None, ci_method="percentile",
+               bootstrap_method="resample"):
+    """Compute pairwise effect sizes on a single column.
+
+    Reproducible results are read from the on-disk result cache of the
+    data handler if it has one.
+    """
+    compute = partial(_pw_column_effect_sizes, dh, col, bootstrap_iterations,
+                      batch_size, sketch_size, random_state, tolerance,
+                      deadline, ci_method, bootstrap_method)
+    if bootstrap_iterations is not None and (random_state is None
+                                             or deadline is not None):
+        return compute()
+    params = dict(bootstrap_iterations=bootstrap_iterations,
+                  batch_size=batch_size, sketch_size=sketch_size,
+                  random_state=random_state, tolerance=tolerance,
+                  ci_method=ci_method, bootstrap_method=bootstrap_method)
+    return dh._disk_cached("pairwise_effect_size", col, params, compute)
+
+
+def _pw_column_effect_sizes(dh, col, bootstrap_iterations=None,
+                            batch_size=100, sketch_size=None,
+                            random_state=None, tolerance=None,
+                            deadline=None, ci_method="percentile",
+                            bootstrap_method="resample"):
+    """Compute pairwise effect sizes on a single column.
+
+    Point estimates for every pair of levels come from the cached per-level
+    stats of the column. When bootstrapping, each replicate draws a single
+    resample of all samples. Per-level moments of that resample give
+    Cohen's d for every pair of levels at once. With bootstrap_method
+    'resample', samples drawn more than once count once, as for
+    non-pairwise effect sizes.
+    """
     col_results = []
-    values_dict = dict()
+    group_stats = dh._group_stats(col)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        effect_sizes = _pairwise_cohens_d_from_moments(
+            group_stats.counts, group_stats.means, group_stats.m2
+        )
 
     if bootstrap_iterations is not None:
-        metadata_iter = [
-            dh.metadata.sample(frac=1, replace=True)
-            for i in range(bootstrap_iterations)
-        ]
-    else:
-        metadata_iter = []
-
-    # Get all index sets here to avoid redundant computation
-    grp_dfs = dh.metadata.groupby(col)
-    for grp, _df in grp_dfs:
-        values_dict[grp] = dh.subset_values(_df.index)
-
-    for grp1, grp2 in combinations(values_dict.keys(), 2):
-        vals1 = values_dict[grp1]
-        vals2 = values_dict[grp2]
-        effect_size = calculate_cohens_d(vals1, vals2)
-        res = PairwiseEffectSizeResult(effect_size, "cohens_d", col,
+        _check_ci_method(ci_method, ["percentile", "bca"])
+        if bootstrap_method not in ["resample", "vectorized"]:
+            raise ValueError(
+                "bootstrap_method must be either 'resample' or 'vectorized'."
+            )
+        boot = dh._vectorized_bootstrap(
+            column=col,
+            statistic=_pairwise_cohens_d_from_moments,
+            bootstrap_iterations=bootstrap_iterations,
+            batch_size=batch_size,
+            sketch_size=sketch_size,
+            random_state=random_state,
+            tolerance=tolerance,
+            deadline=deadline,
+            deduplicate=bootstrap_method == "resample"
+        )
+        iterations = _num_replicates(boot)
+        if ci_method == "percentile":
+            lower_es, upper_es = _bootstrap_quantiles(boot, [0.025, 0.975])
+        else:
+            codes, levels = dh._column_codes(col)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                jackknife = _pairwise_cohens_d_from_moments(
+                    *dh._jackknife_group_moments(codes, len(levels))
+                )
+            lower_es, upper_es = _bca_interval(boot, effect_sizes, jackknife)
+
+    levels = group_stats.levels
+    for (i, grp1), (j, grp2) in combinations(enumerate(levels), 2):
+        res = PairwiseEffectSizeResult(effect_sizes[i, j], "cohens_d", col,
                                        difference=None,
                                        group_1=grp1, group_2=grp2)
 
         if bootstrap_iterations is not None:
-            bootstrapped_es = []
-            for metadata in metadata_iter:
-                repl_dict = {grp1: "A", grp2: "B"}
-                metadata["_tmp"] = metadata[col].map(repl_dict)
-                arrays, _, _ = dh._get_values(metadata, "_tmp")
-                boot_es = calculate_cohens_d(*arrays)
-                bootstrapped_es.append(boot_es)
-
-            lower_es, upper_es = np.quantile(bootstrapped_es, [0.025, 0.975])
-            res.lower_es = lower_es
-            res.upper_es = upper_es
-            res.iterations = bootstrap_iterations
+            res.lower_es = lower_es[i, j]
+            res.upper_es = upper_es[i, j]
+            res.iterations = iterations
+            res.ci_method = ci_method
 
         col_results.append(res)
 
@@ -4,6 +4,7 @@ import shutil
 from evident.data_handler import (_BaseDataHandler,
                                   UnivariateDataHandler,
                                   MultivariateDataHandler)
+from evident.distances import CondensedDistances
 
 
 def create_bokeh_app(
@@ -36,6 +37,9 @@ def create_bokeh_app(
         data.to_csv(data_loc, sep="\t", index=True)
     elif isinstance(data_handler, MultivariateDataHandler):
         data_loc = os.path.join(data_dir, "data.multivariate.lsmat")
-        data.write(data_loc)
+        if isinstance(data, CondensedDistances):
+            data = data.to_distance_matrix()
+        # Data of multivariate handlers includes samples not in metadata
+        data.filter(data_handler.samples).write(data_loc)
     else:
         raise ValueError("No valid data found!")
@@ -5,6 +5,7 @@ from qiime2 import Metadata
 from skbio import DistanceMatrix
 
 from evident import UnivariateDataHandler, MultivariateDataHandler
+from evident.cache import ResultCache
 from evident.data_handler import RepeatedMeasuresUnivariateDataHandler as RDH
 from evident.effect_size import (effect_size_by_category,
                                  pairwise_effect_size_by_category)
@@ -28,6 +29,7 @@ def univariate_power_analysis(
     power: list = None,
     total_observations: list = None,
     difference: list = None,
+    cache_dir: str = None,
 ) -> pd.DataFrame:
     sample_metadata = sample_metadata.to_dataframe()
     _check_provided_univariate_data(sample_metadata, data_column)
@@ -39,7 +41,7 @@ def univariate_power_analysis(
                           max_levels_per_category, min_count_per_level,
                           alpha=alpha, power=power,
                           total_observations=total_observations,
-                          difference=difference)
+                          difference=difference, cache_dir=cache_dir)
     return res
 
 
@@ -53,6 +55,7 @@ def multivariate_power_analysis(
     power: list = None,
     total_observations: list = None,
     difference: list = None,
+    cache_dir: str = None,
 ) -> pd.DataFrame:
     sample_metadata = sample_metadata.to_dataframe()
     res = _power_analysis(data, sample_metadata, group_column,
@@ -60,14 +63,23 @@ def multivariate_power_analysis(
                           max_levels_per_category, min_count_per_level,
                           alpha=alpha, power=power,
                           total_observations=total_observations,
-                          difference=difference)
+                          difference=difference, cache_dir=cache_dir)
     return res
 
 
+def _result_cache(cache_dir):
+    """Get on-disk result cache in cache_dir if provided."""
+    if cache_dir is None:
+        return None
+    return ResultCache(cache_dir)
+
+
 def _power_analysis(data, metadata, group_column, handler,
-                    max_levels_per_category, min_count_per_level, **kwargs):
+                    max_levels_per_category, min_count_per_level,
+                    cache_dir=None, **kwargs):
     dh = handler(data, metadata, max_levels_per_category,
-                 min_count_per_level)
+                 min_count_per_level,
+                 result_cache=_result_cache(cache_dir))
     res = dh.power_analysis(group_column, **kwargs)
     return res.to_dataframe()
 
@@ -80,7 +92,9 @@ def univariate_effect_size_by_category(
     n_jobs: int = None,
     max_levels_per_category: int = 5,
     min_count_per_level: int = 3,
-    bootstrap_iterations: int = None
+    bootstrap_iterations: int = None,
+    random_state: int = None,
+    cache_dir: str = None
 ) -> pd.DataFrame:
     sample_metadata = sample_metadata.to_dataframe()
     _check_provided_univariate_data(sample_metadata, data_column)
@@ -91,7 +105,8 @@ def univariate_effect_size_by_category(
                                    UnivariateDataHandler, group_columns,
                                    pairwise, n_jobs, max_levels_per_category,
                                    min_count_per_level,
-                                   bootstrap_iterations)
+                                   bootstrap_iterations, random_state,
+                                   cache_dir)
     return res
 
 
@@ -103,30 +118,36 @@ def multivariate_effect_size_by_category(
     n_jobs: int = None,
     max_levels_per_category: int = 5,
     min_count_per_level: int = 3,
-    bootstrap_iterations: int = None
+    bootstrap_iterations: int = None,
+    random_state: int = None,
+    cache_dir: str = None
 ) -> pd.DataFrame:
     sample_metadata = sample_metadata.to_dataframe()
     res = _effect_size_by_category(data, sample_metadata,
                                    MultivariateDataHandler, group_columns,
                                    pairwise, n_jobs, max_levels_per_category,
                                    min_count_per_level,
-                                   bootstrap_iterations)
+                                   bootstrap_iterations, random_state,
+                                   cache_dir)
     return res
 
 
 def _effect_size_by_category(data, metadata, handler, columns, pairwise,
                              n_jobs, max_levels_per_category,
                              min_count_per_level,
-                             bootstrap_iterations):
+                             bootstrap_iterations, random_state=None,
+                             cache_dir=None):
     dh = handler(data, metadata, max_levels_per_category,
-                 min_count_per_level)
+                 min_count_per_level,
+                 result_cache=_result_cache(cache_dir))
     if pairwise:
         func = pairwise_effect_size_by_category
     else:
         func = effect_size_by_category
 
     res = func(dh, columns, n_jobs=n_jobs,
-               bootstrap_iterations=bootstrap_iterations)
+               bootstrap_iterations=bootstrap_iterations,
+               random_state=random_state)
     return res.to_dataframe()
 
 
@@ -46,6 +46,11 @@ PA_PARAM_DESCS = {
         "Min number of samples in a given category level to keep. Any levels "
         "that have fewer than this many samples will not be saved, defaults "
         "to 3."
+    ),
+    "cache_dir": (
+        "Directory of an on-disk cache of results. Re-running the same "
+        "analysis on the same data reads the result from it. By default "
+        "nothing is cached."
     )
 }
 
@@ -75,6 +80,15 @@ ES_PARAM_DESCS = {
         "Number of reshuffles of the data to use to generate confidence "
         "interval of effect size(s). By default does not do any "
         "bootstrapping."
+    ),
+    "random_state": (
+        "Seed for bootstrapping. By default fresh entropy is used. Confidence "
+        "intervals are only read from cache_dir if a seed is provided."
+    ),
+    "cache_dir": (
+        "Directory of an on-disk cache of results. Re-running the same "
+        "analysis on the same data reads the result from it. By default "
+        "nothing is cached."
     )
 }
 
@@ -110,7 +124,8 @@ plugin.methods.register_function(
         "total_observations": List[Int],
         "difference": List[Float],
         "max_levels_per_category": Int,
-        "min_count_per_level": Int
+        "min_count_per_level": Int,
+        "cache_dir": Str
     },
     parameter_descriptions=UNIV_PA_PARAM_DESCS,
     outputs=[("power_analysis_results", PowerAnalysisResults)],
@@ -134,7 +149,8 @@ plugin.methods.register_function(
         "total_observations": List[Int],
         "difference": List[Float],
         "max_levels_per_category": Int,
-        "min_count_per_level": Int
+        "min_count_per_level": Int,
+        "cache_dir": Str
     },
     parameter_descriptions=PA_PARAM_DESCS,
     outputs=[("power_analysis_results", PowerAnalysisResults)],
@@ -148,7 +164,7 @@ plugin.methods.register_function(
 rm_param_descs = {
     k: v for k, v in PA_PARAM_DESCS.items()
     if k not in ["total_observations", "difference", "power",
-                 "group_column"]
+                 "group_column", "cache_dir"]
 }
 rm_param_descs["individual_id_column"] = (
     "Metadata column containing IDs for individual subjects."
@@ -199,7 +215,9 @@ plugin.methods.register_function(
         "n_jobs": Int,
         "max_levels_per_category": Int,
         "min_count_per_level": Int,
-        "bootstrap_iterations": Int
+        "bootstrap_iterations": Int,
+        "random_state": Int,
+        "cache_dir": Str
     },
     parameter_descriptions=ES_PARAM_DESCS,
     outputs=[("effect_size_results", EffectSizeResults)],
@@ -221,7 +239,9 @@ plugin.methods.register_function(
         "n_jobs": Int,
         "max_levels_per_category": Int,
         "min_count_per_level": Int,
-        "bootstrap_iterations": Int
+        "bootstrap_iterations": Int,
+        "random_state": Int,
+        "cache_dir": Str
     },
     parameter_descriptions=ES_PARAM_DESCS,
     outputs=[("effect_size_results", EffectSizeResults)],
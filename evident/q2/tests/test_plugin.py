@@ -175,6 +175,23 @@ def test_bootstrap(alpha_artifact, metadata_w_data):
         assert row["iterations"] == 100
 
 
+def test_bootstrap_cache_dir(alpha_artifact, metadata_w_data, tmpdir):
+    results = []
+    for _ in range(2):
+        res = evident.methods.univariate_effect_size_by_category(
+            sample_metadata=metadata_w_data,
+            data_column="alpha_div",
+            group_columns=["classification", "cd_behavior"],
+            bootstrap_iterations=50,
+            random_state=42,
+            cache_dir=str(tmpdir)
+        ).effect_size_results.view(pd.DataFrame)
+        results.append(res)
+    pd.testing.assert_frame_equal(results[0], results[1])
+    # Point estimate and interval of each column
+    assert len(os.listdir(str(tmpdir))) == 4
+
+
 def test_visualize_es_results(es_results):
     evident.visualizers.visualize_results(results=es_results)
 
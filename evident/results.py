@@ -1,9 +1,36 @@
-from dataclasses import dataclass, field, asdict
-from typing import Any, List
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, List
 
+import numpy as np
 import pandas as pd
 
 
+def _slotted(cls: type) -> type:
+    """Recreate a dataclass with __slots__ for its fields.
+
+    Same as dataclass(slots=True), which needs Python 3.10. Instances do
+    not carry a __dict__, so large collections of results take much less
+    memory. As the class is recreated, methods must not use zero-argument
+    super(). Class-level defaults conflict with slots and are removed, so
+    fields not set on init must be set in __post_init__.
+    """
+    cls_dict = dict(cls.__dict__)
+    inherited = {
+        name for base in cls.__mro__[1:]
+        for name in base.__dict__.get("__slots__", ())
+    }
+    field_names = [f.name for f in fields(cls)]
+    cls_dict["__slots__"] = tuple(
+        name for name in field_names if name not in inherited
+    )
+    for name in field_names:
+        cls_dict.pop(name, None)
+    cls_dict.pop("__dict__", None)
+    cls_dict.pop("__weakref__", None)
+    return type(cls)(cls.__name__, cls.__bases__, cls_dict)
+
+
+@_slotted
 @dataclass
 class EffectSizeResult:
     effect_size: float
@@ -13,19 +40,28 @@ class EffectSizeResult:
     lower_es: float = field(default=None, init=False)
     upper_es: float = field(default=None, init=False)
     iterations: int = field(default=None, init=False)
+    ci_method: str = field(default=None, init=False)
+
+    def __post_init__(self):
+        self.lower_es = None
+        self.upper_es = None
+        self.iterations = None
+        self.ci_method = None
 
     def to_dict(self) -> dict:
-        d = asdict(self)
+        d = _record(self)
         d = {k: v for k, v in d.items() if v is not None}
         return d
 
 
+@_slotted
 @dataclass
 class PairwiseEffectSizeResult(EffectSizeResult):
     group_1: str
     group_2: str
 
 
+@_slotted
 @dataclass
 class PowerAnalysisResult:
     alpha: float
@@ -42,6 +78,7 @@ class PowerAnalysisResult:
         return res_dict
 
 
+@_slotted
 @dataclass
 class RepeatedMeasuresPowerAnalysisResult(PowerAnalysisResult):
     alpha: float
@@ -53,7 +90,7 @@ class RepeatedMeasuresPowerAnalysisResult(PowerAnalysisResult):
     correlation: float
 
     def to_dict(self) -> dict:
-        res_dict = super().to_dict()
+        res_dict = PowerAnalysisResult.to_dict(self)
         res_dict.update({
             "subjects": self.subjects,
             "measurements": self.measurements,
@@ -64,6 +101,17 @@ class RepeatedMeasuresPowerAnalysisResult(PowerAnalysisResult):
         return res_dict
 
 
+def _record(result) -> dict:
+    """Get the fields of a result as a dict without copying values.
+
+    Unlike dataclasses.asdict, nested results and values are not copied.
+    """
+    return {
+        name: getattr(result, name)
+        for name in result.__dataclass_fields__
+    }
+
+
 class _EvidentResults:
     def __init__(self, results: List[Any]):
         self.results = results
@@ -93,10 +141,98 @@ class _EvidentResults:
 
 
 class PowerAnalysisResults(_EvidentResults):
-    def __init__(self, results: List[PowerAnalysisResult]):
+    """Collection of power analysis results.
+
+    Results are either a list of result objects or, when created with
+    from_columns, one NumPy array per field. Columnar results convert to a
+    DataFrame without per-row work and, if created with dims, can be
+    reshaped into a grid over the analysis arguments. Result objects of
+    columnar results are only created on iteration or indexing.
+    """
+    def __init__(self, results: List[PowerAnalysisResult] = None):
+        if results is None:
+            results = []
         super().__init__(results)
+        self._columns = None
+        self._dims = None
+        self._result_type = PowerAnalysisResult
+
+    @classmethod
+    def from_columns(
+        cls,
+        columns: Dict[str, np.ndarray],
+        dims: Dict[str, list] = None,
+        result_type: type = PowerAnalysisResult
+    ) -> "PowerAnalysisResults":
+        """Create results from one array per field.
+
+        :param columns: Values of each field of the results in output
+            order. Fields of EffectSizeResult are stored in the effect size
+            result of each row. If dims is provided, values are broadcast to
+            the grid.
+        :type columns: Dict[str, np.ndarray]
+
+        :param dims: Name and values of each argument the results span, in
+            the order rows iterate over them (last varies fastest), defaults
+            to None
+        :type dims: Dict[str, list]
+
+        :param result_type: Type of each result, defaults to
+            PowerAnalysisResult
+        :type result_type: type
+
+        :returns: Columnar results
+        :rtype: evident.results.PowerAnalysisResults
+        """
+        if dims is not None:
+            dims = {k: list(v) for k, v in dims.items()}
+            shape = tuple(len(v) for v in dims.values())
+            columns = {k: np.broadcast_to(v, shape)
+                       for k, v in columns.items()}
+        columns = {k: np.asarray(v).ravel() for k, v in columns.items()}
+        if len({len(v) for v in columns.values()}) != 1:
+            raise ValueError("All columns must have the same length.")
+
+        res = cls()
+        res._results = None
+        res._columns = columns
+        res._dims = dims
+        res._result_type = result_type
+        return res
+
+    @property
+    def results(self) -> List[PowerAnalysisResult]:
+        if self._results is None:
+            self._results = [self._row(i) for i in range(len(self))]
+        return self._results
+
+    @results.setter
+    def results(self, results: List[PowerAnalysisResult]):
+        self._results = results
+
+    @property
+    def dims(self) -> Dict[str, list]:
+        """Name and values of each argument the results span."""
+        return self._dims
+
+    def to_grid(self, field_name: str = "power") -> np.ndarray:
+        """Get values of a field shaped as a grid over dims.
+
+        :param field_name: Name of field, defaults to 'power'
+        :type field_name: str
+
+        :returns: Values with one axis per entry of dims
+        :rtype: np.ndarray
+        """
+        if self._dims is None:
+            raise ValueError("Results were not created over a grid.")
+        shape = tuple(len(v) for v in self._dims.values())
+        return self._columns[field_name].reshape(shape)
 
     def to_dataframe(self):
+        if self._columns is not None:
+            return pd.DataFrame(self._columns)
+
         records = []
         for res in self.results:
             this_res_dict = res.to_dict()
@@ -106,6 +242,45 @@ class PowerAnalysisResults(_EvidentResults):
 
         return pd.DataFrame.from_records(records)
 
+    def __iter__(self):
+        if self._columns is not None and self._results is None:
+            return (self._row(i) for i in range(len(self)))
+        return super().__iter__()
+
+    def __len__(self):
+        if self._columns is not None:
+            return len(next(iter(self._columns.values())))
+        return super().__len__()
+
+    def __getitem__(self, index):
+        if self._columns is not None and self._results is None:
+            if isinstance(index, slice):
+                return [self._row(i) for i in range(len(self))[index]]
+            return self._row(range(len(self))[index])
+        return super().__getitem__(index)
+
+    def _row(self, i: int) -> PowerAnalysisResult:
+        """Create the result object of a row of columnar results."""
+        es_fields = {f.name: f.init for f in fields(EffectSizeResult)}
+        es_args = {k: None for k, init in es_fields.items() if init}
+        es_attrs, res_args = dict(), dict()
+        for name, values in self._columns.items():
+            value = values[i]
+            if isinstance(value, np.generic):
+                value = value.item()
+            if name not in es_fields:
+                res_args[name] = value
+            elif es_fields[name]:
+                es_args[name] = value
+            else:
+                es_attrs[name] = value
+
+        effect_size_result = EffectSizeResult(**es_args)
+        for name, value in es_attrs.items():
+            setattr(effect_size_result, name, value)
+        return self._result_type(effect_size_result=effect_size_result,
+                                 **res_args)
+
 
 class EffectSizeResults(_EvidentResults):
     def __init__(self, results: List[EffectSizeResult]):
@@ -118,3 +293,22 @@ class EffectSizeResults(_EvidentResults):
                                 ascending=[True, False])
 
         return df.reset_index(drop=True)
+
+
+def _axis_values(values: Any, axis: int, ndim: int) -> np.ndarray:
+    """Shape values to broadcast along one axis of a grid."""
+    shape = [1] * ndim
+    shape[axis] = -1
+    return np.asarray(values).reshape(shape)
+
+
+def _effect_size_columns(
+    effect_size_results: List[EffectSizeResult]
+) -> Dict[str, np.ndarray]:
+    """Get values of each field that is set in any effect size result."""
+    columns = dict()
+    for f in fields(EffectSizeResult):
+        values = [getattr(x, f.name) for x in effect_size_results]
+        if any(x is not None for x in values):
+            columns[f.name] = np.array(values)
+    return columns
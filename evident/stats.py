@@ -1,6 +1,8 @@
+from dataclasses import dataclass
+
 import numpy as np
 import pandas as pd
-from scipy import stats
+from scipy import special, stats
 
 
 def calculate_pooled_stdev(*arrays) -> float:
@@ -14,19 +16,8 @@ def calculate_pooled_stdev(*arrays) -> float:
     :returns: Pooled standard deviation
     :rtype: float
     """
-    pooled_variance_numerator = 0
-    lengths = []
-    k = len(arrays)
-
-    for array in arrays:
-        sample_variance = np.var(array, ddof=1)  # delta DF = 1 for unbiased
-        pooled_variance_numerator += sample_variance * (len(array) - 1)
-        lengths.append(len(array))
-
-    pooled_variance_denominator = sum(lengths) - k
-    pooled_variance = pooled_variance_numerator / pooled_variance_denominator
-
-    return np.sqrt(pooled_variance)
+    counts, _, m2 = _moments_of_arrays(arrays)
+    return calculate_pooled_stdev_from_moments(counts, m2)
 
 
 def calculate_cohens_d(values_1: np.ndarray, values_2: np.ndarray) -> float:
@@ -41,10 +32,9 @@ def calculate_cohens_d(values_1: np.ndarray, values_2: np.ndarray) -> float:
     :returns: Cohen's d effect size
     :rtype: float
     """
-    pooled_std = calculate_pooled_stdev(values_1, values_2)
-    mu_1 = np.mean(values_1)
-    mu_2 = np.mean(values_2)
-    return np.abs(mu_1 - mu_2)/pooled_std
+    return calculate_cohens_d_from_moments(
+        *_moments_of_arrays([values_1, values_2])
+    )
 
 
 def calculate_cohens_f(*arrays) -> float:
@@ -59,21 +49,302 @@ def calculate_cohens_f(*arrays) -> float:
     :returns: Cohen's f effect size
     :rtype: float
     """
-    pooled_std = calculate_pooled_stdev(*arrays)
+    return calculate_cohens_f_from_moments(*_moments_of_arrays(arrays))
 
-    concat_array = np.concatenate(arrays)
-    mu_total = np.mean(concat_array)
 
-    effect_size_numerator = 0
-    for array in arrays:
-        mu_group = np.mean(array)
-        effect_size_numerator += (
-            len(array) / len(concat_array)
-            * np.power(mu_group - mu_total, 2)
-        )
-    effect_size_numerator = np.sqrt(effect_size_numerator)
+def calculate_group_moments(
+    values: np.ndarray,
+    codes: np.ndarray,
+    num_groups: int = None
+):
+    """Compute per-group count, mean, and sum of squared deviations.
+
+    The last axis of values indexes samples. Any leading axes (e.g.
+    bootstrap replicates or features) are treated independently. All
+    groups of all rows are computed in one pass with two bincounts over
+    (row, group) bins, using the two-pass algorithm for the sums of squared
+    deviations.
+
+    :param values: Array of shape (..., samples)
+    :type values: np.ndarray
+
+    :param codes: Integer group of each sample, -1 to ignore a sample.
+        Either of shape (samples, ) or the same shape as values.
+    :type codes: np.ndarray
+
+    :param num_groups: Number of groups, defaults to max(codes) + 1
+    :type num_groups: int
+
+    :returns: Counts, means, and sums of squared deviations from the mean,
+        each of shape (..., num_groups)
+    :rtype: Tuple[np.ndarray, np.ndarray, np.ndarray]
+    """
+    values = np.asarray(values, dtype=float)
+    codes = np.broadcast_to(np.asarray(codes), values.shape)
+    if num_groups is None:
+        num_groups = int(codes.max(initial=-1)) + 1
+
+    lead_shape = values.shape[:-1]
+    num_rows = int(np.prod(lead_shape))
+    values = values.reshape(num_rows, -1)
+    codes = codes.reshape(num_rows, -1)
+
+    valid = codes != -1
+    bins = (np.arange(num_rows)[:, np.newaxis] * num_groups + codes)[valid]
+    values = values[valid]
+
+    size = num_rows * num_groups
+    shape = lead_shape + (num_groups, )
+    counts = np.bincount(bins, minlength=size)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = np.bincount(bins, weights=values, minlength=size) / counts
+    deviations = values - means[bins]
+    m2 = np.bincount(bins, weights=deviations ** 2,
+                     minlength=size).astype(float)
+    # Groups without observations have undefined spread
+    m2[counts == 0] = np.nan
+    return counts.reshape(shape), means.reshape(shape), m2.reshape(shape)
+
+
+def calculate_pooled_stdev_from_moments(
+    counts: np.ndarray,
+    m2: np.ndarray
+) -> np.ndarray:
+    """Compute pooled standard deviation from per-group moments.
+
+    The last axis indexes groups, all leading axes are treated
+    independently.
+
+    :param counts: Number of observations per group
+    :type counts: np.ndarray
+
+    :param m2: Sum of squared deviations from the mean per group
+    :type m2: np.ndarray
+
+    :returns: Pooled standard deviation
+    :rtype: np.ndarray
+    """
+    k = counts.shape[-1]
+    return np.sqrt(m2.sum(axis=-1) / (counts.sum(axis=-1) - k))
+
+
+def calculate_cohens_d_from_moments(
+    counts: np.ndarray,
+    means: np.ndarray,
+    m2: np.ndarray
+) -> np.ndarray:
+    """Calculate Cohen's d from moments of two groups.
+
+    :param counts: Number of observations per group, last axis of length 2
+    :type counts: np.ndarray
+
+    :param means: Mean per group, last axis of length 2
+    :type means: np.ndarray
+
+    :param m2: Sum of squared deviations from the mean per group, last axis
+        of length 2
+    :type m2: np.ndarray
+
+    :returns: Cohen's d effect size
+    :rtype: np.ndarray
+    """
+    pooled_std = calculate_pooled_stdev_from_moments(counts, m2)
+    return np.abs(means[..., 0] - means[..., 1]) / pooled_std
+
+
+def calculate_cohens_f_from_moments(
+    counts: np.ndarray,
+    means: np.ndarray,
+    m2: np.ndarray
+) -> np.ndarray:
+    """Calculate Cohen's f from per-group moments.
+
+    :param counts: Number of observations per group, last axis is groups
+    :type counts: np.ndarray
+
+    :param means: Mean per group, last axis is groups
+    :type means: np.ndarray
+
+    :param m2: Sum of squared deviations from the mean per group, last axis
+        is groups
+    :type m2: np.ndarray
+
+    :returns: Cohen's f effect size
+    :rtype: np.ndarray
+    """
+    pooled_std = calculate_pooled_stdev_from_moments(counts, m2)
+    total = counts.sum(axis=-1, keepdims=True)
+    mu_total = (counts * means).sum(axis=-1, keepdims=True) / total
+    effect_size_numerator = np.sqrt(
+        (counts / total * np.power(means - mu_total, 2)).sum(axis=-1)
+    )
+    return effect_size_numerator / pooled_std
+
+
+def calculate_pooled_stdev_batch(
+    values: np.ndarray,
+    codes: np.ndarray,
+    num_groups: int = None
+) -> np.ndarray:
+    """Compute pooled standard deviation of each row of a value matrix.
+
+    :param values: Array of shape (..., samples)
+    :type values: np.ndarray
+
+    :param codes: Integer group of each sample, -1 to ignore a sample
+    :type codes: np.ndarray
+
+    :param num_groups: Number of groups, defaults to max(codes) + 1
+    :type num_groups: int
+
+    :returns: Pooled standard deviation of each row
+    :rtype: np.ndarray
+    """
+    counts, _, m2 = calculate_group_moments(values, codes, num_groups)
+    return calculate_pooled_stdev_from_moments(counts, m2)
+
+
+def calculate_cohens_d_batch(
+    values: np.ndarray,
+    codes: np.ndarray
+) -> np.ndarray:
+    """Calculate Cohen's d of each row of a value matrix.
+
+    :param values: Array of shape (..., samples)
+    :type values: np.ndarray
+
+    :param codes: Group of each sample as 0 or 1, -1 to ignore a sample
+    :type codes: np.ndarray
+
+    :returns: Cohen's d of each row
+    :rtype: np.ndarray
+    """
+    return calculate_cohens_d_from_moments(
+        *calculate_group_moments(values, codes, 2)
+    )
+
+
+def calculate_cohens_f_batch(
+    values: np.ndarray,
+    codes: np.ndarray,
+    num_groups: int = None
+) -> np.ndarray:
+    """Calculate Cohen's f of each row of a value matrix.
+
+    :param values: Array of shape (..., samples)
+    :type values: np.ndarray
+
+    :param codes: Integer group of each sample, -1 to ignore a sample
+    :type codes: np.ndarray
+
+    :param num_groups: Number of groups, defaults to max(codes) + 1
+    :type num_groups: int
+
+    :returns: Cohen's f of each row
+    :rtype: np.ndarray
+    """
+    return calculate_cohens_f_from_moments(
+        *calculate_group_moments(values, codes, num_groups)
+    )
 
-    return effect_size_numerator/pooled_std
+
+@dataclass
+class GroupStats:
+    """Per-level count, mean, and sum of squared deviations of a column.
+
+    Holds everything needed for pooled standard deviations and Cohen's d/f
+    so effect sizes take O(levels) arithmetic once built.
+    """
+    levels: list
+    counts: np.ndarray
+    means: np.ndarray
+    m2: np.ndarray
+
+    @classmethod
+    def from_values(
+        cls,
+        values: np.ndarray,
+        codes: np.ndarray,
+        levels: list
+    ) -> "GroupStats":
+        """Build stats from values and the integer level of each value.
+
+        :param values: Value of each observation
+        :type values: np.ndarray
+
+        :param codes: Position in levels of each observation, -1 to ignore
+        :type codes: np.ndarray
+
+        :param levels: Levels of the column
+        :type levels: list
+
+        :returns: Per-level stats
+        :rtype: evident.stats.GroupStats
+        """
+        counts, means, m2 = calculate_group_moments(values, codes,
+                                                    len(levels))
+        return cls(list(levels), counts, means, m2)
+
+    @classmethod
+    def empty(cls, levels: list) -> "GroupStats":
+        """Build stats with no observations in any level."""
+        num_levels = len(levels)
+        return cls(list(levels), np.zeros(num_levels, dtype=int),
+                   np.full(num_levels, np.nan), np.full(num_levels, np.nan))
+
+    def merge(self, other: "GroupStats") -> "GroupStats":
+        """Combine with stats of disjoint observations of the same levels.
+
+        Uses the pairwise update of Chan, Golub, and LeVeque (1979), which
+        is stable for any split of the observations.
+
+        :param other: Stats of other observations
+        :type other: evident.stats.GroupStats
+
+        :returns: Stats of all observations
+        :rtype: evident.stats.GroupStats
+        """
+        counts = self.counts + other.counts
+        with np.errstate(divide="ignore", invalid="ignore"):
+            delta = other.means - self.means
+            means = self.means + delta * other.counts / counts
+            m2 = (self.m2 + other.m2
+                  + delta ** 2 * self.counts * other.counts / counts)
+        means = np.where(self.counts == 0, other.means, means)
+        means = np.where(other.counts == 0, self.means, means)
+        m2 = np.where(self.counts == 0, other.m2, m2)
+        m2 = np.where(other.counts == 0, self.m2, m2)
+        return GroupStats(self.levels, counts, means, m2)
+
+    @property
+    def metric(self) -> str:
+        """Cohen's d for two levels and Cohen's f for more."""
+        return "cohens_d" if len(self.levels) == 2 else "cohens_f"
+
+    def pooled_stdev(self) -> float:
+        """Compute pooled standard deviation across levels."""
+        return calculate_pooled_stdev_from_moments(self.counts, self.m2)
+
+    def effect_size(self, difference: float = None) -> float:
+        """Compute Cohen's d or f, or difference over pooled stdev.
+
+        :param difference: If provided, used as the numerator in effect size
+            calculation rather than the difference in means, defaults to None
+        :type difference: float
+
+        :returns: Effect size
+        :rtype: float
+        """
+        return _effect_size_from_moments(self.counts, self.means, self.m2,
+                                         difference)
+
+
+def _moments_of_arrays(arrays):
+    """Compute per-group moments of a sequence of 1-D arrays."""
+    lengths = [len(x) for x in arrays]
+    codes = np.repeat(np.arange(len(arrays)), lengths)
+    return calculate_group_moments(np.concatenate(arrays), codes,
+                                   len(arrays))
 
 
 def calculate_eta_squared(data: pd.DataFrame) -> float:
@@ -167,3 +438,627 @@ def calculate_rm_anova_power(
     q = stats.f.ppf(1 - threshold, dm, ds)
     power = stats.ncf.sf(q, dm, ds, location)
     return power
+
+
+def calculate_t_test_power(
+    effect_size: np.ndarray,
+    nobs1: np.ndarray,
+    alpha: np.ndarray
+) -> np.ndarray:
+    """Calculate power of a two-sided t-test of two equal-sized groups.
+
+    Evaluates the noncentral t distribution directly, matching
+    statsmodels.stats.power.TTestIndPower with ratio 1. Arguments are
+    broadcast against each other.
+
+    :param effect_size: Cohen's d
+    :type effect_size: np.ndarray
+
+    :param nobs1: Number of observations per group
+    :type nobs1: np.ndarray
+
+    :param alpha: Significance level
+    :type alpha: np.ndarray
+
+    :returns: Probability of rejecting null hypothesis given that the
+        alternative hypothesis is true
+    :rtype: np.ndarray
+    """
+    effect_size, nobs1, alpha = np.broadcast_arrays(
+        np.asarray(effect_size, dtype=float),
+        np.asarray(nobs1, dtype=float),
+        np.asarray(alpha, dtype=float)
+    )
+    df = 2 * nobs1 - 2
+    nobs = 1.0 / (1.0 / nobs1 + 1.0 / nobs1)
+    nc = effect_size * np.sqrt(nobs)
+    crit_upp = stats.t.isf(alpha / 2, df)
+    crit_low = stats.t.ppf(alpha / 2, df)
+    return (
+        (1 - special.nctdtr(df, nc, crit_upp))
+        + special.nctdtr(df, nc, crit_low)
+    )
+
+
+def calculate_anova_power(
+    effect_size: np.ndarray,
+    nobs: np.ndarray,
+    alpha: np.ndarray,
+    k_groups: int
+) -> np.ndarray:
+    """Calculate power of a one-way ANOVA F-test of equal-sized groups.
+
+    Evaluates the noncentral F distribution directly, matching
+    statsmodels.stats.power.FTestAnovaPower. Arguments are broadcast
+    against each other.
+
+    :param effect_size: Cohen's f
+    :type effect_size: np.ndarray
+
+    :param nobs: Total number of observations
+    :type nobs: np.ndarray
+
+    :param alpha: Significance level
+    :type alpha: np.ndarray
+
+    :param k_groups: Number of groups
+    :type k_groups: int
+
+    :returns: Probability of rejecting null hypothesis given that the
+        alternative hypothesis is true
+    :rtype: np.ndarray
+    """
+    effect_size, nobs, alpha = np.broadcast_arrays(
+        np.asarray(effect_size, dtype=float),
+        np.asarray(nobs, dtype=float),
+        np.asarray(alpha, dtype=float)
+    )
+    df_num = k_groups - 1
+    df_denom = nobs - k_groups
+    crit = stats.f.isf(alpha, df_num, df_denom)
+    return 1 - special.ncfdtr(df_num, df_denom, effect_size ** 2 * nobs, crit)
+
+
+def calculate_t_test_nobs(
+    effect_size: np.ndarray,
+    alpha: np.ndarray,
+    power: np.ndarray
+) -> np.ndarray:
+    """Calculate observations per group for a two-sided t-test.
+
+    Solves calculate_t_test_power for nobs1 by vectorized bisection over
+    broadcast arguments. Solutions are at least 2, and NaN where no number
+    of observations reaches the power.
+
+    :param effect_size: Cohen's d
+    :type effect_size: np.ndarray
+
+    :param alpha: Significance level
+    :type alpha: np.ndarray
+
+    :param power: Target power
+    :type power: np.ndarray
+
+    :returns: Number of observations per group, not rounded
+    :rtype: np.ndarray
+    """
+    def _power_gap(nobs1):
+        return _defined_power(
+            calculate_t_test_power(effect_size, nobs1, alpha)
+        ) - power
+
+    nobs1 = _solve_increasing(_power_gap, 2.0, 50.0)
+    return np.where(np.isnan(effect_size + alpha + power), np.nan, nobs1)
+
+
+def calculate_anova_nobs(
+    effect_size: np.ndarray,
+    alpha: np.ndarray,
+    power: np.ndarray,
+    k_groups: int
+) -> np.ndarray:
+    """Calculate total observations for a one-way ANOVA F-test.
+
+    Solves calculate_anova_power for nobs by vectorized bisection over
+    broadcast arguments. Solutions are at least 2 * k_groups, and NaN
+    where no number of observations reaches the power.
+
+    :param effect_size: Cohen's f
+    :type effect_size: np.ndarray
+
+    :param alpha: Significance level
+    :type alpha: np.ndarray
+
+    :param power: Target power
+    :type power: np.ndarray
+
+    :param k_groups: Number of groups
+    :type k_groups: int
+
+    :returns: Total number of observations, not rounded
+    :rtype: np.ndarray
+    """
+    def _power_gap(nobs):
+        return _defined_power(
+            calculate_anova_power(effect_size, nobs, alpha, k_groups)
+        ) - power
+
+    nobs = _solve_increasing(_power_gap, 2.0 * k_groups, 10.0 * k_groups)
+    return np.where(np.isnan(effect_size + alpha + power), np.nan, nobs)
+
+
+def calculate_t_test_mdes(
+    nobs1: np.ndarray,
+    alpha: np.ndarray,
+    power: np.ndarray
+) -> np.ndarray:
+    """Calculate minimum detectable Cohen's d of a two-sided t-test.
+
+    Solves calculate_t_test_power for the effect size over broadcast
+    arguments.
+
+    :param nobs1: Number of observations per group
+    :type nobs1: np.ndarray
+
+    :param alpha: Significance level
+    :type alpha: np.ndarray
+
+    :param power: Target power
+    :type power: np.ndarray
+
+    :returns: Smallest Cohen's d detected with the given power, NaN if
+        there are too few observations
+    :rtype: np.ndarray
+    """
+    def _power_gap(effect_size):
+        return _defined_power(
+            calculate_t_test_power(effect_size, nobs1, alpha)
+        ) - power
+
+    effect_size = _solve_increasing(_power_gap, 0.0, 1.0)
+    undefined = np.isnan(nobs1 + alpha + power) | (np.asarray(nobs1) <= 1)
+    return np.where(undefined, np.nan, effect_size)
+
+
+def calculate_anova_mdes(
+    nobs: np.ndarray,
+    alpha: np.ndarray,
+    power: np.ndarray,
+    k_groups: int
+) -> np.ndarray:
+    """Calculate minimum detectable Cohen's f of a one-way ANOVA F-test.
+
+    Solves calculate_anova_power for the effect size over broadcast
+    arguments.
+
+    :param nobs: Total number of observations
+    :type nobs: np.ndarray
+
+    :param alpha: Significance level
+    :type alpha: np.ndarray
+
+    :param power: Target power
+    :type power: np.ndarray
+
+    :param k_groups: Number of groups
+    :type k_groups: int
+
+    :returns: Smallest Cohen's f detected with the given power, NaN if
+        there are too few observations
+    :rtype: np.ndarray
+    """
+    def _power_gap(effect_size):
+        return _defined_power(
+            calculate_anova_power(effect_size, nobs, alpha, k_groups)
+        ) - power
+
+    effect_size = _solve_increasing(_power_gap, 0.0, 1.0)
+    undefined = (np.isnan(nobs + alpha + power)
+                 | (np.asarray(nobs) <= k_groups))
+    return np.where(undefined, np.nan, effect_size)
+
+
+def _defined_power(power: np.ndarray) -> np.ndarray:
+    """Replace undefined power with 1.
+
+    The noncentral t and F distribution functions return NaN for large
+    noncentrality, where power is effectively 1. Callers must handle
+    undefined effect sizes themselves.
+    """
+    return np.where(np.isnan(power), 1.0, power)
+
+
+def _solve_increasing(func, lower: float, start_upper: np.ndarray,
+                      maxiter: int = 64) -> np.ndarray:
+    """Find where an increasing function of one argument reaches zero.
+
+    The upper end of the bracket starts at start_upper and doubles until
+    func is no longer negative. Used both to solve power for an argument
+    and to invert distribution functions for confidence intervals.
+
+    :param func: Vectorized function of the argument, e.g. power minus
+        target power
+    :type func: Callable
+
+    :param lower: Smallest allowed value of the argument, returned where
+        func is already non-negative there
+    :type lower: float
+
+    :param start_upper: Initial upper end of the bracket, must be positive
+    :type start_upper: float or np.ndarray
+
+    :returns: Solved argument for each element, NaN where zero is never
+        reached
+    :rtype: np.ndarray
+    """
+    lower_gap = func(lower)
+    upper = np.broadcast_to(start_upper, np.shape(lower_gap)).astype(float)
+    for _ in range(maxiter):
+        too_low = func(upper) < 0
+        if not too_low.any():
+            break
+        upper = np.where(too_low, upper * 2, upper)
+
+    with np.errstate(invalid="ignore"):
+        # Zero never reached, e.g. power for zero or undefined effect sizes
+        reached = func(upper) >= 0
+        at_lower = lower_gap >= 0
+        lower = np.full(np.shape(lower_gap), lower)
+        upper = np.where(at_lower | ~reached, lower, upper)
+        root = _false_position(func, lower, upper)
+    root = np.where(at_lower, lower, root)
+    return np.where(reached, root, np.nan)
+
+
+def _false_position(
+    func,
+    lower: np.ndarray,
+    upper: np.ndarray,
+    maxiter: int = 100,
+    rtol: float = 1e-12
+) -> np.ndarray:
+    """Find roots of a monotonic function elementwise by false position.
+
+    Uses the Illinois variant, which keeps the root bracketed like
+    bisection but converges superlinearly for smooth functions. func must
+    be vectorized and change sign between lower and upper for every
+    element with lower != upper.
+
+    :param func: Function of one array argument
+    :type func: Callable
+
+    :param lower: Lower end of bracket for each element
+    :type lower: np.ndarray
+
+    :param upper: Upper end of bracket for each element
+    :type upper: np.ndarray
+
+    :param maxiter: Max number of steps, defaults to 100
+    :type maxiter: int
+
+    :param rtol: Stop once all brackets are narrower than this relative to
+        their upper end, defaults to 1e-12
+    :type rtol: float
+
+    :returns: Root of func for each element
+    :rtype: np.ndarray
+    """
+    a, b = np.broadcast_arrays(np.asarray(lower, dtype=float),
+                               np.asarray(upper, dtype=float))
+    a, b = a.copy(), b.copy()
+    fa, fb = func(a), func(b)
+    for _ in range(maxiter):
+        done = (np.abs(b - a) <= rtol * np.abs(b)) | (fb == 0)
+        if done.all():
+            break
+        with np.errstate(divide="ignore", invalid="ignore"):
+            c = np.where(done, b, b - fb * (b - a) / (fb - fa))
+        fc = func(c)
+        crossed = np.sign(fc) != np.sign(fb)
+        # Move the far end to the old estimate if the root was crossed,
+        #     otherwise halve its value so it is not stuck
+        a = np.where(done, a, np.where(crossed, b, a))
+        fa = np.where(done, fa, np.where(crossed, fb, fa / 2))
+        b = np.where(done, b, c)
+        fb = np.where(done, fb, fc)
+    return b
+
+
+def calculate_rm_anova_mdes(
+    subjects: np.ndarray,
+    measurements: np.ndarray,
+    threshold: np.ndarray,
+    correlation: np.ndarray,
+    epsilon: np.ndarray,
+    power: np.ndarray
+) -> np.ndarray:
+    """Calculate minimum detectable eta-squared of a repeated measures ANOVA.
+
+    Solves calculate_rm_anova_power for the effect size over broadcast
+    arguments.
+
+    :param subjects: Number of subjects (same for all classes)
+    :type subjects: np.ndarray
+
+    :param measurements: Number of measurements per subject (same for all
+        subjects)
+    :type measurements: np.ndarray
+
+    :param threshold: Significance level to reject null hypothesis
+    :type threshold: np.ndarray
+
+    :param correlation: Correlation between repeated measurements
+    :type correlation: np.ndarray
+
+    :param epsilon: Adjustment for sphericity
+    :type epsilon: np.ndarray
+
+    :param power: Target power
+    :type power: np.ndarray
+
+    :returns: Smallest eta-squared detected with the given power
+    :rtype: np.ndarray
+    """
+    def _power_gap(effect_size):
+        return _defined_power(calculate_rm_anova_power(
+            subjects, measurements, threshold, correlation, epsilon,
+            effect_size
+        )) - power
+
+    # Eta-squared is below 1, where the power goes to 1
+    lower = np.zeros(np.shape(_power_gap(0.0)))
+    upper = np.full(lower.shape, 1 - 1e-12)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        at_lower = _power_gap(lower) >= 0
+        reached = _power_gap(upper) >= 0
+        effect_size = _false_position(
+            _power_gap, lower, np.where(at_lower | ~reached, lower, upper)
+        )
+    effect_size = np.where(at_lower, 0.0, effect_size)
+    return np.where(reached, effect_size, np.nan)
+
+
+def _effect_size_from_moments(
+    counts: np.ndarray,
+    means: np.ndarray,
+    m2: np.ndarray,
+    difference: float = None
+) -> np.ndarray:
+    """Compute effect sizes from per-group moments.
+
+    Uses Cohen's d if there are two groups and Cohen's f otherwise. If
+    difference is provided, it is used as the numerator instead.
+
+    :param counts: Number of observations per group, last axis is groups
+    :type counts: np.ndarray
+
+    :param means: Mean per group, last axis is groups
+    :type means: np.ndarray
+
+    :param m2: Sum of squared deviations from the mean per group, last axis
+        is groups
+    :type m2: np.ndarray
+
+    :param difference: If provided, used as the numerator in effect size
+        calculation rather than the difference in means, defaults to None
+    :type difference: float
+
+    :returns: Effect size per replicate
+    :rtype: np.ndarray
+    """
+    if difference is not None:
+        return difference / calculate_pooled_stdev_from_moments(counts, m2)
+    if counts.shape[-1] == 2:
+        return calculate_cohens_d_from_moments(counts, means, m2)
+    return calculate_cohens_f_from_moments(counts, means, m2)
+
+
+def _pairwise_cohens_d_from_moments(
+    counts: np.ndarray,
+    means: np.ndarray,
+    m2: np.ndarray
+) -> np.ndarray:
+    """Compute Cohen's d between every pair of groups from moments.
+
+    :param counts: Number of observations per group, last axis is groups
+    :type counts: np.ndarray
+
+    :param means: Mean per group, last axis is groups
+    :type means: np.ndarray
+
+    :param m2: Sum of squared deviations from the mean per group, last axis
+        is groups
+    :type m2: np.ndarray
+
+    :returns: Array with two trailing group axes where entry (i, j) is
+        Cohen's d between groups i and j
+    :rtype: np.ndarray
+    """
+    pair_counts = counts[..., :, np.newaxis] + counts[..., np.newaxis, :]
+    pair_m2 = m2[..., :, np.newaxis] + m2[..., np.newaxis, :]
+    pooled_std = np.sqrt(pair_m2 / (pair_counts - 2))
+    diffs = np.abs(means[..., :, np.newaxis] - means[..., np.newaxis, :])
+    return diffs / pooled_std
+
+
+def calculate_cohens_d_ci(
+    effect_size: np.ndarray,
+    nobs1: np.ndarray,
+    nobs2: np.ndarray,
+    alpha: float = 0.05
+):
+    """Calculate confidence interval of Cohen's d analytically.
+
+    Inverts the noncentral t distribution of the t statistic
+    t = d * sqrt(n1 * n2 / (n1 + n2)) to get an interval on its
+    noncentrality parameter. As Cohen's d is reported as an absolute value,
+    the lower bound is clipped at zero. Vectorized across arrays of inputs;
+    a scalar interval takes a few milliseconds as the noncentral t
+    distribution function is evaluated a few dozen times.
+
+    :param effect_size: Cohen's d
+    :type effect_size: float or np.ndarray
+
+    :param nobs1: Number of observations in first group
+    :type nobs1: int or np.ndarray
+
+    :param nobs2: Number of observations in second group
+    :type nobs2: int or np.ndarray
+
+    :param alpha: Significance level of the interval, defaults to 0.05
+    :type alpha: float
+
+    :returns: Lower and upper bounds of interval
+    :rtype: Tuple[np.ndarray, np.ndarray]
+    """
+    effect_size, nobs1, nobs2 = np.broadcast_arrays(
+        np.asarray(effect_size, dtype=float), nobs1, nobs2
+    )
+    scale = np.sqrt(nobs1 * nobs2 / (nobs1 + nobs2))
+    t = effect_size * scale
+    df = nobs1 + nobs2 - 2
+
+    def _solve(prob):
+        def func(nc):
+            return prob - stats.nct.cdf(t, df, nc)
+        # cdf is decreasing in the noncentrality parameter. Only
+        #     non-negative bounds are solved for as the lower bound is
+        #     clipped at zero anyway.
+        nc = _solve_increasing(func, 0.0, t + 10)
+        return np.where(np.isnan(t), np.nan, nc)
+
+    lower_nc = _solve(1 - alpha / 2)
+    upper_nc = _solve(alpha / 2)
+    return lower_nc / scale, upper_nc / scale
+
+
+def calculate_cohens_f_ci(
+    effect_size: np.ndarray,
+    nobs: np.ndarray,
+    k_groups: np.ndarray,
+    alpha: float = 0.05
+):
+    """Calculate confidence interval of Cohen's f analytically.
+
+    Inverts the noncentral F distribution of the ANOVA F statistic
+    F = f^2 * N / (k - 1) to get an interval on its noncentrality parameter
+    lambda = f^2 * N. Vectorized across arrays of inputs.
+
+    :param effect_size: Cohen's f
+    :type effect_size: float or np.ndarray
+
+    :param nobs: Total number of observations
+    :type nobs: int or np.ndarray
+
+    :param k_groups: Number of groups
+    :type k_groups: int or np.ndarray
+
+    :param alpha: Significance level of the interval, defaults to 0.05
+    :type alpha: float
+
+    :returns: Lower and upper bounds of interval
+    :rtype: Tuple[np.ndarray, np.ndarray]
+    """
+    effect_size, nobs, k_groups = np.broadcast_arrays(
+        np.asarray(effect_size, dtype=float), nobs, k_groups
+    )
+    dfn = k_groups - 1
+    dfd = nobs - k_groups
+    f_stat = np.power(effect_size, 2) * nobs / dfn
+    nc_est = np.power(effect_size, 2) * nobs
+
+    def _solve(prob):
+        def func(nc):
+            return prob - stats.ncf.cdf(f_stat, dfn, dfd, nc)
+        # cdf is decreasing in the noncentrality parameter and the bound is
+        #     zero if even the central distribution is below prob.
+        nc = _solve_increasing(func, 0.0, nc_est + 10)
+        return np.where(np.isnan(f_stat), np.nan, nc)
+
+    lower_nc = _solve(1 - alpha / 2)
+    upper_nc = _solve(alpha / 2)
+    return np.sqrt(lower_nc / nobs), np.sqrt(upper_nc / nobs)
+
+
+def calculate_difference_es_ci(
+    effect_size: np.ndarray,
+    nobs: np.ndarray,
+    k_groups: np.ndarray,
+    alpha: float = 0.05
+):
+    """Calculate confidence interval of difference / pooled stdev.
+
+    The pooled variance s^2 satisfies s^2 * (N - k) / sigma^2 ~
+    chi2(N - k), which gives an interval on the pooled standard deviation
+    and thus on an effect size with a fixed numerator. Vectorized across
+    arrays of inputs.
+
+    :param effect_size: Effect size as difference / pooled stdev
+    :type effect_size: float or np.ndarray
+
+    :param nobs: Total number of observations
+    :type nobs: int or np.ndarray
+
+    :param k_groups: Number of groups
+    :type k_groups: int or np.ndarray
+
+    :param alpha: Significance level of the interval, defaults to 0.05
+    :type alpha: float
+
+    :returns: Lower and upper bounds of interval
+    :rtype: Tuple[np.ndarray, np.ndarray]
+    """
+    effect_size = np.asarray(effect_size, dtype=float)
+    df = np.asarray(nobs) - np.asarray(k_groups)
+    bound_1 = effect_size * np.sqrt(stats.chi2.ppf(alpha / 2, df) / df)
+    bound_2 = effect_size * np.sqrt(stats.chi2.ppf(1 - alpha / 2, df) / df)
+    return np.minimum(bound_1, bound_2), np.maximum(bound_1, bound_2)
+
+
+def _analytic_effect_size_ci(
+    effect_sizes: np.ndarray,
+    level_counts: list,
+    difference: float = None,
+    alpha: float = 0.05
+):
+    """Calculate analytical confidence intervals for several effect sizes.
+
+    Cohen's d intervals, Cohen's f intervals, and difference-based intervals
+    are each computed in a single vectorized call.
+
+    :param effect_sizes: Effect size of each column
+    :type effect_sizes: np.ndarray
+
+    :param level_counts: Number of observations per level for each column
+    :type level_counts: List[np.ndarray]
+
+    :param difference: Numerator used for the effect sizes, if any
+    :type difference: float
+
+    :param alpha: Significance level of the intervals, defaults to 0.05
+    :type alpha: float
+
+    :returns: Lower and upper bounds of each interval
+    :rtype: Tuple[np.ndarray, np.ndarray]
+    """
+    effect_sizes = np.asarray(effect_sizes, dtype=float)
+    k_groups = np.array([len(x) for x in level_counts])
+    nobs = np.array([np.sum(x) for x in level_counts])
+    lower = np.full(len(effect_sizes), np.nan)
+    upper = np.full(len(effect_sizes), np.nan)
+
+    if difference is not None:
+        return calculate_difference_es_ci(effect_sizes, nobs, k_groups,
+                                          alpha)
+
+    is_d = k_groups == 2
+    if is_d.any():
+        counts = np.array([x for x, d in zip(level_counts, is_d) if d])
+        lower[is_d], upper[is_d] = calculate_cohens_d_ci(
+            effect_sizes[is_d], counts[:, 0], counts[:, 1], alpha
+        )
+    if (~is_d).any():
+        lower[~is_d], upper[~is_d] = calculate_cohens_f_ci(
+            effect_sizes[~is_d], nobs[~is_d], k_groups[~is_d], alpha
+        )
+    return lower, upper
@@ -1,5 +1,14 @@
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from evident.bootstrap import QuantileSketch, _bca_interval
 from evident.effect_size import (effect_size_by_category,
                                  pairwise_effect_size_by_category)
+from evident.stats import (calculate_cohens_d, calculate_cohens_f,
+                           _effect_size_from_moments)
 
 
 def test_bootstrap_alpha(alpha_mock):
@@ -38,3 +47,368 @@ def test_pw_es_by_category_bootstrap(alpha_mock):
     )
     for es in boot_res:
         assert es.lower_es < es.effect_size < es.upper_es
+
+
+@pytest.mark.parametrize("mock", ["alpha_mock", "beta_mock"])
+def test_pw_es_bootstrap_matches_resample(mock, request):
+    # Pairwise 'resample' bootstraps use drawn samples once like the
+    #     non-pairwise bootstrap, which uses the first stream spawned
+    dh = request.getfixturevalue(mock)
+    pw_res, = pairwise_effect_size_by_category(
+        dh,
+        ["classification"],
+        bootstrap_iterations=40,
+        batch_size=20,
+        random_state=3
+    )
+    seed, = np.random.SeedSequence(3).spawn(1)
+    res = dh.calculate_effect_size(
+        "classification",
+        bootstrap_iterations=40,
+        batch_size=20,
+        random_state=seed
+    )
+    np.testing.assert_allclose(pw_res.lower_es, res.lower_es)
+    np.testing.assert_allclose(pw_res.upper_es, res.upper_es)
+
+
+def test_bootstrap_alpha_vectorized(alpha_mock):
+    boot_es = alpha_mock.calculate_effect_size(
+        column="classification",
+        bootstrap_iterations=100,
+        bootstrap_method="vectorized",
+        batch_size=30
+    )
+    assert boot_es.lower_es < boot_es.effect_size < boot_es.upper_es
+    assert boot_es.iterations == 100
+
+
+def test_vectorized_moments_alpha(alpha_mock):
+    md = alpha_mock.metadata
+    codes, levels = pd.factorize(md["cd_behavior"], sort=True)
+    rng = np.random.default_rng(42)
+    draws = rng.integers(0, len(md), size=(3, len(md)))
+
+    counts, means, m2 = alpha_mock._replicate_group_moments(
+        codes, len(levels), draws
+    )
+    for i, row in enumerate(draws):
+        boot_md = md.iloc[row]
+        arrays = [
+            alpha_mock.subset_values(boot_md[boot_md["cd_behavior"] == lvl]
+                                     .index)
+            for lvl in levels
+        ]
+        exp_es = calculate_cohens_f(*arrays)
+        calc_es = _effect_size_from_moments(counts[i], means[i], m2[i])
+        np.testing.assert_almost_equal(calc_es, exp_es)
+        np.testing.assert_equal(counts[i], [len(x) for x in arrays])
+
+
+def test_bootstrap_bad_method(alpha_mock):
+    with pytest.raises(ValueError) as exc_info:
+        alpha_mock.calculate_effect_size(
+            column="classification",
+            bootstrap_iterations=10,
+            bootstrap_method="jackknife"
+        )
+    exp_err_msg = (
+        "bootstrap_method must be either 'resample' or 'vectorized'."
+    )
+    assert str(exc_info.value) == exp_err_msg
+
+
+def test_bootstrap_beta_vectorized(beta_mock):
+    boot_es = beta_mock.calculate_effect_size(
+        column="classification",
+        bootstrap_iterations=100,
+        bootstrap_method="vectorized"
+    )
+    assert boot_es.lower_es < boot_es.effect_size < boot_es.upper_es
+    assert boot_es.iterations == 100
+
+
+@pytest.mark.parametrize("block_size", [2 ** 22, 50])
+def test_vectorized_moments_beta(beta_mock, block_size):
+    # Small blocks split the pairs of each level across several blocks
+    beta_mock._pair_block_size = block_size
+    md = beta_mock.metadata
+    codes, levels = pd.factorize(md["classification"], sort=True)
+    rng = np.random.default_rng(42)
+    draws = rng.integers(0, len(md), size=(2, len(md)))
+
+    counts, means, m2 = beta_mock._replicate_group_moments(
+        codes, len(levels), draws
+    )
+    for i, row in enumerate(draws):
+        boot_md = md.iloc[row]
+        arrays = []
+        for lvl in levels:
+            ids = boot_md[boot_md["classification"] == lvl].index
+            # All pairs of draws except those of the same sample
+            dists = [
+                beta_mock.data[ids[a], ids[b]]
+                for a, b in combinations(range(len(ids)), 2)
+                if ids[a] != ids[b]
+            ]
+            arrays.append(np.array(dists))
+        exp_es = calculate_cohens_d(*arrays)
+        calc_es = _effect_size_from_moments(counts[i], means[i], m2[i])
+        np.testing.assert_almost_equal(calc_es, exp_es)
+        np.testing.assert_equal(counts[i], [len(x) for x in arrays])
+
+
+def test_pw_es_by_category_bootstrap_beta(beta_mock):
+    boot_res = pairwise_effect_size_by_category(
+        beta_mock,
+        ["cd_behavior"],
+        bootstrap_iterations=50,
+        batch_size=20
+    )
+    assert len(boot_res) == 3
+    for es in boot_res:
+        assert es.lower_es <= es.upper_es
+        assert es.iterations == 50
+
+    # Only pairs with a clear effect reliably have intervals containing the
+    #     estimate. B2 vs. B3 has d ~ 0.016, at the edge of its interval.
+    b1 = "Non-stricturing, non-penetrating (B1)"
+    clear = [es for es in boot_res if b1 in (es.group_1, es.group_2)]
+    assert len(clear) == 2
+    for es in clear:
+        assert es.lower_es < es.effect_size < es.upper_es
+
+
+def test_quantile_sketch_exact_when_small():
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=500)
+    sketch = QuantileSketch(size=1000)
+    sketch.update(values[:200])
+    sketch.update(values[200:])
+    q = [0.025, 0.5, 0.975]
+    np.testing.assert_almost_equal(sketch.quantile(q),
+                                   np.quantile(values, q))
+
+
+def test_quantile_sketch_error_bound():
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=(100000, 2))
+    size = 500
+    sketch = QuantileSketch(size=size)
+    for start in range(0, len(values), 1000):
+        sketch.update(values[start:start + 1000])
+
+    stored = sum(len(x) for x in sketch._levels if x is not None)
+    num_levels = np.log2(len(values) / size)
+    assert stored <= size * (num_levels + 2)
+
+    max_rank_err = (num_levels + 1) / size
+    q = np.array([0.025, 0.5, 0.975])
+    calc = sketch.quantile(q)
+    for i in range(values.shape[1]):
+        ranks = np.searchsorted(np.sort(values[:, i]), calc[:, i])
+        assert (np.abs(ranks / len(values) - q) <= max_rank_err).all()
+
+
+def test_quantile_sketch_merge():
+    values = np.arange(4000, dtype=float)
+    sketch_1 = QuantileSketch(size=100)
+    sketch_1.update(values[:2500])
+    sketch_2 = QuantileSketch(size=100)
+    sketch_2.update(values[2500:])
+    sketch_1.merge(sketch_2)
+    assert sketch_1.count == 4000
+    np.testing.assert_allclose(sketch_1.quantile(0.5), 2000, atol=200)
+
+
+def test_bootstrap_alpha_sketch(alpha_mock):
+    boot_es = alpha_mock.calculate_effect_size(
+        column="classification",
+        bootstrap_iterations=300,
+        bootstrap_method="vectorized",
+        sketch_size=50
+    )
+    assert boot_es.lower_es < boot_es.effect_size < boot_es.upper_es
+    assert boot_es.iterations == 300
+
+
+def test_pw_es_by_category_bootstrap_sketch(alpha_mock):
+    boot_res = pairwise_effect_size_by_category(
+        alpha_mock,
+        ["cd_behavior"],
+        bootstrap_iterations=300,
+        sketch_size=50
+    )
+    for es in boot_res:
+        assert es.lower_es < es.effect_size < es.upper_es
+
+
+@pytest.mark.parametrize("method", ["resample", "vectorized"])
+def test_bootstrap_reproducible_any_n_jobs(alpha_mock, method):
+    results = [
+        alpha_mock.calculate_effect_size(
+            column="cd_behavior",
+            bootstrap_iterations=60,
+            bootstrap_method=method,
+            batch_size=20,
+            random_state=42,
+            n_jobs=n_jobs
+        )
+        for n_jobs in [1, 2]
+    ]
+    assert results[0].lower_es == results[1].lower_es
+    assert results[0].upper_es == results[1].upper_es
+
+    other = alpha_mock.calculate_effect_size(
+        column="cd_behavior",
+        bootstrap_iterations=60,
+        bootstrap_method=method,
+        batch_size=20,
+        random_state=43
+    )
+    assert other.lower_es != results[0].lower_es
+
+
+def test_es_by_category_bootstrap_reproducible(beta_mock):
+    dfs = [
+        effect_size_by_category(
+            beta_mock,
+            ["classification", "cd_behavior"],
+            bootstrap_iterations=20,
+            random_state=np.random.SeedSequence(1),
+            n_jobs=n_jobs
+        ).to_dataframe()
+        for n_jobs in [1, 2]
+    ]
+    pd.testing.assert_frame_equal(*dfs)
+
+
+def test_pw_es_by_category_bootstrap_reproducible(alpha_mock):
+    dfs = [
+        pairwise_effect_size_by_category(
+            alpha_mock,
+            ["cd_behavior", "ibd_subtype"],
+            bootstrap_iterations=50,
+            random_state=7,
+            n_jobs=n_jobs
+        ).to_dataframe()
+        for n_jobs in [1, 2]
+    ]
+    pd.testing.assert_frame_equal(*dfs)
+
+
+@pytest.mark.parametrize("method", ["resample", "vectorized"])
+def test_bootstrap_adaptive(alpha_mock, method):
+    boot_es = alpha_mock.calculate_effect_size(
+        column="classification",
+        bootstrap_iterations=5000,
+        bootstrap_method=method,
+        batch_size=50,
+        tolerance=0.05,
+        random_state=0
+    )
+    assert boot_es.lower_es < boot_es.effect_size < boot_es.upper_es
+    assert 100 <= boot_es.iterations < 5000
+    assert boot_es.iterations % 50 == 0
+
+
+def test_bootstrap_deadline(alpha_mock):
+    boot_es = alpha_mock.calculate_effect_size(
+        column="classification",
+        bootstrap_iterations=10**6,
+        bootstrap_method="vectorized",
+        batch_size=10,
+        deadline=0
+    )
+    assert boot_es.iterations == 10
+
+
+def test_pw_es_by_category_bootstrap_adaptive(alpha_mock):
+    boot_res = pairwise_effect_size_by_category(
+        alpha_mock,
+        ["cd_behavior"],
+        bootstrap_iterations=5000,
+        batch_size=100,
+        tolerance=0.05,
+        random_state=0
+    )
+    iterations = {es.iterations for es in boot_res}
+    assert len(iterations) == 1
+    assert 200 <= iterations.pop() < 5000
+
+
+@pytest.mark.parametrize("mock", ["alpha_mock", "beta_mock"])
+def test_jackknife_group_moments(mock, request):
+    dh = request.getfixturevalue(mock)
+    codes, levels = dh._column_codes("cd_behavior")
+    jack_counts, jack_means, jack_m2 = dh._jackknife_group_moments(
+        codes, len(levels)
+    )
+    samps = np.flatnonzero(codes != -1)
+    assert jack_counts.shape == (len(samps), len(levels))
+
+    for row in [0, 17, len(samps) - 1]:
+        left_out = np.delete(codes, samps[row])
+        keep = np.delete(np.arange(len(codes)), samps[row])
+        for level in range(len(levels)):
+            ids = dh.metadata.index[keep[left_out == level]]
+            values = dh.subset_values(ids)
+            np.testing.assert_almost_equal(jack_counts[row, level],
+                                           len(values))
+            np.testing.assert_almost_equal(jack_means[row, level],
+                                           values.mean())
+            np.testing.assert_almost_equal(
+                jack_m2[row, level],
+                np.power(values - values.mean(), 2).sum()
+            )
+
+
+def test_bca_interval_no_bias_no_accel():
+    rng = np.random.default_rng(0)
+    boot = rng.normal(size=2001)
+    boot = np.concatenate([boot, -boot])
+    jackknife = np.ones(50)
+    calc = _bca_interval(boot, 0, jackknife)
+    np.testing.assert_almost_equal(calc,
+                                   np.quantile(boot, [0.025, 0.975]))
+
+
+@pytest.mark.parametrize("mock", ["alpha_mock", "beta_mock"])
+def test_bootstrap_bca(mock, request):
+    dh = request.getfixturevalue(mock)
+    boot_es = dh.calculate_effect_size(
+        column="cd_behavior",
+        bootstrap_iterations=200,
+        bootstrap_method="vectorized",
+        ci_method="bca",
+        random_state=0
+    )
+    assert boot_es.lower_es < boot_es.effect_size < boot_es.upper_es
+    assert boot_es.ci_method == "bca"
+
+
+def test_pw_es_by_category_bootstrap_bca(alpha_mock):
+    boot_res = pairwise_effect_size_by_category(
+        alpha_mock,
+        ["cd_behavior"],
+        bootstrap_iterations=200,
+        ci_method="bca",
+        sketch_size=100,
+        random_state=0
+    )
+    for es in boot_res:
+        assert es.lower_es < es.effect_size < es.upper_es
+        assert es.ci_method == "bca"
+
+
+def test_bootstrap_bad_ci_method(alpha_mock):
+    with pytest.raises(ValueError) as exc_info:
+        alpha_mock.calculate_effect_size(
+            column="classification",
+            bootstrap_iterations=10,
+            ci_method="studentized"
+        )
+    exp_err_msg = (
+        "ci_method must be one of 'percentile', 'bca', 'analytic'."
+    )
+    assert str(exc_info.value) == exp_err_msg
@@ -0,0 +1,114 @@
+from functools import partial
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.spatial.distance import minkowski
+
+from evident.cache import ResultCache
+from evident.data_handler import UnivariateDataHandler
+
+
+def test_key_by_content(tmpdir):
+    cache = ResultCache(str(tmpdir))
+    x = np.arange(10.0)
+    key = cache.key("a", x, {"b": 1, "c": None})
+    assert key == cache.key("a", x.copy(), {"c": None, "b": 1})
+    assert key != cache.key("a", x + 1, {"b": 1, "c": None})
+    assert key != cache.key("a", x, {"b": 2, "c": None})
+
+    ss = np.random.SeedSequence(42)
+    assert cache.key(ss) == cache.key(np.random.SeedSequence(42))
+    assert cache.key(ss.spawn(1)[0]) != cache.key(ss)
+    # Spawning changes the streams later spawns give
+    assert cache.key(ss) != cache.key(np.random.SeedSequence(42))
+
+
+def test_key_memmap(tmpdir):
+    cache = ResultCache(str(tmpdir))
+    path = os.path.join(str(tmpdir), "x.npy")
+    np.save(path, np.arange(10.0))
+    x = np.load(path, mmap_mode="r")
+    assert cache.key(x) == cache.key(np.load(path, mmap_mode="r"))
+    assert cache.key(x) != cache.key(np.arange(10.0))
+    # Views are hashed by content
+    assert cache.key(x[2:]) == cache.key(np.arange(2.0, 10.0))
+
+
+def test_key_callable(tmpdir):
+    cache = ResultCache(str(tmpdir))
+    key = cache.key(partial(minkowski, p=1))
+    assert key == cache.key(partial(minkowski, p=1))
+    assert key != cache.key(partial(minkowski, p=2))
+    assert cache.key(np.mean) != cache.key(np.median)
+
+    # Lambdas have no import path to identify them by
+    with pytest.raises(TypeError):
+        cache.key(lambda u, v: minkowski(u, v, 1))
+
+
+def test_get_or_compute(tmpdir):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"value": 3}
+
+    cache = ResultCache(str(tmpdir))
+    assert cache.get_or_compute("k", compute) == {"value": 3}
+    # Results persist across cache instances
+    cache = ResultCache(str(tmpdir))
+    assert cache.get_or_compute("k", compute) == {"value": 3}
+    assert len(calls) == 1
+
+    cache.clear()
+    assert cache.size() == 0
+
+
+def test_eviction(tmpdir):
+    cache = ResultCache(str(tmpdir), max_bytes=2500)
+    for i in range(5):
+        cache.get_or_compute(str(i), lambda: np.zeros(100))
+        os.utime(cache._path(str(i)), (i, i))
+    assert cache.size() <= 2500
+    assert not os.path.exists(cache._path("0"))
+    assert os.path.exists(cache._path("4"))
+
+
+def test_handler_result_cache(tmpdir):
+    fname = os.path.join(os.path.dirname(__file__), "data/metadata.tsv")
+    df = pd.read_table(fname, sep="\t", index_col=0,
+                       na_values=["not applicable", "missing: not provided"])
+    cache = ResultCache(str(tmpdir))
+
+    results = []
+    for _ in range(2):
+        dh = UnivariateDataHandler(df["faith_pd"], df, result_cache=cache)
+        results.append(dh.calculate_effect_size(
+            "classification", bootstrap_iterations=50, random_state=3
+        ))
+    # Point estimate and bootstrapped interval
+    assert len(os.listdir(str(tmpdir))) == 2
+    assert results[0] == results[1]
+
+    dh.power_analysis("classification", alpha=0.05,
+                      total_observations=[20, 40])
+    assert len(os.listdir(str(tmpdir))) == 3
+
+    # A reused SeedSequence gives the same result cached or not
+    ss = np.random.SeedSequence(5)
+    uncached = UnivariateDataHandler(df["faith_pd"], df)
+    results = [
+        handler.calculate_effect_size(
+            "classification", bootstrap_iterations=50, random_state=ss
+        )
+        for handler in [uncached, uncached, dh, dh]
+    ]
+    assert all(res == results[0] for res in results)
+    assert ss.n_children_spawned == 0
+    assert len(os.listdir(str(tmpdir))) == 4
+
+    # Unseeded bootstraps are not stored
+    dh.calculate_effect_size("classification", bootstrap_iterations=50)
+    assert len(os.listdir(str(tmpdir))) == 4
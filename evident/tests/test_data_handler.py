@@ -3,10 +3,18 @@ import os
 import numpy as np
 import pandas as pd
 import pytest
+from scipy import sparse
+from scipy.spatial.distance import pdist, squareform
 from skbio import DistanceMatrix
+from statsmodels.stats.power import tt_ind_solve_power
 
 from evident.data_handler import (UnivariateDataHandler,
-                                  MultivariateDataHandler)
+                                  MultivariateDataHandler,
+                                  FeatureTableDataHandler,
+                                  OrdinationDataHandler,
+                                  _feature_block_stats)
+from evident.distances import CondensedDistances
+from evident.results import PowerAnalysisResults
 import evident._exceptions as exc
 
 na_values = ["not applicable", "missing: not provided"]
@@ -41,6 +49,68 @@ class TestAlphaDiv:
         assert set(a.metadata.columns) == exp_cols
         assert a.data.shape == (220, )
 
+    def test_filter_levels(self):
+        ids = [f"S{i}" for i in range(12)]
+        df = pd.DataFrame({
+            "few": list("aaaabbbbbbcc"),
+            "many": list("abcdefabcdef"),
+            "one": ["x"] * 12,
+            "num": np.arange(12),
+        }, index=ids)
+        data = pd.Series(np.arange(12, dtype=float), index=ids)
+        with pytest.warns(UserWarning) as warn_info:
+            a = UnivariateDataHandler(data, df, max_levels_per_category=3)
+
+        assert "Dropped columns: ['many', 'one', 'num']" in str(
+            warn_info[0].message
+        )
+        assert "Dropped levels: {'few': ['c']}" in str(warn_info[1].message)
+        assert list(a.metadata.columns) == ["few"]
+        assert a.metadata["few"].isna().sum() == 2
+        codes, levels = a._level_codes["few"]
+        assert list(levels) == ["a", "b"]
+        exp_codes = a.metadata["few"].map({"a": 0, "b": 1}).fillna(-1)
+        np.testing.assert_array_equal(codes, exp_codes)
+        # Codes use the narrowest type that fits the levels
+        assert codes.dtype == np.int8
+
+    def test_all_levels_dropped(self):
+        fname = os.path.join(os.path.dirname(__file__), "data/metadata.tsv")
+        df = pd.read_table(fname, sep="\t", index_col=0, na_values=na_values)
+        with pytest.warns(UserWarning):
+            a = UnivariateDataHandler(df["faith_pd"], df,
+                                      max_levels_per_category=-1,
+                                      min_count_per_level=2)
+
+        # Every description is unique so no level is left
+        with pytest.raises(exc.NonCategoricalColumnError) as exc_info:
+            a.calculate_effect_size("description")
+        exp_err_msg = (
+            "Column must be categorical (dtype object). 'description' is "
+            "of type float64."
+        )
+        assert str(exc_info.value) == exp_err_msg
+
+    def test_lazy(self, alpha_mock):
+        fname = os.path.join(os.path.dirname(__file__), "data/metadata.tsv")
+        df = pd.read_table(fname, sep="\t", index_col=0, na_values=na_values)
+        a = UnivariateDataHandler(df["faith_pd"], df, lazy=True)
+        assert set(a._level_codes) == set()
+
+        es = a.calculate_effect_size("classification").effect_size
+        exp_es = alpha_mock.calculate_effect_size(
+            "classification"
+        ).effect_size
+        np.testing.assert_almost_equal(es, exp_es)
+        assert set(a._level_codes) == {"classification"}
+        assert a.samples == alpha_mock.samples
+
+        with pytest.warns(UserWarning) as warn_info:
+            md = a.metadata
+        assert "Dropped columns" in str(warn_info[0].message)
+        assert "classification" not in str(warn_info[0].message)
+        pd.testing.assert_frame_equal(md, alpha_mock.metadata)
+
     @pytest.mark.parametrize("val", [1, 0, -1])
     def test_bad_min_count(self, val):
         fname = os.path.join(os.path.dirname(__file__), "data/metadata.tsv")
@@ -119,13 +189,148 @@ class TestBetaDiv:
         md = beta_mock.metadata
         assert (md.index == beta_mock.samples).all()
 
+    def test_beta_data_unfiltered(self, beta_mock):
+        md = beta_mock.metadata.iloc[:100]
+        b = MultivariateDataHandler(beta_mock.data, md)
+        # Data is kept as given while samples are those in common
+        assert b.data is beta_mock.data
+        assert b.samples == md.index.to_list()
+
+        with pytest.raises(KeyError) as exc_info:
+            b.subset_values([md.index[0], "not_a_sample"])
+        assert "not_a_sample" in str(exc_info.value)
+
+    def test_condensed_store(self, beta_mock, tmpdir):
+        distances = CondensedDistances.from_distance_matrix(beta_mock.data)
+        condensed_path = os.path.join(str(tmpdir), "dists.npy")
+        ids_path = os.path.join(str(tmpdir), "ids.txt")
+        distances.save(condensed_path, ids_path)
+
+        stored = CondensedDistances.load(condensed_path, ids_path)
+        assert isinstance(stored.condensed, np.memmap)
+        # Subset of metadata samples in a different order than the data
+        md = beta_mock.metadata.iloc[::-1].iloc[:150]
+        with pytest.warns(UserWarning):
+            b = MultivariateDataHandler(stored, md)
+            exp = MultivariateDataHandler(beta_mock.data, md)
+
+        ids = md.index[:20]
+        np.testing.assert_array_equal(b.subset_values(ids),
+                                      exp.subset_values(ids))
+        for column in ["classification", "cd_location"]:
+            assert (b.calculate_effect_size(column)
+                    == exp.calculate_effect_size(column))
+            boot = b.calculate_effect_size(column, bootstrap_iterations=20,
+                                           random_state=1)
+            exp_boot = exp.calculate_effect_size(
+                column, bootstrap_iterations=20, random_state=1
+            )
+            assert boot == exp_boot
+
+    def test_float32_storage(self, beta_mock):
+        # The square matrix is not kept alongside the float32 copy
+        b = MultivariateDataHandler(beta_mock.data, beta_mock.metadata,
+                                    dtype=np.float32)
+        assert isinstance(b.data, CondensedDistances)
+        assert b.data.condensed.dtype == np.float32
+
+        ids = beta_mock.metadata.index[:10]
+        assert b.subset_values(ids).dtype == np.float64
+        for column in ["classification", "cd_location"]:
+            np.testing.assert_allclose(
+                b.calculate_effect_size(column).effect_size,
+                beta_mock.calculate_effect_size(column).effect_size,
+                rtol=1e-5
+            )
+
+    def test_feature_table(self, alpha_mock):
+        md = alpha_mock.metadata
+        rng = np.random.default_rng(0)
+        table = pd.DataFrame(rng.poisson(5, size=(len(md), 30)),
+                             index=md.index)
+        dm = DistanceMatrix(squareform(pdist(table, "braycurtis")),
+                            ids=list(md.index))
+        exp = MultivariateDataHandler(dm, md)
+        ft = FeatureTableDataHandler(table, md, metric="braycurtis")
+        ft_sparse = FeatureTableDataHandler(
+            sparse.csr_matrix(table.values), md, ids=table.index, n_jobs=2
+        )
+        ft_sparse._pair_block_size = 100
+
+        ids = md.index[:10]
+        np.testing.assert_allclose(ft.subset_values(ids),
+                                   exp.subset_values(ids))
+        for column in ["classification", "cd_location"]:
+            exp_res = exp.calculate_effect_size(
+                column, bootstrap_iterations=20, random_state=1
+            )
+            for handler in [ft, ft_sparse]:
+                res = handler.calculate_effect_size(
+                    column, bootstrap_iterations=20, random_state=1
+                )
+                np.testing.assert_allclose(
+                    [res.effect_size, res.lower_es, res.upper_es],
+                    [exp_res.effect_size, exp_res.lower_es, exp_res.upper_es]
+                )
+
+        with pytest.raises(ValueError):
+            FeatureTableDataHandler(sparse.csr_matrix(table.values), md)
+
+    def test_feature_block_stats(self):
+        # Rows of a block are paired with later rows in chunks
+        table = sparse.random(600, 5, density=0.5, format="csr",
+                              random_state=0)
+        square = squareform(pdist(table.toarray()))
+        exp_values = np.concatenate([square[0, 1:], square[1, 2:]])
+
+        block_stats = _feature_block_stats(table, 0, 2, "euclidean", 0, [0])
+        np.testing.assert_array_equal(block_stats.counts, [len(exp_values)])
+        np.testing.assert_allclose(block_stats.means, [exp_values.mean()])
+        np.testing.assert_allclose(
+            block_stats.m2, [np.var(exp_values) * len(exp_values)]
+        )
+
+    def test_ordination(self, alpha_mock):
+        md = alpha_mock.metadata
+        rng = np.random.default_rng(0)
+        coords = pd.DataFrame(rng.normal(size=(len(md), 4)), index=md.index)
+        dm = DistanceMatrix(squareform(pdist(coords, "sqeuclidean")),
+                            ids=list(md.index))
+        exp = MultivariateDataHandler(dm, md)
+        ordn = OrdinationDataHandler(coords, md)
+
+        ids = md.index[:10]
+        np.testing.assert_allclose(ordn.subset_values(ids),
+                                   exp.subset_values(ids))
+        for column in ["classification", "cd_location"]:
+            codes, levels = exp._column_codes(column)
+            for method in ["_group_moments", "_jackknife_group_moments"]:
+                calc = getattr(ordn, method)(codes, len(levels))
+                exp_moments = getattr(exp, method)(codes, len(levels))
+                for x, y in zip(calc, exp_moments):
+                    np.testing.assert_allclose(x, y, rtol=1e-8, atol=1e-6)
+
+            for ci_method, method in [("percentile", "resample"),
+                                      ("bca", "vectorized")]:
+                args = dict(bootstrap_iterations=20, random_state=1,
+                            ci_method=ci_method, bootstrap_method=method)
+                res = ordn.calculate_effect_size(column, **args)
+                exp_res = exp.calculate_effect_size(column, **args)
+                np.testing.assert_allclose(
+                    [res.effect_size, res.lower_es, res.upper_es],
+                    [exp_res.effect_size, exp_res.lower_es, exp_res.upper_es]
+                )
+
     def test_beta_wrong_data(self, beta_mock):
         data = beta_mock.data.to_data_frame()
 
         with pytest.raises(ValueError) as exc_info:
             MultivariateDataHandler(data, beta_mock.metadata)
 
-        exp_err_msg = "data must be of type skbio.DistanceMatrix"
+        exp_err_msg = (
+            "data must be of type skbio.DistanceMatrix or "
+            "evident.distances.CondensedDistances"
+        )
         assert str(exc_info.value) == exp_err_msg
 
 
@@ -206,7 +411,7 @@ class TestPower:
             return 0.4
 
         monkeypatch.setattr(
-            "evident.data_handler.calculate_cohens_f",
+            "evident.data_handler.calculate_cohens_f_from_moments",
             mock_cohens_f
         )
         calc_power = alpha_mock.power_analysis(
@@ -237,6 +442,62 @@ class TestEffectSize:
         np.testing.assert_almost_equal(calc_effect_size.effect_size,
                                        exp_effect_size, decimal=6)
 
+    def test_effect_size_cache(self, alpha_mock):
+        alpha_mock.calculate_effect_size("classification")
+        alpha_mock.calculate_effect_size("classification")
+        alpha_mock.calculate_effect_size("classification", difference=3)
+        info = alpha_mock.cache_info()
+        assert (info.hits, info.misses, info.currsize) == (1, 2, 2)
+
+        alpha_mock.clear_cache()
+        assert alpha_mock.cache_info().currsize == 0
+        assert alpha_mock._group_stats_cache == dict()
+
+    def test_group_stats_cached(self, alpha_mock):
+        group_stats = alpha_mock._group_stats("classification")
+        assert alpha_mock._group_stats("classification") is group_stats
+        assert group_stats.levels == ["B1", "Non-B1"]
+
+    def test_beta_group_stats_blocks(self, beta_mock):
+        exp = beta_mock._group_stats("cd_behavior")
+        beta_mock._group_stats_cache.clear()
+        beta_mock._pair_block_size = 7
+        calc = beta_mock._group_stats("cd_behavior")
+        np.testing.assert_array_equal(calc.counts, exp.counts)
+        np.testing.assert_allclose(calc.means, exp.means)
+        np.testing.assert_allclose(calc.m2, exp.m2)
+
+    def test_beta_precompute_group_stats(self, beta_mock):
+        columns = ["cd_behavior", "classification", "sex"]
+        exp = [beta_mock._group_stats(col) for col in columns]
+        beta_mock._group_stats_cache.clear()
+        beta_mock._pair_block_size = 1000
+        beta_mock._precompute_group_stats(columns)
+        for col, exp_stats in zip(columns, exp):
+            calc = beta_mock._group_stats_cache[col]
+            assert calc.levels == exp_stats.levels
+            np.testing.assert_array_equal(calc.counts, exp_stats.counts)
+            np.testing.assert_allclose(calc.means, exp_stats.means)
+            np.testing.assert_allclose(calc.m2, exp_stats.m2)
+
+    def test_level_codes(self, alpha_mock):
+        codes, levels = alpha_mock._level_codes["classification"]
+        exp_levels = alpha_mock.metadata["classification"].values
+        np.testing.assert_array_equal(levels[codes], exp_levels)
+
+        positions = np.array([0, 0, 1, 2, 3, 4, 5, 6, 7, 8, 9])
+        arrays, metric, _ = alpha_mock._get_values("classification",
+                                                   positions)
+        assert metric == "cohens_d"
+        assert sum(len(x) for x in arrays) == 10
+
+    def test_result_slots(self, alpha_mock):
+        res = alpha_mock.calculate_effect_size("classification")
+        assert not hasattr(res, "__dict__")
+        assert res.to_dict() == {"effect_size": res.effect_size,
+                                 "metric": "cohens_d",
+                                 "column": "classification"}
+
 
 class TestVectorArgsPowerAnalysis:
     def test_range(self, alpha_mock):
@@ -263,3 +524,75 @@ class TestVectorArgsPowerAnalysis:
             alpha=0.05
         )
         assert len(power_res) == 5
+
+    def test_vector_difference(self, alpha_mock):
+        differences = [0.2, 0.5]
+        power_res = alpha_mock.power_analysis(
+            column="classification",
+            difference=differences,
+            total_observations=50,
+            alpha=0.05
+        )
+        assert len(power_res) == 2
+
+        for vector_res, diff in zip(power_res, differences):
+            single_res = alpha_mock.power_analysis(
+                column="classification",
+                difference=diff,
+                total_observations=50,
+                alpha=0.05
+            )
+            assert vector_res.effect_size_result.difference == diff
+            assert single_res.power == vector_res.power
+
+    def test_mdes(self, alpha_mock):
+        power_res = alpha_mock.power_analysis(
+            column="classification",
+            total_observations=[20, 60],
+            alpha=0.05,
+            power=0.8,
+            mdes=True
+        )
+        assert len(power_res) == 2
+        assert (power_res[0].effect_size_result.effect_size
+                > power_res[1].effect_size_result.effect_size)
+
+        for res in power_res:
+            es = res.effect_size_result
+            assert es.metric == "cohens_d"
+            np.testing.assert_almost_equal(
+                tt_ind_solve_power(effect_size=es.effect_size,
+                                   nobs1=res.total_observations / 2,
+                                   alpha=0.05, ratio=1.0),
+                0.8
+            )
+
+        with pytest.raises(ValueError):
+            alpha_mock.power_analysis(column="classification", alpha=0.05,
+                                      power=0.8, mdes=True)
+
+    def test_grid(self, alpha_mock):
+        power_res = alpha_mock.power_analysis(
+            column="classification",
+            total_observations=[20, 40, 60],
+            alpha=[0.01, 0.05],
+            difference=[1, 2]
+        )
+        assert list(power_res.dims) == ["difference", "total_observations",
+                                        "alpha"]
+        grid = power_res.to_grid("power")
+        assert grid.shape == (2, 3, 2)
+
+        # Columnar results match results converted row by row
+        rows = PowerAnalysisResults(list(power_res))
+        pd.testing.assert_frame_equal(power_res.to_dataframe(),
+                                      rows.to_dataframe())
+        res = power_res[-1]
+        assert res.power == grid[1, 2, 1]
+        assert res.effect_size_result.difference == 2
+
+    def test_empty_results(self):
+        res = PowerAnalysisResults()
+        assert len(res) == 0
+        assert res.results == []
+        assert list(res) == []
@@ -152,3 +152,25 @@ def test_nan_in_cols_one_one_cat():
 
     with pytest.raises(KeyError):
         adh.calculate_effect_size("col2")
+
+
+@pytest.mark.parametrize("mock", ["alpha_mock", "beta_mock"])
+def test_effect_size_by_cat_analytic(mock, request):
+    dh = request.getfixturevalue(mock)
+    cols = ["sex", "classification", "cd_behavior"]
+    res = expl.effect_size_by_category(dh, columns=cols,
+                                       ci_method="analytic")
+    for es in res:
+        assert es.lower_es < es.effect_size < es.upper_es
+        assert es.ci_method == "analytic"
+        assert es.iterations is None
+
+        single = dh.calculate_effect_size(es.column, ci_method="analytic")
+        np.testing.assert_almost_equal(single.lower_es, es.lower_es)
+        np.testing.assert_almost_equal(single.upper_es, es.upper_es)
+
+
+def test_effect_size_analytic_difference(alpha_mock):
+    res = alpha_mock.calculate_effect_size("classification", difference=3,
+                                           ci_method="analytic")
+    assert res.lower_es < res.effect_size < res.upper_es
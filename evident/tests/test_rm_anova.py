@@ -140,3 +140,35 @@ def test_bulk_power_analysis(rm_alpha_mock):
             row["power"],
             decimal=5
         )
+
+
+def test_mdes_power_analysis(rm_alpha_mock):
+    results = rm_alpha_mock.power_analysis(
+        state_column="group",
+        subjects=[4, 8],
+        measurements=3,
+        alpha=0.05,
+        correlation=0.5,
+        epsilon=1.0,
+        power=0.8,
+        mdes=True
+    )
+    assert len(results) == 2
+    for res in results:
+        assert res.effect_size_result.metric == "eta_squared"
+        power = calculate_rm_anova_power(
+            res.subjects, 3, 0.05, 0.5, 1.0, res.effect_size_result.effect_size
+        )
+        np.testing.assert_almost_equal(power, 0.8)
+
+
+def test_mdes_power_analysis_args(rm_alpha_mock):
+    kwargs = dict(state_column="group", subjects=4, measurements=3,
+                  alpha=0.05, correlation=0.5, epsilon=1.0)
+    with pytest.raises(ValueError) as exc_info:
+        rm_alpha_mock.power_analysis(**kwargs, mdes=True)
+    assert "power must be provided" in str(exc_info.value)
+
+    with pytest.raises(ValueError) as exc_info:
+        rm_alpha_mock.power_analysis(**kwargs, power=0.8)
+    assert "only be provided when solving" in str(exc_info.value)
@@ -1,5 +1,7 @@
 import numpy as np
 
+from scipy import stats as ss
+
 from evident import stats
 
 
@@ -39,3 +41,225 @@ def test_calc_cohens_f_two_groups():
     exp_cohen_f = 0.852803 / 2
     calc_cohen_f = stats.calculate_cohens_f(a, b)
     np.testing.assert_almost_equal(exp_cohen_f, calc_cohen_f, decimal=6)
+
+
+def test_pairwise_cohens_d_from_moments():
+    a = np.array([1, 2, 3, 4, 5, 6])
+    b = np.array([2, 5, 3, 6, 8, 9])
+    c = np.array([0, 2, 2, 5, 1, 4])
+    arrays = [a, b, c]
+
+    counts = np.array([len(x) for x in arrays])
+    means = np.array([x.mean() for x in arrays])
+    m2 = np.array([np.power(x - x.mean(), 2).sum() for x in arrays])
+    calc_d = stats._pairwise_cohens_d_from_moments(counts, means, m2)
+
+    for i, j in [(0, 1), (0, 2), (1, 2)]:
+        exp_d = stats.calculate_cohens_d(arrays[i], arrays[j])
+        np.testing.assert_almost_equal(calc_d[i, j], exp_d)
+        np.testing.assert_almost_equal(calc_d[j, i], exp_d)
+
+
+def test_cohens_d_ci_coverage():
+    # Interval bounds are where the observed t is at the 97.5th and 2.5th
+    #     percentiles of the noncentral t distribution
+    d = np.array([0.4, 1.2])
+    n1 = np.array([20, 99])
+    n2 = np.array([25, 121])
+    lower, upper = stats.calculate_cohens_d_ci(d, n1, n2)
+
+    scale = np.sqrt(n1 * n2 / (n1 + n2))
+    df = n1 + n2 - 2
+    np.testing.assert_almost_equal(
+        ss.nct.cdf(d[1] * scale[1], df[1], lower[1] * scale[1]), 0.975
+    )
+    np.testing.assert_almost_equal(
+        ss.nct.cdf(d * scale, df, upper * scale), 0.025
+    )
+    # Interval for d = 0.4 includes zero
+    assert lower[0] == 0
+    assert (upper > d).all()
+
+
+def test_cohens_d_ci_large_t():
+    # Brackets starting far below the observed t must still be solved
+    d, n1, n2 = 0.8093601412916109, 65, 99
+    lower, upper = stats.calculate_cohens_d_ci(d, n1, n2)
+    scale = np.sqrt(n1 * n2 / (n1 + n2))
+    np.testing.assert_almost_equal(
+        ss.nct.cdf(d * scale, 162, [lower * scale, upper * scale]),
+        [0.975, 0.025]
+    )
+
+
+def test_cohens_f_ci():
+    f = np.array([0.5, 0.3])
+    nobs = np.array([100, 60])
+    k = np.array([4, 3])
+    lower, upper = stats.calculate_cohens_f_ci(f, nobs, k)
+
+    f_stat = f ** 2 * nobs / (k - 1)
+    np.testing.assert_almost_equal(
+        ss.ncf.cdf(f_stat[0], 3, 96, lower[0] ** 2 * 100), 0.975
+    )
+    np.testing.assert_almost_equal(
+        ss.ncf.cdf(f_stat, k - 1, nobs - k, upper ** 2 * nobs), 0.025
+    )
+    assert lower[1] == 0
+
+
+def test_difference_es_ci():
+    lower, upper = stats.calculate_difference_es_ci(-0.8, 40, 2)
+    assert lower < -0.8 < upper
+    np.testing.assert_almost_equal(
+        (upper / -0.8) ** 2 * 38, ss.chi2.ppf(0.025, 38)
+    )
+
+
+def test_group_moments_matrix():
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=(4, 30))
+    codes = np.repeat([0, 1, 2, -1], [8, 10, 9, 3])
+    counts, means, m2 = stats.calculate_group_moments(values, codes)
+    assert counts.shape == means.shape == m2.shape == (4, 3)
+
+    for row in range(4):
+        for grp in range(3):
+            grp_values = values[row, codes == grp]
+            assert counts[row, grp] == len(grp_values)
+            np.testing.assert_almost_equal(means[row, grp],
+                                           grp_values.mean())
+            np.testing.assert_almost_equal(
+                m2[row, grp], np.var(grp_values) * len(grp_values)
+            )
+
+
+def test_group_moments_no_groups():
+    counts, means, m2 = stats.calculate_group_moments(
+        np.arange(4, dtype=float), np.full(4, -1)
+    )
+    assert counts.shape == means.shape == m2.shape == (0, )
+
+
+def test_batch_effect_sizes():
+    rng = np.random.default_rng(1)
+    values = rng.normal(size=(5, 24))
+    codes_2 = np.repeat([0, 1], 12)
+    codes_3 = np.repeat([0, 1, 2], 8)
+
+    calc_d = stats.calculate_cohens_d_batch(values, codes_2)
+    calc_f = stats.calculate_cohens_f_batch(values, codes_3)
+    calc_std = stats.calculate_pooled_stdev_batch(values, codes_3)
+    for row in range(5):
+        arrays_2 = [values[row, codes_2 == i] for i in range(2)]
+        arrays_3 = [values[row, codes_3 == i] for i in range(3)]
+        np.testing.assert_almost_equal(
+            calc_d[row], stats.calculate_cohens_d(*arrays_2)
+        )
+        np.testing.assert_almost_equal(
+            calc_f[row], stats.calculate_cohens_f(*arrays_3)
+        )
+        np.testing.assert_almost_equal(
+            calc_std[row], stats.calculate_pooled_stdev(*arrays_3)
+        )
+
+
+def test_batch_effect_sizes_per_row_codes():
+    values = np.array([[1, 2, 3, 4, 5, 6, 2, 5, 3, 6, 8, 9]] * 2)
+    codes = np.array([
+        np.repeat([0, 1], 6),
+        np.repeat([1, 0], 6),
+    ])
+    calc_d = stats.calculate_cohens_d_batch(values, codes)
+    np.testing.assert_almost_equal(calc_d, [0.852803] * 2, decimal=6)
+
+
+def test_group_stats_merge():
+    rng = np.random.default_rng(2)
+    values = rng.normal(loc=1e6, size=40)
+    codes = np.repeat([0, 1, 2, 0], 10)
+    levels = ["a", "b", "c"]
+
+    exp = stats.GroupStats.from_values(values, codes, levels)
+    calc = stats.GroupStats.empty(levels)
+    for block in np.array_split(np.arange(40), 7):
+        calc = calc.merge(
+            stats.GroupStats.from_values(values[block], codes[block], levels)
+        )
+    np.testing.assert_array_equal(calc.counts, exp.counts)
+    np.testing.assert_allclose(calc.means, exp.means)
+    np.testing.assert_allclose(calc.m2, exp.m2)
+
+    arrays = [values[codes == i] for i in range(3)]
+    assert calc.metric == "cohens_f"
+    np.testing.assert_almost_equal(calc.effect_size(),
+                                   stats.calculate_cohens_f(*arrays))
+    np.testing.assert_almost_equal(calc.pooled_stdev(),
+                                   stats.calculate_pooled_stdev(*arrays))
+
+
+def test_power_matches_statsmodels():
+    from statsmodels.stats.power import tt_ind_solve_power, FTestAnovaPower
+
+    effect_size = np.array([0.2, 0.5, 0.9])[:, None, None]
+    nobs = np.array([12, 30, 100])[None, :, None]
+    alpha = np.array([0.01, 0.05])[None, None, :]
+    calc_t = stats.calculate_t_test_power(effect_size, nobs, alpha)
+    calc_f = stats.calculate_anova_power(effect_size, nobs, alpha, 3)
+    assert calc_t.shape == calc_f.shape == (3, 3, 2)
+
+    for idx in np.ndindex(*calc_t.shape):
+        es = effect_size[idx[0], 0, 0]
+        n = nobs[0, idx[1], 0]
+        a = alpha[0, 0, idx[2]]
+        exp_t = tt_ind_solve_power(effect_size=es, nobs1=n, alpha=a,
+                                   ratio=1.0)
+        exp_f = FTestAnovaPower().solve_power(effect_size=es, nobs=n,
+                                              alpha=a, k_groups=3)
+        np.testing.assert_almost_equal(calc_t[idx], exp_t)
+        np.testing.assert_almost_equal(calc_f[idx], exp_f)
+
+
+def test_nobs_matches_statsmodels():
+    from statsmodels.stats.power import tt_ind_solve_power, FTestAnovaPower
+
+    effect_size = np.array([0.3, 0.8])[:, None]
+    power = np.array([0.6, 0.9])[None, :]
+    calc_t = stats.calculate_t_test_nobs(effect_size, 0.05, power)
+    calc_f = stats.calculate_anova_nobs(effect_size, 0.05, power, 3)
+    for i, j in np.ndindex(2, 2):
+        es, pw = effect_size[i, 0], power[0, j]
+        exp_t = tt_ind_solve_power(effect_size=es, alpha=0.05, power=pw,
+                                   ratio=1.0)
+        exp_f = FTestAnovaPower().solve_power(effect_size=es, alpha=0.05,
+                                              power=pw, k_groups=3)
+        np.testing.assert_allclose(calc_t[i, j], exp_t, rtol=1e-5)
+        np.testing.assert_allclose(calc_f[i, j], exp_f, rtol=1e-5)
+
+    # Power is never reached without an effect
+    calc = stats.calculate_t_test_nobs(np.array([0.0, np.nan]), 0.05, 0.8)
+    assert np.isnan(calc).all()
+
+
+def test_mdes_round_trip():
+    nobs = np.array([10, 40, 200])[:, None]
+    power = np.array([0.5, 0.8])[None, :]
+    es_t = stats.calculate_t_test_mdes(nobs, 0.05, power)
+    es_f = stats.calculate_anova_mdes(nobs, 0.05, power, 3)
+    np.testing.assert_allclose(
+        stats.calculate_t_test_power(es_t, nobs, 0.05), np.broadcast_to(
+            power, es_t.shape), rtol=1e-6
+    )
+    np.testing.assert_allclose(
+        stats.calculate_anova_power(es_f, nobs, 0.05, 3),
+        np.broadcast_to(power, es_f.shape), rtol=1e-6
+    )
+
+    es_rm = stats.calculate_rm_anova_mdes(10, 3, 0.05, 0.5, 1.0, power)
+    np.testing.assert_allclose(
+        stats.calculate_rm_anova_power(10, 3, 0.05, 0.5, 1.0, es_rm), power,
+        rtol=1e-6
+    )
+
+    # Too few observations for any effect size
+    assert np.isnan(stats.calculate_t_test_mdes(1, 0.05, 0.8))
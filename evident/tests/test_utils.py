@@ -38,3 +38,37 @@ def test_check_sample_overlap():
         "common to both."
     )
     assert warn_info[0].message.args[0] == exp_msg
+
+
+def test_condensed_index():
+    from scipy.spatial.distance import squareform
+
+    square = np.arange(36).reshape(6, 6)
+    square = square + square.T
+    np.fill_diagonal(square, 0)
+    condensed = squareform(square)
+
+    i = np.array([0, 5, 2, 3])
+    j = np.array([1, 2, 4, 0])
+    idx = utils._condensed_index(i, j, 6)
+    np.testing.assert_equal(condensed[idx], square[i, j])
+
+
+def test_lru_cache_counters():
+    cache = utils._LRUCache(maxsize=2)
+    calls = []
+
+    def compute(key):
+        calls.append(key)
+        return key * 2
+
+    for key in [1, 2, 1, 3, 2]:
+        assert cache.get_or_compute(key, lambda: compute(key)) == key * 2
+
+    # 3 evicts 2 as 1 was used more recently
+    assert calls == [1, 2, 3, 2]
+    assert cache.info() == utils.CacheInfo(hits=1, misses=4, evictions=2,
+                                           maxsize=2, currsize=2)
+
+    cache.clear()
+    assert cache.info() == utils.CacheInfo(0, 0, 0, 2, 0)
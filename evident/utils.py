@@ -1,6 +1,10 @@
-from typing import Any, Iterable
+from collections import OrderedDict, namedtuple
+from functools import wraps
+from typing import Any, Callable, Iterable
 from warnings import warn
 
+import numpy as np
+
 
 def _listify(x: Any):
     """Convert value to list if it is not already iterable."""
@@ -18,4 +22,99 @@ def _check_sample_overlap(ids1: set, ids2: set):
             f"{len(overlap)} samples common to both."
         )
         warn(msg)
-    return list(overlap)
+    return sorted(overlap)
+
+
+def _condensed_index(i, j, n: int):
+    """Get positions in a condensed distance vector for pairs of samples.
+
+    :param i: Positions of first samples in the distance matrix
+    :type i: int or np.ndarray
+
+    :param j: Positions of second samples in the distance matrix. Must
+        differ from i elementwise.
+    :type j: int or np.ndarray
+
+    :param n: Number of samples in the distance matrix
+    :type n: int
+
+    :returns: Positions of each (i, j) pair in the condensed vector
+    :rtype: int or np.ndarray
+    """
+    a = np.minimum(i, j)
+    b = np.maximum(i, j)
+    return n * a - a * (a + 1) // 2 + b - a - 1
+
+
+CacheInfo = namedtuple("CacheInfo",
+                       ["hits", "misses", "evictions", "maxsize", "currsize"])
+
+
+class _LRUCache:
+    """Bounded least-recently-used cache with hit/miss/eviction counters.
+
+    :param maxsize: Max number of entries, defaults to 128. None means
+        unbounded and 0 disables caching.
+    :type maxsize: int
+    """
+    def __init__(self, maxsize: int = 128):
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("maxsize must be >= 0 or None.")
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key, func: Callable):
+        """Get cached value of key, computing and storing it if missing.
+
+        :param key: Hashable cache key
+        :type key: Hashable
+
+        :param func: Function of no arguments computing the value
+        :type func: Callable
+
+        :returns: Value of key
+        """
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        self.misses += 1
+        value = func()
+        if self.maxsize == 0:
+            return value
+        self._entries[key] = value
+        if self.maxsize is not None and len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return value
+
+    def clear(self):
+        """Remove all entries and reset counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def info(self) -> CacheInfo:
+        """Get cache statistics."""
+        return CacheInfo(self.hits, self.misses, self.evictions,
+                         self.maxsize, len(self._entries))
+
+
+def _cached_method(method: Callable) -> Callable:
+    """Cache results of a method in the _cache of its instance.
+
+    Unlike functools.lru_cache, entries live on the instance so they are
+    freed with it and can be inspected and cleared per instance.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        return self._cache.get_or_compute(
+            key, lambda: method(self, *args, **kwargs)
+        )
+    return wrapper